@@ -1,31 +1,71 @@
 # supres/__init__.py
 
-from .src import frameselect
-from .src import git_twitter_access
-from .src import historical_data
-from .src import indicators_sma_rsi
-from .src import main
-from .src import pinescript
-from .src import support_resistance
-from .src import tweet
-from .src.miniscripts import all_timeframe_sr
-from .src.miniscripts import multiple_run
-from .src.miniscripts import force_liquidation
-from .src.telegram_bot import cmc
-from .src.telegram_bot import telegram_bot
-from .src.telegram_bot import telegram_frameselect
-from .src.telegram_bot import telegram_main
+import importlib
+import os
+import sys
 
+# The modules are imported on first use, so importing the package does not load plotly, tweepy or
+# the Binance client. Every module lives in src or one of its script folders and imports its siblings by name.
+_src = os.path.join(os.path.dirname(__file__), "src")
+_module_folders = {
+    "batch_scan": "",
+    "binance_replay": "",
+    "candle_patterns": "",
+    "candles": "",
+    "chart_export": "",
+    "exchange_info": "",
+    "export_pool": "",
+    "figure_batch": "",
+    "frameselect": "",
+    "git_twitter_access": "",
+    "historical_data": "",
+    "indicators_sma_rsi": "",
+    "kline_downloader": "",
+    "kline_store": "",
+    "kline_stream": "",
+    "level_events": "",
+    "level_strength": "",
+    "level_zones": "",
+    "main": "",
+    "pinescript": "",
+    "resample": "",
+    "support_resistance": "",
+    "tweet": "",
+    "volume_profile": "",
+    "all_timeframe_sr": "miniscripts",
+    "multiple_run": "miniscripts",
+    "force_liquidation": "miniscripts",
+    "cmc": "telegram_bot",
+    "telegram_bot": "telegram_bot",
+    "telegram_frameselect": "telegram_bot",
+    "telegram_main": "telegram_bot",
+}
 
 __all__ = [
+    "batch_scan",
+    "binance_replay",
+    "candle_patterns",
+    "candles",
+    "chart_export",
+    "exchange_info",
+    "export_pool",
+    "figure_batch",
     "frameselect",
     "git_twitter_access",
     "historical_data",
     "indicators_sma_rsi",
+    "kline_downloader",
+    "kline_store",
+    "kline_stream",
+    "level_events",
+    "level_strength",
+    "level_zones",
     "main",
     "pinescript",
+    "resample",
     "support_resistance",
     "tweet",
+    "volume_profile",
     "all_timeframe_sr",
     "multiple_run",
     "force_liquidation",
@@ -34,3 +74,18 @@ __all__ = [
     "telegram_frameselect",
     "telegram_main",
 ]
+
+
+def __getattr__(name):
+    if name not in _module_folders:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    folder = os.path.normpath(os.path.join(_src, _module_folders[name]))
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    module = importlib.import_module(name)
+    globals()[name] = module
+    return module
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
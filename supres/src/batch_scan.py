@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+import support_resistance
+
+ohlc_columns = ("open", "high", "low", "close", "Volume USDT")
+
+
+@dataclass
+class OhlcStack:
+    tickers: list[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    valid: np.ndarray
+
+
+def stack_ohlc(frames, candle_count=None) -> OhlcStack:
+    """
+    Stacks the candles of several tickers into (tickers x candles) arrays.
+
+    The series are aligned on their latest candle. Tickers with a shorter history are padded with NaN at the start
+    and the padding is marked as not valid.
+
+    Args:
+        frames (dict[str, pandas.DataFrame | candles.Candles]): The candles of each ticker in chronological order,
+            with the open, high, low, close and Volume USDT columns.
+        candle_count (int): The number of latest candles to keep. Default value is the longest history.
+
+    Returns:
+        OhlcStack: The stacked price and volume arrays with their validity mask.
+    """
+    tickers = list(frames)
+    if candle_count is None:
+        candle_count = max((len(frame) for frame in frames.values()), default=0)
+    columns = {
+        column: np.full((len(tickers), candle_count), np.nan) for column in ohlc_columns
+    }
+    valid = np.zeros((len(tickers), candle_count), dtype=bool)
+    for row, ticker in enumerate(tickers):
+        frame = frames[ticker].tail(candle_count)
+        start = candle_count - len(frame)
+        for column in ohlc_columns:
+            columns[column][row, start:] = np.asarray(frame[column], dtype=float)
+        valid[row, start:] = True
+    return OhlcStack(
+        tickers=tickers,
+        open=columns["open"],
+        high=columns["high"],
+        low=columns["low"],
+        close=columns["close"],
+        volume=columns["Volume USDT"],
+        valid=valid,
+    )
+
+
+def batch_levels(
+    low, high, valid=None, before_candle_count=3, after_candle_count=2
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the support and resistance levels of every ticker in one vectorized pass, with the rules of
+    `support_resistance.support()` and `support_resistance.resistance()`.
+
+    Args:
+        low (np.ndarray): The (tickers x candles) low prices in chronological order.
+        high (np.ndarray): The (tickers x candles) high prices in chronological order.
+        valid (np.ndarray): The (tickers x candles) mask of the candles that exist. Default value is all candles.
+        before_candle_count (int): The number of candles to check before each candle. Default value is 3.
+        after_candle_count (int): The number of candles to check after each candle. Default value is 2.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The (tickers x candles) support and resistance masks.
+    """
+    return support_resistance.pivot_ranks(low, high, valid).masks(
+        before_candle_count, after_candle_count
+    )
+
+
+def scan_levels(
+    stack, before_candle_count=3, after_candle_count=2
+) -> dict[str, tuple[list, list]]:
+    """
+    Calculates the support and resistance lists of every ticker in a stack.
+
+    Args:
+        stack (OhlcStack): The stacked candles, as returned by `stack_ohlc()`.
+        before_candle_count (int): The number of candles to check before each candle. Default value is 3.
+        after_candle_count (int): The number of candles to check after each candle. Default value is 2.
+
+    Returns:
+        dict[str, tuple[list, list]]: The support and resistance lists of `(index, price)` tuples of each ticker,
+        with the index counted from the first valid candle of the ticker.
+    """
+    support_mask, resistance_mask = batch_levels(
+        stack.low, stack.high, stack.valid, before_candle_count, after_candle_count
+    )
+    padding = stack.valid.shape[1] - stack.valid.sum(axis=1)
+    levels = {ticker: ([], []) for ticker in stack.tickers}
+    for mask, prices, position in (
+        (support_mask, stack.low, 0),
+        (resistance_mask, stack.high, 1),
+    ):
+        for row, candle in zip(*np.nonzero(mask)):
+            levels[stack.tickers[row]][position].append(
+                (int(candle - padding[row]), prices[row, candle])
+            )
+    return levels
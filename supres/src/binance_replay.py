@@ -0,0 +1,388 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The request weight of the endpoints the scripts use, everything else weighs 1
+endpoint_weights = {
+    "/api/v3/klines": 2,
+    "/api/v3/exchangeInfo": 20,
+    "/api/v3/ticker/price": 2,
+}
+# The environment variable and the default base URL of the websocket streams of each market
+websocket_markets = {
+    "spot": ("SUPRES_BINANCE_WS_URL", "wss://stream.binance.com:9443"),
+    "futures": ("SUPRES_BINANCE_FUTURES_WS_URL", "wss://fstream.binance.com"),
+}
+# The stand-in serves the futures streams under this path prefix, and the spot streams without one
+futures_prefix = "/futures"
+# Query parameters that change on every call and are not part of a recorded request
+volatile_parameters = ("timestamp", "signature", "recvWindow")
+
+
+def api_url(default="https://api.binance.com") -> str:
+    """
+    Returns the Binance REST API base URL, which the SUPRES_BINANCE_API_URL environment variable overrides.
+    """
+    return os.environ.get("SUPRES_BINANCE_API_URL", default).rstrip("/")
+
+
+def websocket_url(path, market="spot") -> str:
+    """
+    Returns the URL of a Binance websocket stream of the spot or the USDⓈ-M futures market, whose base URL the
+    SUPRES_BINANCE_WS_URL or SUPRES_BINANCE_FUTURES_WS_URL environment variable overrides.
+    """
+    variable, default = websocket_markets[market]
+    return os.environ.get(variable, default).rstrip("/") + path
+
+
+def make_client(tld="com"):
+    """
+    Returns a python-binance client that talks to `api_url()`.
+    """
+    from binance.client import Client
+
+    if "SUPRES_BINANCE_API_URL" not in os.environ:
+        return Client("", "", tld=tld)
+
+    class StandInClient(Client):
+        API_URL = api_url() + "/api"
+
+    return StandInClient("", "")
+
+
+class Recording:
+    """
+    The REST responses and websocket messages of a recording directory.
+
+    REST responses are stored in `rest.jsonl` by path and query, and websocket messages in `streams.jsonl` by path,
+    with their time since the connection opened. Kline requests are replayed from the merged klines of every
+    recorded kline response, so a replay can ask for other time ranges than the recording did.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._klines = {}
+        self._messages = {}
+        for entry in self._read("rest.jsonl"):
+            self._add_response(entry)
+        for entry in self._read("streams.jsonl"):
+            self._messages.setdefault(entry["path"], []).append(
+                (entry["offset"], entry["message"])
+            )
+
+    def add_response(self, path, query, status, body) -> None:
+        entry = {
+            "path": path,
+            "query": request_key(query),
+            "status": status,
+            "body": body,
+        }
+        with self._lock:
+            self._add_response(entry)
+            self._append("rest.jsonl", entry)
+
+    def response(self, path, query) -> tuple[int, str] | None:
+        """
+        Returns the status and body recorded for a request, or None if it was not recorded.
+        """
+        if path == "/api/v3/klines":
+            return self._kline_response(dict(urllib.parse.parse_qsl(query)))
+        return self._responses.get((path, request_key(query)))
+
+    def add_message(self, path, offset, message) -> None:
+        with self._lock:
+            self._messages.setdefault(path, []).append((offset, message))
+            self._append(
+                "streams.jsonl", {"path": path, "offset": offset, "message": message}
+            )
+
+    def messages(self, path) -> list[tuple[float, str]]:
+        return self._messages.get(path, [])
+
+    def _add_response(self, entry) -> None:
+        self._responses[entry["path"], entry["query"]] = entry["status"], entry["body"]
+        if entry["path"] == "/api/v3/klines" and entry["status"] == 200:
+            parameters = dict(urllib.parse.parse_qsl(entry["query"]))
+            klines = self._klines.setdefault(
+                (parameters["symbol"], parameters["interval"]), {}
+            )
+            klines.update((kline[0], kline) for kline in json.loads(entry["body"]))
+
+    def _kline_response(self, parameters) -> tuple[int, str] | None:
+        klines = self._klines.get(
+            (parameters.get("symbol"), parameters.get("interval"))
+        )
+        if klines is None:
+            return None
+        start = int(parameters.get("startTime", 0))
+        end = int(parameters.get("endTime", 2**63 - 1))
+        limit = int(parameters.get("limit", 500))
+        selected = [
+            klines[open_time]
+            for open_time in sorted(klines)
+            if start <= open_time <= end
+        ]
+        if "startTime" not in parameters:
+            selected = selected[-limit:]
+        return 200, json.dumps(selected[:limit])
+
+    def _read(self, name) -> list[dict]:
+        try:
+            with open(os.path.join(self.directory, name)) as file:
+                return [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _append(self, name, entry) -> None:
+        with open(os.path.join(self.directory, name), "a") as file:
+            file.write(json.dumps(entry) + "\n")
+
+
+def request_key(query) -> str:
+    """
+    Returns a query string without its volatile parameters and with sorted parameters.
+    """
+    parameters = [
+        (name, value)
+        for name, value in urllib.parse.parse_qsl(query)
+        if name not in volatile_parameters
+    ]
+    return urllib.parse.urlencode(sorted(parameters))
+
+
+class BinanceStandIn:
+    """
+    A local stand-in for the Binance REST API and websocket streams.
+
+    In "record" mode the requests are forwarded to Binance and the responses and stream messages are saved to the
+    recording. In "replay" mode they are served from the recording, with `latency` seconds of delay per response,
+    a per minute request weight limit that answers with 429 like Binance does, and the stream messages sent at
+    their recorded pace divided by `speed`.
+
+    Point the scripts at the stand-in with the SUPRES_BINANCE_API_URL, SUPRES_BINANCE_WS_URL and
+    SUPRES_BINANCE_FUTURES_WS_URL environment variables, set to `api_url`, `ws_url` and `futures_ws_url`. The
+    futures streams are served and recorded under the `futures_prefix` path, and recorded from
+    `futures_websocket_upstream`, the spot streams from `websocket_upstream`.
+    """
+
+    def __init__(
+        self,
+        directory,
+        mode="replay",
+        host="127.0.0.1",
+        port=0,
+        websocket_port=0,
+        latency=0.0,
+        weight_limit=None,
+        speed=1.0,
+        rest_upstream="https://api.binance.com",
+        websocket_upstream="wss://stream.binance.com:9443",
+        futures_websocket_upstream="wss://fstream.binance.com",
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid mode: {mode}")
+        self.recording = Recording(directory)
+        self.mode = mode
+        self.host = host
+        self.port = port
+        self.websocket_port = websocket_port
+        self.latency = latency
+        self.weight_limit = weight_limit
+        self.speed = speed
+        self.rest_upstream = rest_upstream.rstrip("/")
+        self.websocket_upstream = websocket_upstream.rstrip("/")
+        self.futures_websocket_upstream = futures_websocket_upstream.rstrip("/")
+        self._weight_lock = threading.Lock()
+        self._weight_minute = 0
+        self._used_weight = 0
+        self._http_server = None
+        self._loop = None
+        self._threads = []
+
+    @property
+    def api_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.websocket_port}"
+
+    @property
+    def futures_ws_url(self) -> str:
+        return self.ws_url + futures_prefix
+
+    def start(self) -> "BinanceStandIn":
+        """
+        Starts the HTTP and websocket servers in background threads.
+        """
+        self._http_server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.port = self._http_server.server_address[1]
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._http_server.serve_forever, daemon=True),
+            threading.Thread(
+                target=self._serve_websockets, args=(started,), daemon=True
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+        started.wait()
+        return self
+
+    def stop(self) -> None:
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._loop.call_soon_threadsafe(self._stopped.set_result, None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> "BinanceStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _take_weight(self, path) -> int | None:
+        """
+        Counts the weight of a request, and returns the used weight of the minute or None when it is over the limit.
+        """
+        with self._weight_lock:
+            minute = int(time.time() // 60)
+            if minute != self._weight_minute:
+                self._weight_minute, self._used_weight = minute, 0
+            weight = endpoint_weights.get(path, 1)
+            if (
+                self.weight_limit is not None
+                and self._used_weight + weight > self.weight_limit
+            ):
+                return None
+            self._used_weight += weight
+            return self._used_weight
+
+    def _rest_response(self, path, query) -> tuple[int, str]:
+        if self.mode == "replay":
+            response = self.recording.response(path, query)
+            return response or (404, json.dumps({"code": -1, "msg": "Not recorded."}))
+        url = f"{self.rest_upstream}{path}" + (f"?{query}" if query else "")
+        try:
+            with urllib.request.urlopen(url, timeout=30) as upstream:
+                status, body = upstream.status, upstream.read().decode()
+        except urllib.error.HTTPError as error:
+            status, body = error.code, error.read().decode()
+        self.recording.add_response(path, query, status, body)
+        return status, body
+
+    def _handler(self) -> type:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                used_weight = stand_in._take_weight(url.path)
+                if used_weight is None:
+                    status, body = 429, json.dumps(
+                        {"code": -1003, "msg": "Too much request weight used."}
+                    )
+                    headers = {"Retry-After": str(60 - int(time.time() % 60))}
+                else:
+                    time.sleep(stand_in.latency)
+                    status, body = stand_in._rest_response(url.path, url.query)
+                    headers = {"X-MBX-USED-WEIGHT-1M": str(used_weight)}
+                body = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _serve_websockets(self, started) -> None:
+        from websockets.asyncio.server import serve
+
+        async def run():
+            self._stopped = self._loop.create_future()
+            async with serve(
+                self._handle_websocket, self.host, self.websocket_port
+            ) as server:
+                self.websocket_port = server.sockets[0].getsockname()[1]
+                started.set()
+                await self._stopped
+
+        self._loop.run_until_complete(run())
+        self._loop.close()
+
+    async def _handle_websocket(self, connection) -> None:
+        path = connection.request.path
+        opened = asyncio.get_running_loop().time()
+        if self.mode == "replay":
+            for offset, message in self.recording.messages(path):
+                delay = opened + offset / self.speed + self.latency
+                await asyncio.sleep(max(delay - asyncio.get_running_loop().time(), 0))
+                await connection.send(message)
+            await connection.wait_closed()
+            return
+        from websockets.asyncio.client import connect
+
+        if path.startswith(futures_prefix + "/"):
+            upstream_url = self.futures_websocket_upstream + path[len(futures_prefix) :]
+        else:
+            upstream_url = self.websocket_upstream + path
+        async with connect(upstream_url) as upstream:
+            # Stops relaying when either side closes
+            relay = asyncio.create_task(self._relay(path, opened, upstream, connection))
+            closed = asyncio.create_task(connection.wait_closed())
+            await asyncio.wait((relay, closed), return_when=asyncio.FIRST_COMPLETED)
+            relay.cancel()
+            closed.cancel()
+
+    async def _relay(self, path, opened, upstream, connection) -> None:
+        async for message in upstream:
+            offset = asyncio.get_running_loop().time() - opened
+            self.recording.add_message(path, offset, message)
+            await connection.send(message)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Records Binance responses or replays them from a local stand-in."
+    )
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("directory", help="The recording directory.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--websocket-port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--weight-limit", type=int, default=None)
+    parser.add_argument("--speed", type=float, default=1.0)
+    arguments = parser.parse_args()
+    with BinanceStandIn(
+        arguments.directory,
+        arguments.mode,
+        port=arguments.port,
+        websocket_port=arguments.websocket_port,
+        latency=arguments.latency,
+        weight_limit=arguments.weight_limit,
+        speed=arguments.speed,
+    ) as stand_in:
+        print(
+            f"SUPRES_BINANCE_API_URL={stand_in.api_url}\n"
+            f"SUPRES_BINANCE_WS_URL={stand_in.ws_url}\n"
+            f"SUPRES_BINANCE_FUTURES_WS_URL={stand_in.futures_ws_url}"
+        )
+        threading.Event().wait()
@@ -0,0 +1,279 @@
+from collections import deque
+
+import numpy as np
+
+# The patterns in the bit order of `pattern_bits()`, with the number of candles each pattern looks at
+pattern_candle_counts = {
+    "inverted_hammer": 1,
+    "hammer": 1,
+    "doji": 1,
+    "bearish_harami": 2,
+    "bearish_engulfing": 2,
+    "bullish_harami": 2,
+    "bullish_engulfing": 2,
+    "dark_cloud_cover": 2,
+    "dragonfly_doji": 1,
+    "hanging_man": 3,
+    "gravestone_doji": 1,
+    "morning_star": 3,
+    "morning_star_doji": 3,
+    "piercing_pattern": 2,
+    "star": 2,
+    "shooting_star": 2,
+}
+pattern_names = tuple(pattern_candle_counts)
+# The number of earlier candles that the patterns look at
+lookback = max(pattern_candle_counts.values()) - 1
+
+
+def pattern_masks(open_, high, low, close) -> dict[str, np.ndarray]:
+    """
+    Evaluates every candlestick pattern over OHLC arrays, with the definitions of the `candlestick` package.
+
+    Args:
+        open_, high, low, close (array-like): The prices of the candles in chronological order, along the last axis,
+            e.g. the (tickers x candles) arrays of `batch_scan.stack_ohlc()`.
+
+    Returns:
+        dict[str, np.ndarray]: A boolean mask per pattern, True at the last candle of every match. The first candles
+        of a pattern that looks back further than the series are never matched.
+    """
+    o, h, l, c = (
+        np.asarray(prices, dtype=float) for prices in (open_, high, low, close)
+    )
+    # The previous candle and the one before it
+    po, ph, pl, pc = (_shift(prices, 1) for prices in (o, h, l, c))
+    bo, bh, bl, bc = (_shift(prices, 2) for prices in (o, h, l, c))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        body = np.abs(c - o)
+        body_ratio = body / (h - l)
+        previous_body = np.abs(pc - po)
+        previous_body_ratio = previous_body / (ph - pl)
+        top, bottom = np.maximum(c, o), np.minimum(c, o)
+        previous_top = np.maximum(po, pc)
+        long_previous_bull = (pc > po) & (previous_body_ratio >= 0.7)
+        small_body = (0.3 > body_ratio) & (body_ratio >= 0.1)
+        masks = {
+            "inverted_hammer": ((h - l) > 3 * (o - c))
+            & ((h - c) / (0.001 + h - l) > 0.6)
+            & ((h - o) / (0.001 + h - l) > 0.6),
+            "hammer": ((h - l) > 3 * (o - c))
+            & ((c - l) / (0.001 + h - l) > 0.6)
+            & ((o - l) / (0.001 + h - l) > 0.6),
+            "doji": (body_ratio < 0.1)
+            & ((h - top) > 3 * body)
+            & ((bottom - l) > 3 * body),
+            "bearish_harami": long_previous_bull & small_body & (h < pc) & (l > po),
+            "bearish_engulfing": (o >= pc)
+            & (pc > po)
+            & (o > c)
+            & (po >= c)
+            & (o - c > pc - po),
+            "bullish_harami": (po > pc)
+            & (previous_body_ratio >= 0.7)
+            & small_body
+            & (h < po)
+            & (l > pc),
+            "bullish_engulfing": (c >= po)
+            & (po > pc)
+            & (c > o)
+            & (pc >= o)
+            & (c - o > po - pc),
+            "dark_cloud_cover": long_previous_bull
+            & (c < o)
+            & (o > ph)
+            & (c < (po + pc) / 2),
+            "dragonfly_doji": (body_ratio < 0.1)
+            & ((bottom - l) > 3 * body)
+            & ((h - top) < body),
+            "hanging_man": ((h - l) > 4 * (o - c))
+            & ((c - l) / (0.001 + h - l) >= 0.75)
+            & ((o - l) / (0.001 + h - l) >= 0.75)
+            & (ph < o)
+            & (bh < o),
+            "gravestone_doji": (body_ratio < 0.1)
+            & ((h - top) > 3 * body)
+            & ((bottom - l) <= body),
+            "morning_star": (previous_top < bc)
+            & (bc < bo)
+            & (c > o)
+            & (o > previous_top),
+            "morning_star_doji": (bc < bo)
+            & (np.abs(bc - bo) / (bh - bl) >= 0.7)
+            & (previous_body_ratio < 0.1)
+            & (c > o)
+            & (body_ratio >= 0.7)
+            & (bc > pc)
+            & (bc > po)
+            & (pc < o)
+            & (po < o)
+            & (c > bc)
+            & ((ph - previous_top) > 3 * previous_body)
+            & ((np.minimum(pc, po) - pl) > 3 * previous_body),
+            "piercing_pattern": (pc < po)
+            & (o < pl)
+            & (po > c)
+            & (c > pc + (po - pc) / 2),
+            "star": long_previous_bull & small_body & (pc < c) & (pc < o),
+            "shooting_star": (po < pc)
+            & (pc < o)
+            & (h - top >= body * 3)
+            & (bottom - l <= body),
+        }
+    return masks
+
+
+def pattern_bits(open_, high, low, close) -> np.ndarray:
+    """
+    Evaluates every candlestick pattern over OHLC arrays into one bitset per candle.
+
+    Returns:
+        np.ndarray: A uint16 per candle, where bit i is set if the candle completes `pattern_names[i]`.
+    """
+    bits = np.zeros(np.shape(close), dtype=np.uint16)
+    for bit, mask in enumerate(pattern_masks(open_, high, low, close).values()):
+        bits |= mask.astype(np.uint16) << np.uint16(bit)
+    return bits
+
+
+def pattern_hits(bits, dates, window=slice(None), date_format="%b-%d-%y") -> list:
+    """
+    Lists the patterns of a bitset in a window of candles.
+
+    Args:
+        bits (np.ndarray): The bitset of `pattern_bits()`.
+        dates (array-like): The dates of the candles.
+        window (slice | np.ndarray): The candles to report, in the order to report them, e.g. `slice(-3, -30, -1)`
+            for the 27 candles before the last two, newest first, or their positions. Default value is every candle.
+        date_format (str): The strftime format of the dates. Default value is "%b-%d-%y".
+
+    Returns:
+        list: A list of tuples containing the name of the pattern and the date it was found, candle by candle and in
+        the order of `pattern_names` within a candle.
+    """
+    positions = np.arange(len(bits))[window]
+    positions = positions[bits[positions] != 0]
+    dates = np.asarray(dates, dtype="datetime64[ms]")[positions].astype(object)
+    hits = []
+    for position, date in zip(positions, dates):
+        candle_bits = int(bits[position])
+        for bit, name in enumerate(pattern_names):
+            if candle_bits >> bit & 1:
+                hits.append((name, date.strftime(date_format)))
+    return hits
+
+
+def find_patterns(candles, window=slice(None), date_format="%b-%d-%y") -> list:
+    """
+    Finds the candlestick patterns of candles in a window, see `pattern_hits()`.
+
+    Only the candles of the window and the `lookback` candles before them are evaluated, so asking for the latest
+    candles of a long history costs the same as asking for them in a short one.
+
+    Args:
+        candles (pandas.DataFrame | dict | candles.Candles): The candles in chronological order, with the open,
+            high, low and close columns, and a date column or a unix column in milliseconds.
+        window (slice): The candles to report. Default value is every candle.
+        date_format (str): The strftime format of the dates. Default value is "%b-%d-%y".
+
+    Returns:
+        list: A list of tuples containing the name of the pattern and the date it was found.
+    """
+    positions = np.arange(len(candles["close"]))[window]
+    if not len(positions):
+        return []
+    start = max(positions.min() - lookback, 0)
+    stop = positions.max() + 1
+    bits = pattern_bits(
+        *(
+            np.asarray(candles[column])[start:stop]
+            for column in ("open", "high", "low", "close")
+        )
+    )
+    return pattern_hits(
+        bits, candle_dates(candles)[start:stop], positions - start, date_format
+    )
+
+
+def candle_dates(candles) -> np.ndarray:
+    """
+    Returns the dates of candles as datetime64 values, from their date column or their unix column in
+    milliseconds.
+    """
+    if "date" in candles:
+        return np.asarray(candles["date"], dtype="datetime64[ms]")
+    return np.asarray(candles["unix"], dtype=np.int64).astype("datetime64[ms]")
+
+
+class PatternScanner:
+    """
+    Keeps the candlestick patterns of the latest candles of many symbols up to date.
+
+    Every closed candle is evaluated once, together with the `lookback` candles before it, and its bits are kept
+    with those of the `history` candles before it, so a scan of hundreds of symbols only evaluates the new candles.
+    """
+
+    def __init__(self, history=30):
+        self.history = history
+        # The (open, high, low, close) of the latest candles, and the dates and pattern bits of the history
+        self._candles = {}
+        self._dates = {}
+        self._bits = {}
+
+    def seed(self, symbol, candles) -> None:
+        """
+        Evaluates the latest `history` candles of a symbol, replacing its state.
+
+        Args:
+            symbol (str): The symbol of the candles.
+            candles (pandas.DataFrame | dict | candles.Candles): The candles in chronological order, see
+                `find_patterns()`.
+        """
+        prices = [
+            np.asarray(candles[column], dtype=float)[-(self.history + lookback) :]
+            for column in ("open", "high", "low", "close")
+        ]
+        bits = pattern_bits(*prices)
+        dates = candle_dates(candles)[-self.history :]
+        self._candles[symbol] = deque(zip(*prices), maxlen=lookback + 1)
+        self._dates[symbol] = deque(dates, maxlen=self.history)
+        self._bits[symbol] = deque(bits[-self.history :], maxlen=self.history)
+
+    def update(self, symbol, date, open_, high, low, close) -> int:
+        """
+        Adds the next closed candle of a symbol and evaluates it.
+
+        Args:
+            symbol (str): The symbol of the candle.
+            date (datetime64 | int): The date of the candle, or its open time in milliseconds.
+            open_, high, low, close (float): The prices of the candle.
+
+        Returns:
+            int: The pattern bits of the candle, see `pattern_bits()`.
+        """
+        if symbol not in self._candles:
+            self._candles[symbol] = deque(maxlen=lookback + 1)
+            self._dates[symbol] = deque(maxlen=self.history)
+            self._bits[symbol] = deque(maxlen=self.history)
+        latest = self._candles[symbol]
+        latest.append((float(open_), float(high), float(low), float(close)))
+        candle_bits = pattern_bits(*np.array(latest).T)[-1]
+        if isinstance(date, (int, np.integer)):
+            date = np.datetime64(int(date), "ms")
+        self._dates[symbol].append(np.datetime64(date, "ms"))
+        self._bits[symbol].append(candle_bits)
+        return int(candle_bits)
+
+    def hits(self, symbol, window=slice(None), date_format="%b-%d-%y") -> list:
+        """
+        Lists the patterns of the kept candles of a symbol, see `pattern_hits()`.
+        """
+        bits = np.array(self._bits.get(symbol, ()), dtype=np.uint16)
+        dates = np.array(self._dates.get(symbol, ()), dtype="datetime64[ms]")
+        return pattern_hits(bits, dates, window, date_format)
+
+
+def _shift(prices, count) -> np.ndarray:
+    shifted = np.full(prices.shape, np.nan)
+    shifted[..., count:] = prices[..., : max(prices.shape[-1] - count, 0)]
+    return shifted
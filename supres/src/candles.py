@@ -0,0 +1,116 @@
+import numpy as np
+
+# The column names of the candle DataFrames and kline columns, by Candles attribute
+column_names = {
+    "open_time": "unix",
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "close",
+    "volume": "Volume USDT",
+}
+
+
+class Candles:
+    """
+    OHLCV candles in contiguous typed arrays: int64 open times in milliseconds and float64 or float32 prices and
+    volumes.
+
+    Slicing returns candles that share the arrays of the original, and indexing by column name, e.g.
+    `candles["close"]` or `candles["unix"]`, returns the array, so the functions that take DataFrame or kline
+    columns also take candles. DataFrames are only built at the edges with `to_frame()`.
+    """
+
+    __slots__ = tuple(column_names)
+
+    def __init__(self, open_time, open_, high, low, close, volume, dtype=np.float64):
+        self.open_time = np.ascontiguousarray(open_time, dtype=np.int64)
+        self.open = np.ascontiguousarray(open_, dtype=dtype)
+        self.high = np.ascontiguousarray(high, dtype=dtype)
+        self.low = np.ascontiguousarray(low, dtype=dtype)
+        self.close = np.ascontiguousarray(close, dtype=dtype)
+        self.volume = np.ascontiguousarray(volume, dtype=dtype)
+
+    @classmethod
+    def from_frame(cls, frame, dtype=np.float64) -> "Candles":
+        """
+        Creates candles from a DataFrame or a dict of columns in chronological order, such as the kline columns of
+        `kline_store`, with a unix column in milliseconds or a date column.
+        """
+        if "unix" in frame:
+            open_time = frame["unix"]
+        else:
+            open_time = np.asarray(frame["date"], dtype="datetime64[ms]").astype(
+                np.int64
+            )
+        return cls(
+            open_time,
+            *(frame[column_names[name]] for name in cls.__slots__[1:]),
+            dtype=dtype,
+        )
+
+    @classmethod
+    def from_klines(cls, klines, dtype=np.float64) -> "Candles":
+        """
+        Creates candles from klines as returned by the Binance API.
+        """
+        klines = np.asarray(klines, dtype=object).reshape(len(klines), -1)
+        # Open time, open, high, low, close and the quote asset volume
+        return cls(
+            *(klines[:, position] for position in (0, 1, 2, 3, 4, 7)), dtype=dtype
+        )
+
+    def to_frame(self):
+        """
+        Returns the candles as a DataFrame with the unix, date, open, high, low, close and Volume USDT columns.
+        """
+        import pandas as pd
+
+        frame = pd.DataFrame(
+            {column_names[name]: getattr(self, name) for name in self.__slots__}
+        )
+        frame.insert(1, "date", pd.to_datetime(self.open_time, unit="ms"))
+        return frame
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.close.dtype
+
+    @property
+    def date(self) -> np.ndarray:
+        """
+        The open times as datetime64 values, sharing memory with `open_time`.
+        """
+        return self.open_time.view("datetime64[ms]")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def astype(self, dtype) -> "Candles":
+        return Candles(*(getattr(self, name) for name in self.__slots__), dtype=dtype)
+
+    def tail(self, count) -> "Candles":
+        return self[max(len(self) - count, 0) :]
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    def __contains__(self, column) -> bool:
+        return column in column_names.values()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for name, column in column_names.items():
+                if column == key:
+                    return getattr(self, name)
+            raise KeyError(key)
+        if not isinstance(key, slice):
+            raise TypeError("Candles can only be sliced or indexed by column name.")
+        candles = object.__new__(Candles)
+        for name in self.__slots__:
+            setattr(candles, name, getattr(self, name)[key])
+        return candles
+
+    def __repr__(self) -> str:
+        return f"Candles({len(self)} candles, {self.dtype})"
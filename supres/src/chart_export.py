@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import export_pool
+
+# The formats of `export_chart()`, the image formats of the export pool and HTML
+export_formats = ("html", *export_pool.image_formats)
+
+
+def export_key(payload, width=1920, height=1080, scale=1) -> str:
+    """
+    Returns the content address of an export, the SHA-256 of the figure JSON and the image size.
+    """
+    digest = hashlib.sha256(payload.encode())
+    digest.update(json.dumps([width, height, scale]).encode())
+    return digest.hexdigest()
+
+
+def export_chart(
+    figure,
+    directory,
+    formats=("html", "pdf", "jpeg", "png"),
+    width=1920,
+    height=1080,
+    scale=1,
+    name="chart",
+    pool=None,
+    include_plotlyjs=True,
+) -> dict[str, str]:
+    """
+    Exports a chart in several formats from one serialization of the figure.
+
+    The files are written to a folder of `directory` named after the hash of the figure and the image size, so an
+    export of the same chart returns the files of the previous one without rendering them again. An HTML file
+    without embedded plotly.js is named after the hash of its `include_plotlyjs` option as well. The images are
+    rendered in parallel and every file is written atomically.
+
+    Args:
+        figure (plotly.graph_objects.Figure | dict | str): The figure, a figure dict or its JSON.
+        directory (str): The output directory.
+        formats (Iterable[str]): Some of `export_formats`. Default value is HTML, PDF, JPEG and PNG.
+        width (int): The image width in pixels. Default value is 1920.
+        height (int): The image height in pixels. Default value is 1080.
+        scale (float): The scale of the images. Default value is 1.
+        name (str): The file name of the files, without the extension. Default value is "chart".
+        pool (export_pool.ExportPool): The pool that renders the images. Default value is the export server of the
+            SUPRES_EXPORT_URL environment variable, or the export pool of the process with a worker per image.
+        include_plotlyjs (bool | str): How the HTML includes plotly.js, see `plotly.io.to_html()`. Default value is
+            True, which embeds it so the file opens offline.
+
+    Returns:
+        dict[str, str]: The path of the file of every format.
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    unknown = set(formats) - set(export_formats)
+    if unknown:
+        raise ValueError(
+            f"Unknown export formats {sorted(unknown)}, use some of {export_formats}"
+        )
+    payload = export_pool.figure_json(figure)
+    folder = os.path.join(directory, export_key(payload, width, height, scale)[:16])
+    paths = {
+        export_format: os.path.join(folder, f"{name}.{export_format}")
+        for export_format in formats
+    }
+    if "html" in paths and include_plotlyjs is not True:
+        # The HTML of another plotly.js option is a different file
+        option = hashlib.sha256(repr(include_plotlyjs).encode()).hexdigest()[:8]
+        paths["html"] = os.path.join(folder, f"{name}-{option}.html")
+    missing = [
+        export_format
+        for export_format, path in paths.items()
+        if not os.path.exists(path)
+    ]
+    if not missing:
+        return paths
+    os.makedirs(folder, exist_ok=True)
+    images = _render_images(
+        payload,
+        [export_format for export_format in missing if export_format != "html"],
+        width,
+        height,
+        scale,
+        pool,
+    )
+    if "html" in missing:
+        import plotly.io as pio
+
+        html = pio.to_html(
+            json.loads(payload), include_plotlyjs=include_plotlyjs, validate=False
+        )
+        _write(paths["html"], html.encode())
+    for export_format, image in images.items():
+        _write(paths[export_format], image.result())
+    return paths
+
+
+def _render_images(payload, formats, width, height, scale, pool) -> dict:
+    """
+    Starts the rendering of the images of every format at once, and returns the futures of the images.
+    """
+    if not formats:
+        return {}
+    if pool is None and os.environ.get("SUPRES_EXPORT_URL"):
+        executor = ThreadPoolExecutor(len(formats))
+        images = {
+            export_format: executor.submit(
+                export_pool.export_image, payload, export_format, width, height, scale
+            )
+            for export_format in formats
+        }
+        executor.shutdown(wait=False)
+        return images
+    pool = pool or export_pool.default_pool(len(formats))
+    return {
+        export_format: pool.submit(payload, export_format, width, height, scale)
+        for export_format in formats
+    }
+
+
+def _write(path, content) -> None:
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as temporary_file:
+            temporary_file.write(content)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
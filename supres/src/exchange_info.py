@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+import numpy as np
+
+
+class ExchangeInfoCache:
+    """
+    The Binance exchange info, downloaded with one `get_exchange_info()` call and kept on disk for `ttl` seconds.
+
+    The symbols are indexed by name when the info is loaded, so symbol checks, tick sizes and price precisions are
+    dictionary lookups instead of REST calls.
+    """
+
+    def __init__(self, path, ttl=24 * 3600, client=None):
+        self.path = path
+        self.ttl = ttl
+        self.client = client
+        self._loaded_at = None
+        self._symbols = {}
+        self._tick_sizes = {}
+
+    def symbols(self) -> dict[str, dict]:
+        """
+        Returns the symbol info of every symbol by name, refreshing it when it is older than the TTL.
+        """
+        now = time.time()
+        if self._loaded_at is None or now - self._loaded_at > self.ttl:
+            cached = self._read()
+            if cached is None or now - cached["time"] > self.ttl:
+                cached = {"time": now, "symbols": self._download()}
+                self._write(cached)
+            self._index(cached)
+        return self._symbols
+
+    def symbol_info(self, symbol) -> dict | None:
+        """
+        Returns the info of a symbol as `client.get_symbol_info()` does, or None if Binance does not list it.
+        """
+        return self.symbols().get(symbol.upper())
+
+    def has_symbol(self, symbol) -> bool:
+        return symbol.upper() in self.symbols()
+
+    def tick_size(self, symbol) -> float | None:
+        """
+        Returns the price tick size of a symbol from its PRICE_FILTER, or None if it is unknown.
+        """
+        self.symbols()
+        tick_size = self._tick_sizes.get(symbol.upper())
+        return None if tick_size is None else float(tick_size)
+
+    def price_precision(self, symbol) -> int | None:
+        """
+        Returns the number of decimals of the prices of a symbol, or None if it is unknown.
+        """
+        self.symbols()
+        tick_size = self._tick_sizes.get(symbol.upper())
+        return None if tick_size is None else max(-tick_size.as_tuple().exponent, 0)
+
+    def format_price(self, symbol, price) -> str:
+        """
+        Formats a price with the precision of a symbol, or as is if the symbol is unknown.
+        """
+        precision = self.price_precision(symbol)
+        return str(price) if precision is None else f"{float(price):.{precision}f}"
+
+    def _download(self) -> dict[str, dict]:
+        if self.client is None:
+            import binance_replay
+
+            self.client = binance_replay.make_client()
+        return {
+            info["symbol"]: info for info in self.client.get_exchange_info()["symbols"]
+        }
+
+    def _index(self, cached) -> None:
+        self._loaded_at = cached["time"]
+        self._symbols = cached["symbols"]
+        self._tick_sizes = {}
+        for symbol, info in self._symbols.items():
+            for symbol_filter in info.get("filters", ()):
+                if symbol_filter["filterType"] == "PRICE_FILTER":
+                    # Binance pads the tick size with zeros, e.g. "0.01000000"
+                    self._tick_sizes[symbol] = Decimal(
+                        symbol_filter["tickSize"]
+                    ).normalize()
+
+    def _read(self) -> dict | None:
+        try:
+            with open(self.path) as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, cached) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=directory, suffix=".json.tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w") as temporary_file:
+                json.dump(cached, temporary_file)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+
+def infer_price_precision(prices, max_precision=8) -> int:
+    """
+    Returns the fewest decimals that represent all of the given prices, for when the exchange info is not at hand.
+    Float32 prices are compared with float32 precision.
+    """
+    prices = np.asarray(prices)
+    if prices.dtype.kind != "f":
+        prices = prices.astype(float)
+    prices = prices[np.isfinite(prices)]
+    tolerance = 4 * np.finfo(prices.dtype).eps
+    for precision in range(max_precision + 1):
+        if np.allclose(np.round(prices, precision), prices, rtol=tolerance, atol=0):
+            return precision
+    return max_precision
+
+
+def default_cache(client=None) -> ExchangeInfoCache:
+    """
+    Returns the exchange info cache in the file named by the SUPRES_EXCHANGE_INFO_CACHE environment variable, or in
+    the user cache directory when the variable is not set.
+    """
+    path = os.environ.get(
+        "SUPRES_EXCHANGE_INFO_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "supres", "exchange_info.json"),
+    )
+    return ExchangeInfoCache(path, client=client)
@@ -0,0 +1,354 @@
+import argparse
+import atexit
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The image formats of kaleido and their content types
+image_formats = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+}
+# Rendered by every new worker, so the renderer is running before the first job
+_warm_up_figure = '{"data": [], "layout": {}}'
+_default_pool = None
+
+
+def kaleido_render(figure_json, image_format, width, height, scale) -> bytes:
+    """
+    Renders a figure like `fig.write_image()`, with the kaleido scope of plotly, which keeps its browser running
+    in the process between images.
+    """
+    import plotly.io as pio
+
+    return pio.to_image(
+        json.loads(figure_json),
+        format=image_format,
+        width=width,
+        height=height,
+        scale=scale,
+        validate=False,
+        engine="kaleido",
+    )
+
+
+def figure_json(figure) -> str:
+    """
+    Returns the JSON of a Plotly figure, a figure dict or JSON.
+    """
+    if isinstance(figure, str):
+        return figure
+    if hasattr(figure, "to_json"):
+        return figure.to_json()
+    from plotly.utils import PlotlyJSONEncoder
+
+    return json.dumps(figure, cls=PlotlyJSONEncoder)
+
+
+def image_format_of(path) -> str:
+    """
+    Returns the image format of a file name, e.g. "jpeg" for "BTCUSDT.jpg".
+    """
+    image_format = os.path.splitext(path)[1].lstrip(".").lower()
+    return "jpeg" if image_format == "jpg" else image_format
+
+
+def _check_format(image_format) -> None:
+    if image_format not in image_formats:
+        raise ValueError(
+            f"Unknown image format {image_format!r}, use one of {tuple(image_formats)}"
+        )
+
+
+class ExportPool:
+    """
+    A pool of warm image export processes that render Plotly figures from a job queue.
+
+    Every worker process starts its renderer when the pool starts and keeps it running, so an image only costs its
+    rendering instead of a kaleido start. A job that runs longer than its timeout fails with TimeoutError, and its
+    worker is killed and replaced by a new one.
+
+    The workers are spawned, so each one imports the main script of the process again. A script that starts a
+    pool keeps its setup, such as API clients, inside its `if __name__ == "__main__":` block.
+    """
+
+    def __init__(self, workers=2, timeout=60.0, renderer=kaleido_render):
+        self.workers = workers
+        self.timeout = timeout
+        self.renderer = renderer
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._dispatch, daemon=True) for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self, figure, image_format="png", width=1920, height=1080, scale=1, timeout=None
+    ) -> Future:
+        """
+        Queues the export of a figure.
+
+        Args:
+            figure (plotly.graph_objects.Figure | dict | str): The figure, a figure dict or its JSON.
+            image_format (str): One of `image_formats`. Default value is "png".
+            width (int): The image width in pixels. Default value is 1920.
+            height (int): The image height in pixels. Default value is 1080.
+            scale (float): The scale of the image. Default value is 1.
+            timeout (float): The seconds the rendering may take. Default value is the timeout of the pool.
+
+        Returns:
+            concurrent.futures.Future: The future of the image bytes.
+
+        Raises:
+            ValueError: If the image format is unknown.
+        """
+        _check_format(image_format)
+        future = Future()
+        job = (figure_json(figure), image_format, width, height, scale)
+        self._jobs.put((future, job, self.timeout if timeout is None else timeout))
+        return future
+
+    def export(self, figure, image_format="png", width=1920, height=1080, scale=1):
+        """
+        Renders a figure and waits for the image, see `submit()`.
+
+        Returns:
+            bytes: The image.
+        """
+        return self.submit(figure, image_format, width, height, scale).result()
+
+    def close(self) -> None:
+        """
+        Stops the workers after the queued jobs.
+        """
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> "ExportPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _spawn(self) -> tuple:
+        connection, worker_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_serve, args=(worker_connection, self.renderer), daemon=True
+        )
+        process.start()
+        worker_connection.close()
+        return process, connection
+
+    def _dispatch(self) -> None:
+        """
+        Feeds the jobs of the queue to one worker process, replacing the process when it hangs or dies.
+        """
+        process, connection = self._spawn()
+        while (item := self._jobs.get()) is not None:
+            future, job, timeout = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            if not process.is_alive():
+                process, connection = self._spawn()
+            connection.send(job)
+            if not connection.poll(timeout):
+                process.kill()
+                process.join()
+                process, connection = self._spawn()
+                future.set_exception(
+                    TimeoutError(f"The image export took over {timeout} seconds")
+                )
+                continue
+            try:
+                succeeded, result = connection.recv()
+            except EOFError:
+                succeeded, result = False, "The export worker exited"
+            if succeeded:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(result))
+        if process.is_alive():
+            connection.send(None)
+            process.join(self.timeout)
+            process.kill()
+
+
+def _serve(connection, renderer) -> None:
+    """
+    Renders the jobs of a pool worker until the pool sends None.
+    """
+    try:
+        renderer(_warm_up_figure, "svg", 10, 10, 1)
+    except Exception:
+        pass
+    while (job := connection.recv()) is not None:
+        try:
+            connection.send((True, renderer(*job)))
+        except Exception as error:
+            connection.send((False, f"{type(error).__name__}: {error}"))
+
+
+class ExportServer:
+    """
+    Serves an export pool over HTTP, so short-lived scripts share its warm workers.
+
+    `POST /export?format=png&width=1920&height=1080&scale=1` with the figure JSON as the body answers with the
+    image. Point the scripts at the server with the SUPRES_EXPORT_URL environment variable, set to `url`.
+    """
+
+    def __init__(self, pool, host="127.0.0.1", port=0):
+        self.pool = pool
+        self.host = host
+        self.port = port
+        self._http_server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "ExportServer":
+        self._http_server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.port = self._http_server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "ExportServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _handler(self) -> type:
+        pool = self.pool
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                url = urllib.parse.urlsplit(self.path)
+                parameters = dict(urllib.parse.parse_qsl(url.query))
+                figure = self.rfile.read(int(self.headers["Content-Length"])).decode()
+                image_format = parameters.get("format", "png")
+                try:
+                    if url.path != "/export":
+                        raise LookupError(f"Unknown path {url.path}")
+                    image = pool.submit(
+                        figure,
+                        image_format,
+                        int(parameters.get("width", 1920)),
+                        int(parameters.get("height", 1080)),
+                        float(parameters.get("scale", 1)),
+                    ).result()
+                    status, content_type = 200, image_formats[image_format]
+                except Exception as error:
+                    statuses = {LookupError: 404, ValueError: 400, TimeoutError: 504}
+                    status = statuses.get(type(error), 500)
+                    image, content_type = str(error).encode(), "text/plain"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(image)))
+                self.end_headers()
+                self.wfile.write(image)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def default_pool(workers=1) -> ExportPool:
+    """
+    Returns the export pool of the process, started on first use and replaced by a larger one when it has fewer
+    than `workers` workers.
+    """
+    global _default_pool
+    if _default_pool is None:
+        atexit.register(_close_default_pool)
+    elif _default_pool.workers < workers:
+        _default_pool.close()
+    else:
+        return _default_pool
+    _default_pool = ExportPool(workers=workers)
+    return _default_pool
+
+
+def _close_default_pool() -> None:
+    if _default_pool is not None:
+        _default_pool.close()
+
+
+def export_image(figure, image_format="png", width=1920, height=1080, scale=1):
+    """
+    Renders a figure through the export server of the SUPRES_EXPORT_URL environment variable, or in the process
+    when no server is set, which costs a one-off script no more than `fig.write_image()`.
+
+    Returns:
+        bytes: The image.
+
+    Raises:
+        ValueError: If the image format is unknown.
+    """
+    url = os.environ.get("SUPRES_EXPORT_URL")
+    if not url:
+        _check_format(image_format)
+        return kaleido_render(figure_json(figure), image_format, width, height, scale)
+    query = urllib.parse.urlencode(
+        dict(format=image_format, width=width, height=height, scale=scale)
+    )
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/export?{query}",
+        data=figure_json(figure).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.read()
+    except urllib.error.HTTPError as error:
+        raise RuntimeError(
+            f"Image export failed with {error.code}: {error.read().decode()}"
+        ) from None
+
+
+def write_image(figure, path, width=1920, height=1080, scale=1) -> None:
+    """
+    Renders a figure with `export_image()` and writes it to a file, in the format of its extension.
+    """
+    image = export_image(figure, image_format_of(path), width, height, scale)
+    with open(path, "wb") as file:
+        file.write(image)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serves warm kaleido workers that export Plotly figures."
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    arguments = parser.parse_args()
+    with ExportPool(arguments.workers, arguments.timeout) as export_pool, ExportServer(
+        export_pool, port=arguments.port
+    ) as server:
+        print(f"SUPRES_EXPORT_URL={server.url}")
+        threading.Event().wait()
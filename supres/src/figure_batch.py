@@ -0,0 +1,98 @@
+# "legend" shows the legend rows as legend entries of dummy traces, "panel" as one text block beside the chart
+legend_modes = ("legend", "panel")
+
+
+class FigureBatch:
+    """
+    Collects the traces, shapes and annotations of a chart as plain dicts and adds them to a figure at once.
+
+    Every `fig.add_trace()`, `fig.add_shape()` and `fig.add_annotation()` call builds and validates a Plotly object
+    and updates the figure, and the charts make one such call per level and legend row. `apply()` adds the batch
+    with one `add_traces()` call and one `update_layout()` call, after the items already in the figure and in the
+    order they were collected, so the figure is the same as with the single calls.
+
+    In the "panel" legend mode, the legend rows are not traces but lines of a single annotation, which keeps the
+    figure small. The panel sits right of the plot area under the legend, in a right margin of `panel_width` pixels,
+    so it does not cover the latest candles or the level labels.
+    """
+
+    def __init__(
+        self,
+        legend_mode="legend",
+        panel_color="#D8D8D8",
+        panel_font_size=11,
+        panel_width=260,
+    ):
+        if legend_mode not in legend_modes:
+            raise ValueError(
+                f"Unknown legend mode {legend_mode!r}, use one of {legend_modes}"
+            )
+        self.legend_mode = legend_mode
+        self.panel_color = panel_color
+        self.panel_font_size = panel_font_size
+        self.panel_width = panel_width
+        self.traces = []
+        self.shapes = []
+        self.annotations = []
+        self.panel_rows = []
+
+    def add_trace(self, trace_type="scatter", **trace) -> None:
+        self.traces.append(dict(type=trace_type, **trace))
+
+    def add_legend_row(self, y, name, color, mode="lines", size=10) -> None:
+        """
+        Adds a row of text to the legend, as a trace that only shows in the legend, or to the panel.
+
+        Args:
+            y: The y value of the trace, a price on the chart.
+            name (str): The text of the row.
+            color (str): The color of the marker of the row.
+            mode (str): The Scatter mode, which sets the marker of the row. Default value is "lines".
+            size (int): The marker size. Default value is 10.
+        """
+        if self.legend_mode == "panel":
+            self.panel_rows.append(name)
+        else:
+            self.add_trace(
+                y=[y], name=name, mode=mode, marker=dict(color=color, size=size)
+            )
+
+    def add_shape(self, **shape) -> None:
+        self.shapes.append(shape)
+
+    def add_annotation(self, **annotation) -> None:
+        self.annotations.append(annotation)
+
+    def apply(self, fig):
+        """
+        Adds the collected items to a figure and empties the batch.
+
+        Returns:
+            plotly.graph_objects.Figure: The figure.
+        """
+        layout = {}
+        if self.panel_rows:
+            self.add_annotation(
+                text="<br>".join(self.panel_rows),
+                xref="paper",
+                yref="paper",
+                x=1.01,
+                y=0,
+                xanchor="left",
+                yanchor="bottom",
+                align="left",
+                showarrow=False,
+                bgcolor=self.panel_color,
+                font=dict(size=self.panel_font_size),
+            )
+            layout["margin"] = dict(r=max(fig.layout.margin.r or 0, self.panel_width))
+        if self.traces:
+            fig.add_traces(self.traces)
+        if self.shapes:
+            layout["shapes"] = fig.layout.shapes + tuple(self.shapes)
+        if self.annotations:
+            layout["annotations"] = fig.layout.annotations + tuple(self.annotations)
+        if layout:
+            fig.update_layout(layout)
+        self.traces, self.shapes, self.annotations, self.panel_rows = [], [], [], []
+        return fig
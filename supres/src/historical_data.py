@@ -1,17 +1,29 @@
 import sys
 import time
 import pandas as pd
-from binance.client import Client
+import binance_replay
+import exchange_info
 import frameselect
+import kline_downloader
+import kline_store
 
 
 class BinanceTicker:
-    def __init__(self, ticker_binance, time_frame_binance):
+    def __init__(self, ticker_binance, time_frame_binance, store=None, start=None):
         self.ticker = ticker_binance
         self.time_frame = time_frame_binance
-        # If you are living in the US, you need to use the binance.us API
-        # self.client = Client("", "", tld="us")
-        self.client = Client("", "", tld="com")
+        # The start date of the download, e.g. from frameselect.frame_select()
+        self.start = start
+        # Set SUPRES_KLINE_CACHE to a directory to reuse downloaded klines between runs
+        self.store = kline_store.default_store() if store is None else store
+        self._client = None
+        # Long histories are downloaded page by page in parallel
+        # Set SUPRES_BINANCE_API_URL to use a local stand-in, see binance_replay.py
+        self.downloader = kline_downloader.KlineDownloader(
+            base_url=binance_replay.api_url()
+        )
+        # The symbol list is downloaded once a day and shared with the other scripts
+        self.exchange_info = exchange_info.default_cache()
         self.file_name = self.ticker + ".csv"
         self.header_list = [
             "unix",
@@ -28,74 +40,115 @@ class BinanceTicker:
             "ignore",
         ]
 
+    @property
+    def client(self):
+        """
+        The Binance client, which is only created when it is used because it connects to Binance.
+        """
+        if self._client is None:
+            # If you are living in the US, you need to use the binance.us API
+            # self._client = binance_replay.make_client(tld="us")
+            self._client = binance_replay.make_client(tld="com")
+            self.exchange_info.client = self._client
+        return self._client
+
     def check_pair(self, ticker_symbol):
-        if self.client.get_symbol_info(ticker_symbol):
+        symbol_info = self.exchange_info.symbol_info(ticker_symbol)
+        if symbol_info:
             print("Pair found in Binance API.")
-            return self.client.get_symbol_info(ticker_symbol)
+            return symbol_info
         else:
             print("Pair is not found in Binance API.")
             exit()
 
-    def historical_data_write(self):
+    def historical_data_frame(self, start=None) -> pd.DataFrame:
         """
-        Writes historical data for a given ticker symbol to a CSV file.
+        Downloads the historical data of the ticker into a DataFrame.
+
+        Args:
+            start (int | str): The start time in milliseconds, or a date string such as "1 January, 2023". Default
+                value is the start given to the constructor.
+
+        Returns:
+            pandas.DataFrame: The unix, date, open, high, low, close and Volume USDT columns in chronological order,
+            with numeric prices.
         """
-        df = pd.DataFrame(
-            reversed(
-                user_ticker.client.get_historical_klines(
+        start = self.start if start is None else start
+        if self.store is None:
+            df = pd.DataFrame(
+                self.downloader.get_historical_klines(
                     symbol=self.ticker, interval=self.time_frame, start_str=start
-                )
-            ),
-            columns=self.header_list,
+                ),
+                columns=self.header_list,
+            )
+        else:
+            df = pd.DataFrame(
+                self.store.fetch(self.downloader, self.ticker, self.time_frame, start)
+            )
+        df = df[["unix", "open", "high", "low", "close", "Volume USDT"]].astype(
+            {
+                "unix": "int64",
+                "open": "float64",
+                "high": "float64",
+                "low": "float64",
+                "close": "float64",
+                "Volume USDT": "float64",
+            }
         )
         # Converting the unix time to a readable date format for today
-        date = pd.to_datetime(df["unix"], unit="ms")
-        df.insert(1, "date", date)
-        df.drop(
-            labels=[
-                "volume",
-                "close time",
-                "tradecount",
-                "taker buy vol",
-                "taker buy quote vol",
-                "ignore",
-            ],
-            inplace=True,
-            axis=1,
-        )
+        df.insert(1, "date", pd.to_datetime(df["unix"], unit="ms"))
+        return df
+
+    def historical_data_write(self):
+        """
+        Writes historical data for a given ticker symbol to a CSV file, newest candle first.
+        """
+        df = self.historical_data_frame().iloc[::-1]
         with open(self.file_name, "w") as f:
             df.to_csv(f, index=False)
         print("Data writing:", self.file_name)
 
 
-"""
-If you want to run the script from the command line,
-there are a couple of ways you can do it.
-The first way is to use the following command:
-"python main.py BTCUSDT 1H"
-The second way to run the script from the command line is
-without any arguments. To do this, simply enter the following command:
-"python main.py"
-and then enter the ticker and time frame in the command line.
-Also, you can run ../miniscripts/multiple_run.py to run the script for all the
-given pairs in coin_list.csv
-"""
+def main(argv=None) -> BinanceTicker:
+    """
+    If you want to run the script from the command line,
+    there are a couple of ways you can do it.
+    The first way is to use the following command:
+    "python main.py BTCUSDT 1H"
+    The second way to run the script from the command line is
+    without any arguments. To do this, simply enter the following command:
+    "python main.py"
+    and then enter the ticker and time frame in the command line.
+    Also, you can run ../miniscripts/multiple_run.py to run the script for all the
+    given pairs in coin_list.csv
 
-if len(sys.argv) == 3:
-    ticker, frame_s = sys.argv[1].upper(), sys.argv[2].upper()
-else:
-    # Example input:"BTCUSDT 1H", "ETHBTC 3D", "BNBUSDT 15M"
+    Args:
+        argv (list[str]): The command line arguments. Default value is `sys.argv[1:]`.
+
+    Returns:
+        BinanceTicker: The ticker, after checking that Binance lists the pair.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 2:
+        ticker, frame_s = argv[0].upper(), argv[1].upper()
+    else:
+        # Example input:"BTCUSDT 1H", "ETHBTC 3D", "BNBUSDT 15M"
+        print(
+            "Example input: BTCUSDT 1W, ETHBTC 3D, BNBUSDT 1H, ATOMUSDT 15M\n"
+            "Ticker and Time Frame: "
+        )
+        ticker, frame_s = str(input().upper()).split()
+    binance_api_runtime = time.perf_counter()
+    time_frame, start = frameselect.frame_select(frame_s)
+    user_ticker = BinanceTicker(ticker, time_frame, start=start)
+    user_ticker.check_pair(ticker)
     print(
-        "Example input: BTCUSDT 1W, ETHBTC 3D, BNBUSDT 1H, ATOMUSDT 15M\n"
-        "Ticker and Time Frame: "
+        "Binance API historical data runtime: ",
+        time.perf_counter() - binance_api_runtime,
+        "seconds",
     )
-    ticker, frame_s = str(input().upper()).split()
-binance_api_runtime = time.perf_counter()
-time_frame, start = frameselect.frame_select(frame_s)
-user_ticker = BinanceTicker(ticker, time_frame)
-user_ticker.check_pair(ticker)
-print(
-    "Binance API historical data runtime: ",
-    time.perf_counter() - binance_api_runtime,
-    "seconds",
-)
+    return user_ticker
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,330 @@
-import pandas_ta.momentum as ta
+from collections import deque
+
+import numpy as np
+
+# The largest power that a block of the linear filter may scale by, far below the float64 overflow
+_block_scale = 1e150
 
 
 def indicators(
     df_sma, ma_length1, ma_length2, ma_length3
-) -> tuple[tuple, tuple, tuple, tuple]:
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
     This function calculates technical indicators for a given pandas DataFrame containing a moving average column.
 
     Args:
-        df_sma: A DataFrame with a column named "sma".
+        df_sma: A DataFrame with a "close" column, a dict of columns or candles.Candles.
         ma_length1: The length of the first simple moving average (SMA).
         ma_length2: The length of the second simple moving average (SMA).
         ma_length3: The length of the third simple moving average (SMA).
 
     Returns:
-        tuple: A tuple of four tuples, where each inner tuple represents the respective calculated indicator:
-            - sma_1, sma_2, sma_3: A tuple of SMA values for the first, second, and third moving averages.
-            - rsi_tuple: A tuple of RSI values calculated using pandas_ta library.
-    """
-    sma_1 = tuple(df_sma.ta.sma(ma_length1))
-    sma_2 = tuple(df_sma.ta.sma(ma_length2))
-    sma_3 = tuple(df_sma.ta.sma(ma_length3))
-    rsi_tuple = tuple(ta.rsi(df_sma["close"][:-1]))
-    return sma_1, sma_2, sma_3, rsi_tuple
+        tuple: A tuple of four arrays, where each array represents the respective calculated indicator:
+            - sma_1, sma_2, sma_3: The SMA values for the first, second, and third moving averages.
+            - rsi_values: The RSI values of every close but the latest one.
+    """
+    close = np.asarray(df_sma["close"], dtype=float)
+    sma_1, sma_2, sma_3 = smas(close, (ma_length1, ma_length2, ma_length3))
+    return sma_1, sma_2, sma_3, rsi(close[:-1])
+
+
+def smas(close, lengths) -> list[np.ndarray]:
+    """
+    Calculates simple moving averages of several lengths from one cumulative sum of the close series.
+
+    Args:
+        close (array-like): The close prices in chronological order.
+        lengths (Iterable[int]): The lengths of the moving averages.
+
+    Returns:
+        list[np.ndarray]: The moving averages, NaN until a full window is available, like pandas_ta.sma().
+    """
+    close = np.asarray(close, dtype=float)
+    # Measuring from the first close keeps the cumulative sum small and the differences exact
+    base = close[0] if len(close) else 0.0
+    cumulative = np.concatenate(([0.0], np.cumsum(close - base)))
+    averages = []
+    for length in lengths:
+        average = np.full(len(close), np.nan)
+        if length <= len(close):
+            average[length - 1 :] = (
+                cumulative[length:] - cumulative[:-length]
+            ) / length + base
+        averages.append(average)
+    return averages
+
+
+def sma(close, length) -> np.ndarray:
+    return smas(close, (length,))[0]
+
+
+def ema(close, length) -> np.ndarray:
+    """
+    Calculates the exponential moving average like pandas_ta.ema(): seeded with the SMA of the first `length` closes
+    and then smoothed with 2 / (length + 1).
+
+    Args:
+        close (array-like): The close prices in chronological order. Leading NaN values are skipped.
+        length (int): The length of the moving average.
+
+    Returns:
+        np.ndarray: The moving average, NaN before the seed.
+    """
+    close = np.asarray(close, dtype=float)
+    average = np.full(len(close), np.nan)
+    first = _first_valid(close)
+    seed = first + length - 1
+    if seed >= len(close):
+        return average
+    alpha = 2 / (length + 1)
+    average[seed] = close[first : seed + 1].mean()
+    average[seed + 1 :] = _linear_filter(
+        alpha * close[seed + 1 :], 1 - alpha, average[seed]
+    )
+    return average
+
+
+def rma(values, length) -> np.ndarray:
+    """
+    Calculates the moving average that pandas_ta uses for the RSI, an adjusted exponential moving average with
+    alpha = 1 / length that needs `length` values.
+    """
+    values = np.asarray(values, dtype=float)
+    average = np.full(len(values), np.nan)
+    first = _first_valid(values)
+    if first + length > len(values):
+        return average
+    # The adjusted average divides the smoothed values by the smoothed weights
+    decay = 1 - 1 / length
+    weighted = _linear_filter(values[first:], decay, 0.0)
+    weights = _linear_filter(np.ones(len(values) - first), decay, 0.0)
+    average[first + length - 1 :] = (weighted / weights)[length - 1 :]
+    return average
+
+
+def rsi(close, length=14) -> np.ndarray:
+    """
+    Calculates the relative strength index like pandas_ta.rsi().
+
+    Args:
+        close (array-like): The close prices in chronological order.
+        length (int): The length of the averages of gains and losses. Default value is 14.
+
+    Returns:
+        np.ndarray: The RSI values between 0 and 100, NaN for the first `length` closes.
+    """
+    change = np.diff(np.asarray(close, dtype=float), prepend=np.nan)
+    # np.maximum keeps the leading NaN, so the averages start at the first change
+    gain = rma(np.maximum(change, 0), length)
+    loss = rma(np.maximum(-change, 0), length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 * gain / (gain + loss)
+
+
+def macd(
+    close, fast=12, slow=26, signal=9
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates the MACD like pandas_ta.macd().
+
+    Args:
+        close (array-like): The close prices in chronological order.
+        fast (int): The length of the fast EMA. Default value is 12.
+        slow (int): The length of the slow EMA. Default value is 26.
+        signal (int): The length of the signal EMA. Default value is 9.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The MACD line, its histogram and its signal line, which are the
+        MACD_12_26_9, MACDh_12_26_9 and MACDs_12_26_9 columns of pandas_ta.
+    """
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, line - signal_line, signal_line
+
+
+class _IndicatorState:
+    """
+    The seeding of the incremental indicators. `update()` commits a closed candle and `peek()` returns the value
+    that the in-progress candle would give without changing the state.
+    """
+
+    def seed(self, closes):
+        """
+        Feeds the closes of the history, oldest first, and returns the latest value.
+        """
+        for close in np.asarray(closes, dtype=float):
+            self.update(close)
+        return self.value
+
+
+class SmaState(_IndicatorState):
+    """
+    The simple moving average of a stream of closes, updated in O(1) per candle.
+
+    The running sum is the same cumulative sum that `smas()` takes, measured from the first close, so the values are
+    the same as the batch values over the same closes.
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.value = np.nan
+        self._base = None
+        self._cumulative = 0.0
+        # The cumulative sums of the last `length` closes, starting with the empty sum
+        self._window = deque([0.0], maxlen=length)
+
+    def peek(self, close) -> float:
+        return self._next(float(close))[0]
+
+    def update(self, close) -> float:
+        self.value, self._cumulative = self._next(float(close))
+        if self._base is None:
+            self._base = float(close)
+        self._window.append(self._cumulative)
+        return self.value
+
+    def _next(self, close) -> tuple[float, float]:
+        base = close if self._base is None else self._base
+        cumulative = self._cumulative + (close - base)
+        if len(self._window) < self.length:
+            return np.nan, cumulative
+        return (cumulative - self._window[0]) / self.length + base, cumulative
+
+
+class EmaState(_IndicatorState):
+    """
+    The exponential moving average of a stream of closes like `ema()`, seeded with the mean of the first `length`
+    closes. Leading NaN values are skipped.
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.value = np.nan
+        self._alpha = 2 / (length + 1)
+        self._warm_up = []
+
+    def peek(self, close) -> float:
+        close = float(close)
+        if len(self._warm_up) < self.length:
+            if np.isnan(close) or len(self._warm_up) < self.length - 1:
+                return np.nan
+            return float(np.mean(self._warm_up + [close]))
+        return (1 - self._alpha) * self.value + self._alpha * close
+
+    def update(self, close) -> float:
+        value = self.peek(close)
+        if len(self._warm_up) < self.length and not np.isnan(close):
+            self._warm_up.append(float(close))
+        self.value = value
+        return value
+
+
+class _RmaState:
+    """
+    The adjusted exponential moving average of `rma()`, as running sums of the weighted values and of the weights.
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.count = 0
+        self.weighted = self.weights = 0.0
+
+    def next(self, value) -> tuple[float, float, float]:
+        decay = 1 - 1 / self.length
+        weighted = value + decay * self.weighted
+        weights = 1 + decay * self.weights
+        average = weighted / weights if self.count + 1 >= self.length else np.nan
+        return average, weighted, weights
+
+
+class RsiState(_IndicatorState):
+    """
+    The relative strength index of a stream of closes like `rsi()`.
+    """
+
+    def __init__(self, length=14):
+        self.length = length
+        self.value = np.nan
+        self._last_close = None
+        self._gain = _RmaState(length)
+        self._loss = _RmaState(length)
+
+    def peek(self, close) -> float:
+        return self._next(float(close))[0]
+
+    def update(self, close) -> float:
+        self.value, gain, loss = self._next(float(close))
+        if self._last_close is not None:
+            for state, (_, weighted, weights) in (
+                (self._gain, gain),
+                (self._loss, loss),
+            ):
+                state.count += 1
+                state.weighted, state.weights = weighted, weights
+        self._last_close = float(close)
+        return self.value
+
+    def _next(self, close) -> tuple[float, tuple, tuple]:
+        if self._last_close is None:
+            return np.nan, None, None
+        change = close - self._last_close
+        gain = self._gain.next(max(change, 0.0))
+        loss = self._loss.next(max(-change, 0.0))
+        if np.isnan(gain[0]) or gain[0] + loss[0] == 0:
+            return np.nan, gain, loss
+        return 100 * gain[0] / (gain[0] + loss[0]), gain, loss
+
+
+class MacdState(_IndicatorState):
+    """
+    The MACD of a stream of closes like `macd()`. The values are `(macd, histogram, signal)` tuples.
+    """
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.value = (np.nan, np.nan, np.nan)
+        self._fast = EmaState(fast)
+        self._slow = EmaState(slow)
+        self._signal = EmaState(signal)
+
+    def peek(self, close) -> tuple[float, float, float]:
+        line = self._fast.peek(close) - self._slow.peek(close)
+        return self._values(line, self._signal.peek(line))
+
+    def update(self, close) -> tuple[float, float, float]:
+        line = self._fast.update(close) - self._slow.update(close)
+        self.value = self._values(line, self._signal.update(line))
+        return self.value
+
+    @staticmethod
+    def _values(line, signal_line) -> tuple[float, float, float]:
+        return line, line - signal_line, signal_line
+
+
+def _first_valid(values) -> int:
+    valid = np.flatnonzero(~np.isnan(values))
+    return int(valid[0]) if len(valid) else len(values)
+
+
+def _linear_filter(values, decay, initial) -> np.ndarray:
+    """
+    Evaluates y[t] = decay * y[t - 1] + values[t], starting from y[-1] = initial.
+
+    Within a block of B values the recursion has the closed form y[j] = decay**j * (decay * y[-1] +
+    cumsum(values * decay**-k)[j]), so each block is a few array operations and only the carry between blocks is a
+    Python loop. The block size keeps decay**-B far from overflowing.
+    """
+    values = np.asarray(values, dtype=float)
+    if decay <= 0:
+        return values.copy()
+    block = max(1, min(len(values), int(np.log(_block_scale) / -np.log(decay))))
+    powers = decay ** np.arange(block)
+    result = np.empty(len(values))
+    carry = initial
+    for start in range(0, len(values), block):
+        chunk = values[start : start + block]
+        count = len(chunk)
+        result[start : start + count] = powers[:count] * (
+            decay * carry + np.cumsum(chunk / powers[:count])
+        )
+        carry = result[start + count - 1]
+    return result
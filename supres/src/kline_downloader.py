@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import kline_store
+
+# The length of the fixed Binance kline intervals. Monthly klines have no fixed length.
+interval_milliseconds = {
+    "1m": 60 * 1000,
+    "3m": 3 * 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "30m": 30 * 60 * 1000,
+    "1h": 3600 * 1000,
+    "2h": 2 * 3600 * 1000,
+    "4h": 4 * 3600 * 1000,
+    "6h": 6 * 3600 * 1000,
+    "8h": 8 * 3600 * 1000,
+    "12h": 12 * 3600 * 1000,
+    "1d": 24 * 3600 * 1000,
+    "3d": 3 * 24 * 3600 * 1000,
+    "1w": 7 * 24 * 3600 * 1000,
+}
+
+
+class RequestWeightLimiter:
+    """
+    Keeps the request weight of all download threads below the Binance limit per minute.
+
+    Binance counts the weight per calendar minute and reports the used weight in the X-MBX-USED-WEIGHT-1M header
+    of every response, which replaces the local count when it is higher. After a 429 or 418 response every thread
+    waits until the Retry-After time has passed.
+    """
+
+    def __init__(self, limit=6000, window=60.0, clock=time.time, sleep=time.sleep):
+        self.limit = limit
+        self.window = window
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._used = 0
+        self._paused_until = 0.0
+
+    def acquire(self, weight) -> None:
+        """
+        Waits until a request of the given weight fits into the current window and counts it.
+        """
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._start_window(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._used + weight <= self.limit:
+                    self._used += weight
+                    return
+                else:
+                    wait = self._window_start + self.window - now
+            self._sleep(wait)
+
+    def report(self, used_weight) -> None:
+        """
+        Takes over the used weight that Binance reported for the current window.
+        """
+        with self._lock:
+            self._start_window(self._clock())
+            self._used = max(self._used, used_weight)
+
+    def pause(self, seconds) -> None:
+        """
+        Stops all requests for the given number of seconds.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def _start_window(self, now) -> None:
+        window_start = now // self.window * self.window
+        if window_start > self._window_start:
+            self._window_start = window_start
+            self._used = 0
+
+
+class KlineDownloader:
+    """
+    Downloads long kline histories from the Binance REST API with several requests in flight.
+
+    The time range is split into pages of `page_size` klines up front, and the pages are fetched by a bounded
+    thread pool that shares one `RequestWeightLimiter`. `get_historical_klines()` has the signature of the
+    python-binance client method, so a downloader can be passed to `KlineStore.fetch()` in place of the client.
+    """
+
+    def __init__(
+        self,
+        base_url="https://api.binance.com",
+        max_workers=4,
+        page_size=1000,
+        request_weight=2,
+        limiter=None,
+        retries=5,
+        timeout=10.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.request_weight = request_weight
+        self.limiter = RequestWeightLimiter() if limiter is None else limiter
+        self.retries = retries
+        self.timeout = timeout
+
+    def get_historical_klines(
+        self, symbol, interval, start_str, end_str=None
+    ) -> list[list]:
+        """
+        Downloads the klines of a symbol and interval between two times.
+
+        Args:
+            symbol (str): The ticker symbol, e.g. "BTCUSDT".
+            interval (str): The Binance kline interval, e.g. "15m".
+            start_str (int | str): The start time in milliseconds, or a date string such as "1 January, 2023".
+            end_str (int | str): The end time in milliseconds or as a date string. Default value is now.
+
+        Returns:
+            list[list]: The klines as returned by the Binance API, in chronological order and without duplicates.
+        """
+        start = _milliseconds(start_str)
+        end = int(time.time() * 1000) if end_str is None else _milliseconds(end_str)
+        try:
+            page_length = interval_milliseconds[interval] * self.page_size
+        except KeyError:
+            raise ValueError(f"Unsupported kline interval: {interval}") from None
+        pages = [
+            (page_start, min(page_start + page_length - 1, end))
+            for page_start in range(start, end + 1, page_length)
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(
+                lambda page: self._fetch_page(symbol.upper(), interval, *page), pages
+            )
+            klines = {int(kline[0]): kline for page in results for kline in page}
+        return [klines[open_time] for open_time in sorted(klines)]
+
+    def download(self, symbol, interval, start, end=None) -> dict[str, np.ndarray]:
+        """
+        Downloads the klines of a symbol and interval between two times as typed columns.
+
+        Returns:
+            dict[str, np.ndarray]: The klines as columns in chronological order, see `kline_store.kline_columns`.
+        """
+        return kline_store.to_columns(
+            self.get_historical_klines(symbol, interval, start, end)
+        )
+
+    def _fetch_page(self, symbol, interval, start, end) -> list[list]:
+        """
+        Requests one page of klines, waiting for the weight limit and retrying after rate limit responses.
+        """
+        query = urllib.parse.urlencode(
+            {
+                "symbol": symbol,
+                "interval": interval,
+                "startTime": start,
+                "endTime": end,
+                "limit": self.page_size,
+            }
+        )
+        url = f"{self.base_url}/api/v3/klines?{query}"
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire(self.request_weight)
+            try:
+                with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                    self._report_weight(response.headers)
+                    return json.load(response)
+            except urllib.error.HTTPError as error:
+                self._report_weight(error.headers)
+                # 429 asks to back off, 418 means the IP was banned for ignoring a 429
+                if error.code not in (418, 429) or attempt == self.retries:
+                    raise
+                self.limiter.pause(float(error.headers.get("Retry-After", 1)))
+
+    def _report_weight(self, headers) -> None:
+        used_weight = headers.get("X-MBX-USED-WEIGHT-1M") if headers else None
+        if used_weight is not None:
+            self.limiter.report(int(used_weight))
+
+
+def _milliseconds(value) -> int:
+    if isinstance(value, str):
+        from binance.helpers import date_to_milliseconds
+
+        return date_to_milliseconds(value)
+    return int(value)
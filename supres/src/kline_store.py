@@ -0,0 +1,156 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# The Binance kline fields, without the trailing "ignore" field
+kline_columns = (
+    ("unix", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+    ("close time", np.int64),
+    ("Volume USDT", np.float64),
+    ("tradecount", np.int64),
+    ("taker buy vol", np.float64),
+    ("taker buy quote vol", np.float64),
+)
+
+
+class KlineStore:
+    """
+    An on-disk cache of closed klines, with one columnar `.npz` file per symbol and interval.
+
+    Only closed klines are stored. A fetch reads the cached klines and asks Binance only for the klines that are
+    missing before or after them.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, symbol, interval) -> str:
+        return os.path.join(self.directory, f"{symbol.upper()}_{interval}.npz")
+
+    def load(self, symbol, interval) -> dict[str, np.ndarray]:
+        """
+        Returns the cached klines of a symbol and interval as columns, which are empty if nothing is cached.
+        """
+        try:
+            with np.load(self.path(symbol, interval)) as cached:
+                return {name: cached[name] for name, _ in kline_columns}
+        except FileNotFoundError:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in kline_columns}
+
+    def append(self, symbol, interval, klines) -> dict[str, np.ndarray]:
+        """
+        Adds klines to the cache and returns all cached klines.
+
+        The klines are merged by open time, sorted, and written to a temporary file that replaces the cache file
+        in one step, so readers never see a partly written file.
+
+        Args:
+            symbol (str): The ticker symbol, e.g. "BTCUSDT".
+            interval (str): The Binance kline interval, e.g. "1h".
+            klines (list[list]): The klines as returned by the Binance API.
+
+        Returns:
+            dict[str, np.ndarray]: The cached klines as columns.
+        """
+        columns = self.load(symbol, interval)
+        if not klines:
+            return columns
+        new_columns = to_columns(klines)
+        merged = {
+            name: np.concatenate((new_columns[name], columns[name]))
+            for name, _ in kline_columns
+        }
+        # np.unique keeps the first occurrence, which is the newly fetched kline
+        _, keep = np.unique(merged["unix"], return_index=True)
+        merged = {name: values[keep] for name, values in merged.items()}
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, suffix=".npz.tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as temporary_file:
+                np.savez(temporary_file, **merged)
+            os.replace(temporary_path, self.path(symbol, interval))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        return merged
+
+    def fetch(self, client, symbol, interval, start) -> dict[str, np.ndarray]:
+        """
+        Returns the klines of a symbol and interval from `start` until now, downloading only what is not cached.
+
+        Args:
+            client (binance.client.Client): The Binance API client.
+            symbol (str): The ticker symbol, e.g. "BTCUSDT".
+            interval (str): The Binance kline interval, e.g. "1h".
+            start (int | str): The start time in milliseconds, or a date string such as "1 January, 2023".
+
+        Returns:
+            dict[str, np.ndarray]: The klines as columns in chronological order, including the kline that is still
+            open.
+        """
+        if isinstance(start, str):
+            from binance.helpers import date_to_milliseconds
+
+            start = date_to_milliseconds(start)
+        columns = self.load(symbol, interval)
+        if len(columns["unix"]) and columns["close time"][-1] + 1 < start:
+            # The cache ends before the start, and the klines in between would be downloaded for nothing. It is
+            # dropped instead of leaving a hole in it.
+            os.remove(self.path(symbol, interval))
+            columns = self.load(symbol, interval)
+        klines = []
+        if not len(columns["unix"]) or columns["unix"][0] > start:
+            klines += client.get_historical_klines(
+                symbol=symbol,
+                interval=interval,
+                start_str=start,
+                end_str=int(columns["unix"][0]) - 1 if len(columns["unix"]) else None,
+            )
+        if len(columns["unix"]):
+            klines += client.get_historical_klines(
+                symbol=symbol,
+                interval=interval,
+                start_str=int(columns["close time"][-1]) + 1,
+            )
+        now = time.time() * 1000
+        closed = [kline for kline in klines if int(kline[6]) < now]
+        columns = self.append(symbol, interval, closed)
+        if len(closed) < len(klines):
+            open_kline = to_columns(klines[-1:])
+            if not len(columns["unix"]) or open_kline["unix"][0] > columns["unix"][-1]:
+                columns = {
+                    name: np.concatenate((columns[name], open_kline[name]))
+                    for name, _ in kline_columns
+                }
+        keep = columns["unix"] >= start
+        return {name: values[keep] for name, values in columns.items()}
+
+
+def to_columns(klines) -> dict[str, np.ndarray]:
+    """
+    Converts klines as returned by the Binance API into typed columns.
+    """
+    return {
+        name: np.array([kline[position] for kline in klines], dtype=dtype)
+        if klines
+        else np.empty(0, dtype=dtype)
+        for position, (name, dtype) in enumerate(kline_columns)
+    }
+
+
+def default_store() -> KlineStore | None:
+    """
+    Returns the kline store in the directory named by the SUPRES_KLINE_CACHE environment variable, or None when the
+    variable is not set.
+    """
+    directory = os.environ.get("SUPRES_KLINE_CACHE")
+    return KlineStore(directory) if directory else None
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+
+import binance_replay
+from candles import Candles
+from kline_store import kline_columns
+
+# The fields of a websocket kline payload, in the order of `kline_store.kline_columns`
+stream_fields = ("t", "o", "h", "l", "c", "v", "T", "q", "n", "V", "Q")
+
+
+class KlineBuffer:
+    """
+    A fixed-capacity ring buffer of the closed klines of one symbol and interval, stored as typed columns.
+
+    Every kline is written twice, at its ring position and `capacity` places after it, so the latest klines are
+    always one contiguous slice of each column and `columns()` returns views instead of copies.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._columns = {
+            name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in kline_columns
+        }
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, kline) -> bool:
+        """
+        Adds a closed kline, given as a websocket kline payload or a REST kline list.
+
+        Returns:
+            bool: False if the kline is not newer than the latest kline in the buffer, which is then ignored.
+        """
+        values = (
+            [kline[field] for field in stream_fields]
+            if isinstance(kline, dict)
+            else kline[: len(kline_columns)]
+        )
+        if self._count and int(values[0]) <= self._columns["unix"][self._last()]:
+            return False
+        for (name, dtype), value in zip(kline_columns, values):
+            column = self._columns[name]
+            column[self._next] = column[self._next + self.capacity] = dtype(value)
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        return True
+
+    def extend(self, columns) -> None:
+        """
+        Adds closed klines given as columns, e.g. from `kline_store.KlineStore.fetch()`.
+        """
+        for kline in zip(*(columns[name] for name, _ in kline_columns)):
+            self.append(kline)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Returns read-only views of the klines in the buffer, oldest first.
+
+        The views share the memory of the buffer, so the next `append()` calls overwrite the klines they show. Copy
+        the columns to keep them past the next kline.
+        """
+        start = self._next if self._count == self.capacity else 0
+        views = {}
+        for name, column in self._columns.items():
+            view = column[start : start + self._count]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def candles(self) -> Candles:
+        """
+        Returns the klines in the buffer as `candles.Candles` that share the memory of `columns()`, e.g. for
+        `Supres.analyze()`.
+        """
+        return Candles.from_frame(self.columns())
+
+    def close_time(self) -> int | None:
+        """
+        Returns the close time of the latest kline in milliseconds, or None if the buffer is empty.
+        """
+        return int(self._columns["close time"][self._last()]) if self._count else None
+
+    def _last(self) -> int:
+        return (self._next - 1) % self.capacity
+
+
+class KlineStream:
+    """
+    Keeps a `KlineBuffer` of closed klines for every symbol and interval of a watchlist, fed by Binance combined
+    kline streams.
+
+    The streams are spread over as many websocket connections as needed, and each connection reconnects with the
+    `async for websocket in connect(url)` pattern of `force_liquidation.py`. The klines that close while a
+    connection is down are downloaded with `client`, a python-binance client or a `KlineDownloader`, when it
+    reconnects. A closed kline that does not follow the latest one of its buffer calls `on_gap` with the symbol, the
+    interval and the first and last open times of the missing klines in milliseconds. The buffers can be passed to
+    the analysis as they are, e.g. `Supres.analyze(stream.buffers["BTCUSDT", "1h"].columns(), "1h", "BTCUSDT")`.
+    """
+
+    def __init__(
+        self,
+        symbols,
+        intervals,
+        capacity=1000,
+        on_close=None,
+        streams_per_connection=200,
+        client=None,
+        on_gap=None,
+    ):
+        self.buffers = {
+            (symbol.upper(), interval): KlineBuffer(capacity)
+            for symbol in symbols
+            for interval in intervals
+        }
+        self.on_close = on_close
+        self.streams_per_connection = streams_per_connection
+        self.client = client
+        self.on_gap = on_gap
+
+    def urls(self) -> list[str]:
+        """
+        Returns the combined stream URLs of the watchlist.
+        """
+        return [
+            binance_replay.websocket_url(
+                "/stream?streams="
+                + "/".join(
+                    f"{symbol.lower()}@kline_{interval}" for symbol, interval in keys
+                )
+            )
+            for keys in self._connection_keys()
+        ]
+
+    def handle(self, message) -> KlineBuffer | None:
+        """
+        Adds the kline of a combined stream message to its buffer if the kline is closed.
+
+        Returns:
+            KlineBuffer | None: The buffer that received a new kline, or None.
+        """
+        kline = json.loads(message)["data"]["k"]
+        buffer = self.buffers.get((kline["s"], kline["i"]))
+        if buffer is None or not kline["x"]:
+            return None
+        close_time = buffer.close_time()
+        if close_time is not None and kline["t"] > close_time + 1 and self.on_gap:
+            self.on_gap(kline["s"], kline["i"], close_time + 1, kline["t"] - 1)
+        if not buffer.append(kline):
+            return None
+        if self.on_close is not None:
+            self.on_close(kline["s"], kline["i"], buffer)
+        return buffer
+
+    def backfill(self, keys) -> None:
+        """
+        Adds the klines that closed after the latest kline of some buffers, downloaded with `client`.
+
+        Args:
+            keys (Iterable[tuple[str, str]]): The symbols and intervals of the buffers.
+        """
+        for symbol, interval in keys:
+            buffer = self.buffers[symbol, interval]
+            if not len(buffer):
+                continue
+            klines = self.client.get_historical_klines(
+                symbol=symbol, interval=interval, start_str=buffer.close_time() + 1
+            )
+            now = time.time() * 1000
+            added = [buffer.append(kline) for kline in klines if int(kline[6]) < now]
+            if any(added) and self.on_close is not None:
+                self.on_close(symbol, interval, buffer)
+
+    async def run(self) -> None:
+        """
+        Consumes the streams until it is cancelled.
+        """
+        await asyncio.gather(
+            *(
+                self._consume(url, keys)
+                for url, keys in zip(self.urls(), self._connection_keys())
+            )
+        )
+
+    def _connection_keys(self) -> list[list[tuple[str, str]]]:
+        """
+        Splits the symbols and intervals of the buffers into the streams of each connection.
+        """
+        keys = list(self.buffers)
+        return [
+            keys[first : first + self.streams_per_connection]
+            for first in range(0, len(keys), self.streams_per_connection)
+        ]
+
+    async def _consume(self, url, keys) -> None:
+        from websockets import ConnectionClosed, connect
+
+        connected = False
+        async for websocket in connect(url):
+            if connected and self.client is not None:
+                await asyncio.to_thread(self.backfill, keys)
+            connected = True
+            try:
+                async for message in websocket:
+                    self.handle(message)
+            except ConnectionClosed:
+                continue
+            finally:
+                await websocket.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    import support_resistance
+
+    def print_levels(symbol, interval, buffer) -> None:
+        columns = buffer.columns()
+        support_list, resistance_list = support_resistance.pivots(
+            columns["low"], columns["high"], 3, 2
+        )
+        print(
+            f"{symbol} {interval} close {columns['close'][-1]}: "
+            f"{len(support_list)} supports, {len(resistance_list)} resistances"
+        )
+
+    # Example: "python kline_stream.py 1m BTCUSDT ETHUSDT"
+    asyncio.run(KlineStream(sys.argv[2:], sys.argv[1:2], on_close=print_levels).run())
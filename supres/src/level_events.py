@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class LevelEvent:
+    time: int
+    price: float
+    kind: str
+    role: str
+
+
+def level_events(levels, times, high, low, close) -> list[LevelEvent]:
+    """
+    Finds every break, retest and flip of the given levels over a history of candles.
+
+    A level breaks when two consecutive closes are on different sides of it. After a break, a candle that reaches
+    the level from the side price broke to and closes on that side again retests it. The first retest after a break
+    is reported as a flip, because it confirms that the level changed role. The role of an event is "support" when
+    price is above the level and "resistance" when it is below.
+
+    Every candle affects a contiguous run of the sorted levels, so the runs are found with `searchsorted` and the
+    events are matched to the preceding break of their level with one sort over all runs.
+
+    Args:
+        levels (array-like): The level prices, in any order.
+        times (array-like): The open times of the candles in chronological order.
+        high (array-like): The high prices of the candles.
+        low (array-like): The low prices of the candles.
+        close (array-like): The close prices of the candles.
+
+    Returns:
+        list[LevelEvent]: The events in chronological order, and by price within a candle.
+    """
+    levels = np.unique(np.asarray(levels, dtype=float))
+    times = np.asarray(times)
+    high = np.asarray(high, dtype=float)[1:]
+    low = np.asarray(low, dtype=float)[1:]
+    close = np.asarray(close, dtype=float)
+    previous_close, close = close[:-1], close[1:]
+    lower_close = np.minimum(previous_close, close)
+    upper_close = np.maximum(previous_close, close)
+    runs = (
+        # Breaks, with the direction price broke to
+        (lower_close, upper_close, "left", np.sign(close - previous_close), True),
+        # Touches from above and from below
+        (low, lower_close, "left", np.ones(len(close)), False),
+        (upper_close, high, "right", -np.ones(len(close)), False),
+    )
+    candle, level, side, is_break = [], [], [], []
+    for lower, upper, upper_side, direction, breaks in runs:
+        first = np.searchsorted(levels, lower, side="left")
+        last = np.maximum(np.searchsorted(levels, upper, side=upper_side), first)
+        count = last - first
+        run_candle = np.repeat(np.arange(len(close)), count)
+        run_start = np.repeat(np.cumsum(count) - count, count)
+        candle.append(run_candle)
+        level.append(first[run_candle] + np.arange(count.sum()) - run_start)
+        side.append(direction[run_candle])
+        is_break.append(np.full(count.sum(), breaks))
+    candle, level, side, is_break = (
+        np.concatenate(values) for values in (candle, level, side, is_break)
+    )
+    # Walk each level through time and look back to its latest break
+    order = np.lexsort((candle, level))
+    candle, level, side, is_break = (
+        values[order] for values in (candle, level, side, is_break)
+    )
+    position = np.arange(len(order))
+    last_break = np.maximum.accumulate(np.where(is_break, position, -1))
+    retest = ~is_break & (last_break >= 0) & (level == level[np.maximum(last_break, 0)])
+    flip = retest & (last_break == position - 1)
+    keep = is_break | retest
+    kind = np.where(is_break, "break", np.where(flip, "flip", "retest"))
+    # Report the events candle by candle, like LevelEventTracker does
+    report = np.flatnonzero(keep)[np.lexsort((level[keep], candle[keep]))]
+    return [
+        LevelEvent(
+            time=times[candle[index] + 1].item(),
+            price=float(levels[level[index]]),
+            kind=str(kind[index]),
+            role="support" if side[index] > 0 else "resistance",
+        )
+        for index in report
+    ]
+
+
+class LevelEventTracker:
+    """
+    Tracks breaks, retests and flips of a set of levels on live candles, with the rules of `level_events()`.
+
+    The levels are kept sorted, so every closed candle only looks at the levels between its previous close and its
+    high-low range.
+    """
+
+    def __init__(self, levels=()):
+        self.levels = np.empty(0)
+        self._last_break = np.empty(0, dtype=int)
+        self._flipped = np.empty(0, dtype=bool)
+        self._previous_close = None
+        self.add_levels(levels)
+
+    def add_levels(self, levels) -> None:
+        """
+        Starts tracking new levels. Levels that are already tracked are ignored.
+        """
+        levels = np.setdiff1d(np.asarray(levels, dtype=float), self.levels)
+        position = np.searchsorted(self.levels, levels)
+        self.levels = np.insert(self.levels, position, levels)
+        self._last_break = np.insert(self._last_break, position, 0)
+        self._flipped = np.insert(self._flipped, position, False)
+
+    def remove_levels(self, levels) -> None:
+        """
+        Stops tracking the given levels.
+        """
+        keep = ~np.isin(self.levels, np.asarray(levels, dtype=float))
+        self.levels = self.levels[keep]
+        self._last_break = self._last_break[keep]
+        self._flipped = self._flipped[keep]
+
+    def update(self, time, high, low, close) -> list[LevelEvent]:
+        """
+        Adds the next closed candle.
+
+        Args:
+            time (int): The open time of the candle.
+            high (float): The high price of the candle.
+            low (float): The low price of the candle.
+            close (float): The close price of the candle.
+
+        Returns:
+            list[LevelEvent]: The events of the candle, by price.
+        """
+        previous_close, self._previous_close = self._previous_close, float(close)
+        if previous_close is None:
+            return []
+        lower_close, upper_close = sorted((previous_close, float(close)))
+        events = []
+        first = np.searchsorted(self.levels, lower_close, side="left")
+        last = np.searchsorted(self.levels, upper_close, side="left")
+        if first < last:
+            direction = 1 if close > previous_close else -1
+            self._last_break[first:last] = direction
+            self._flipped[first:last] = False
+            events += [(price, "break", direction) for price in self.levels[first:last]]
+        for lower, upper, upper_side, direction in (
+            (low, lower_close, "left", 1),
+            (upper_close, high, "right", -1),
+        ):
+            first = np.searchsorted(self.levels, lower, side="left")
+            last = np.searchsorted(self.levels, upper, side=upper_side)
+            if first >= last:
+                continue
+            retest = self._last_break[first:last] == direction
+            flip = retest & ~self._flipped[first:last]
+            self._flipped[first:last] |= retest
+            events += [
+                (price, "flip" if is_flip else "retest", direction)
+                for price, is_flip in zip(self.levels[first:last][retest], flip[retest])
+            ]
+        return [
+            LevelEvent(
+                time=time,
+                price=float(price),
+                kind=kind,
+                role="support" if direction > 0 else "resistance",
+            )
+            for price, kind, direction in sorted(events)
+        ]
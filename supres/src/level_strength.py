@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class LevelScores:
+    price: np.ndarray
+    touches: np.ndarray
+    rejections: np.ndarray
+    closes_through: np.ndarray
+
+    @property
+    def strength(self) -> np.ndarray:
+        """
+        Rejections count for a level and closes through it count against it.
+        """
+        return self.rejections - self.closes_through
+
+
+def score_levels(levels, open_, high, low, close, tolerance=0.0) -> LevelScores:
+    """
+    Counts how often the candles tested each price level.
+
+    A candle touches a level when its high-low range, widened by `tolerance`, contains it. It closes through the
+    level when the open and the close are on different sides of it, otherwise the touch is a rejection. The levels
+    are sorted once and each candle is binned with `searchsorted`, so the cost is O((n + L) log L) for n candles
+    and L levels.
+
+    Args:
+        levels (array-like): The level prices, in any order.
+        open_ (array-like): The open prices of the candles.
+        high (array-like): The high prices of the candles.
+        low (array-like): The low prices of the candles.
+        close (array-like): The close prices of the candles.
+        tolerance (float): The price distance that still counts as a touch. Default value is 0.
+
+    Returns:
+        LevelScores: The touch, rejection and close-through counts, in the order of `levels`.
+    """
+    price = np.asarray(levels, dtype=float)
+    open_ = np.asarray(open_, dtype=float)
+    close = np.asarray(close, dtype=float)
+    order = np.argsort(price)
+    sorted_price = price[order]
+
+    def levels_between(lower, upper, lower_side, upper_side) -> np.ndarray:
+        """
+        Counts for every sorted level the candles whose [lower, upper] interval contains it.
+        """
+        level_count = len(sorted_price)
+        first = np.searchsorted(sorted_price, lower, side=lower_side)
+        last = np.searchsorted(sorted_price, upper, side=upper_side)
+        first, last = first[first < last], last[first < last]
+        return np.cumsum(
+            np.bincount(first, minlength=level_count + 1)
+            - np.bincount(last, minlength=level_count + 1)
+        )[:-1]
+
+    touches = levels_between(
+        np.asarray(low, dtype=float) - tolerance,
+        np.asarray(high, dtype=float) + tolerance,
+        "left",
+        "right",
+    )
+    closes_through = levels_between(
+        np.minimum(open_, close), np.maximum(open_, close), "right", "left"
+    )
+    unsorted = np.empty_like(order)
+    unsorted[order] = np.arange(len(order))
+    return LevelScores(
+        price=price,
+        touches=touches[unsorted],
+        rejections=(touches - closes_through)[unsorted],
+        closes_through=closes_through[unsorted],
+    )
+
+
+def strongest_levels(levels, scores, count) -> list:
+    """
+    Keeps the `count` strongest levels and drops the rest, without changing the order of the kept levels.
+
+    Args:
+        levels (list): The level prices.
+        scores (LevelScores): The scores of `levels`, as returned by `score_levels()`.
+        count (int): The number of levels to keep.
+
+    Returns:
+        list: The strongest levels in their original order.
+    """
+    keep = np.sort(np.argsort(-scores.strength, kind="stable")[:count])
+    return [levels[index] for index in keep]
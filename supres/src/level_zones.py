@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+tolerance_modes = ("ticks", "percent", "atr")
+
+
+@dataclass
+class Zone:
+    low: float
+    high: float
+    price: float
+    touches: int
+    first_index: int
+    last_index: int
+
+
+def average_true_range(high, low, close, length=14) -> float:
+    """
+    Calculates the average true range of the latest `length` candles.
+
+    Args:
+        high (array-like): The high prices in chronological order.
+        low (array-like): The low prices in chronological order.
+        close (array-like): The close prices in chronological order.
+        length (int): The number of candles to average. Default value is 14.
+
+    Returns:
+        float: The average true range.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    true_range = high - low
+    true_range[1:] = np.maximum(
+        true_range[1:],
+        np.maximum(np.abs(high[1:] - close[:-1]), np.abs(low[1:] - close[:-1])),
+    )
+    return float(np.mean(true_range[-length:]))
+
+
+def cluster_levels(
+    levels, tolerance, mode="percent", tick_size=None, atr=None
+) -> list[Zone]:
+    """
+    Merges support or resistance levels that are within `tolerance` of each other into zones.
+
+    The levels are sorted by price once and every gap between neighbouring prices is compared with the
+    tolerance, so the merge is linear after the sort. Neighbours closer than the tolerance end up in the same zone.
+
+    Args:
+        levels (list[tuple[int, float]]): The `(candle index, price)` levels, as returned by `sensitivity()`.
+        tolerance (float): The largest price gap to merge, in the unit given by `mode`.
+        mode (str): "ticks" to multiply the tolerance by `tick_size`, "percent" for a percentage of the lower
+            price, or "atr" to multiply the tolerance by `atr`. Default value is "percent".
+        tick_size (float): The price tick size of the pair, required by the "ticks" mode.
+        atr (float): The average true range, required by the "atr" mode.
+
+    Returns:
+        list[Zone]: The zones sorted by price, each with its price band, the pivot price closest to the middle of
+        the band, the number of merged levels and the first and newest candle indices.
+
+    Raises:
+        ValueError: If the mode is unknown or its tick size or ATR is missing.
+    """
+    if mode not in tolerance_modes:
+        raise ValueError(
+            f"Unknown tolerance mode {mode!r}, use one of {tolerance_modes}"
+        )
+    if not levels:
+        return []
+    index, price = (np.asarray(column) for column in zip(*levels))
+    order = np.argsort(price, kind="stable")
+    index, price = index[order], price.astype(float)[order]
+    if mode == "ticks":
+        if tick_size is None:
+            raise ValueError("The 'ticks' tolerance mode needs a tick_size")
+        max_gap = tolerance * tick_size
+    elif mode == "atr":
+        if atr is None:
+            raise ValueError("The 'atr' tolerance mode needs an atr")
+        max_gap = tolerance * atr
+    else:
+        max_gap = price[:-1] * tolerance / 100
+    new_zone = np.diff(price) > max_gap
+    starts = np.concatenate(([0], np.flatnonzero(new_zone) + 1))
+    ends = np.append(starts[1:], len(price))
+    middles = (price[starts] + price[ends - 1]) / 2
+    zones = []
+    for start, end, middle in zip(starts, ends, middles):
+        members = price[start:end]
+        zones.append(
+            Zone(
+                low=float(members[0]),
+                high=float(members[-1]),
+                price=float(members[np.argmin(np.abs(members - middle))]),
+                touches=int(end - start),
+                first_index=int(index[start:end].min()),
+                last_index=int(index[start:end].max()),
+            )
+        )
+    return zones
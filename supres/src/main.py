@@ -2,13 +2,21 @@ import os
 import time
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
+import candle_patterns
+import chart_export
+import candles as candle_arrays
+import exchange_info
+import export_pool
+import figure_batch
 import historical_data
 import indicators_sma_rsi
+import level_strength
+import level_zones
 import support_resistance
+import volume_profile
 
 
 @dataclass
@@ -21,14 +29,66 @@ class Values:
         self.selected_timeframe = self.selected_timeframe.lower()
 
 
+def candle_view(candles, candle_count=254) -> candle_arrays.Candles:
+    """
+    Returns the latest candles for the analysis as `candles.Candles`.
+
+    The candles share the memory of the input arrays when they are already contiguous and typed, as the columns of
+    `kline_stream.KlineBuffer.columns()` and the candles of `KlineBuffer.candles()` are, so a ring buffer is
+    analyzed without a copy.
+
+    Args:
+        candles (pandas.DataFrame | dict | candles.Candles): The candles in chronological order, with the open, high,
+            low, close and "Volume USDT" columns, and a date column or a unix column in milliseconds.
+        candle_count (int): The number of latest candles to analyze. Default value is 254.
+
+    Returns:
+        candles.Candles: The latest candles, without the candles that miss a price.
+    """
+    if not isinstance(candles, candle_arrays.Candles):
+        candles = candle_arrays.Candles.from_frame(candles)
+    candles = candles.tail(candle_count)
+    complete = ~np.isnan(
+        [candles.open, candles.high, candles.low, candles.close, candles.volume]
+    ).any(axis=0)
+    if complete.all():
+        return candles
+    return candle_arrays.Candles(
+        *(getattr(candles, name)[complete] for name in candles.__slots__),
+        dtype=candles.dtype,
+    )
+
+
+def candle_frame(candles, candle_count=254) -> pd.DataFrame:
+    """
+    Builds the DataFrame that the chart traces are drawn from.
+
+    Args:
+        candles (pandas.DataFrame | dict | candles.Candles): The candles in chronological order, see
+            `candle_view()`.
+        candle_count (int): The number of latest candles to draw. Default value is 254.
+
+    Returns:
+        pandas.DataFrame: The latest candles with the unix, date, open, high, low, close and Volume USDT columns. The
+        last candle is repeated once, as the charts expect.
+    """
+    df = candle_view(candles, candle_count).to_frame()
+    return pd.concat([df, df.tail(1)], axis=0, ignore_index=True)
+
+
 class Supres(Values):
     @staticmethod
-    def main(ticker_csv, selected_timeframe, candle_count=254):
-        print(
-            f"Start main function in {time.perf_counter() - perf} seconds\n"
-            f"{ticker_csv} data analysis in progress."
-        )
-        now_supres = time.perf_counter()
+    def main(ticker_csv, selected_timeframe, candle_count=254, **analysis_options):
+        """
+        Reads the candles of a CSV file written by `BinanceTicker.historical_data_write()` and shows their chart.
+
+        Args:
+            ticker_csv (str): The path of the CSV file, named after the ticker.
+            selected_timeframe (str): The Binance kline interval of the candles.
+            candle_count (int): The number of latest candles to analyze. Default value is 254.
+            **analysis_options: The options of `Supres.analyze()`.
+        """
+        print(f"{ticker_csv} data analysis in progress.")
         df = pd.read_csv(
             ticker_csv,
             delimiter=",",
@@ -39,28 +99,92 @@ class Supres(Values):
         )
         df = df.iloc[::-1]
         df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
-        df = pd.concat([df, df.tail(1)], axis=0, ignore_index=True)
-        df.dropna(inplace=True)
-        historical_hightimeframe = (
-            historical_data.Client.KLINE_INTERVAL_1DAY,
-            historical_data.Client.KLINE_INTERVAL_3DAY,
-            historical_data.Client.KLINE_INTERVAL_1WEEK,
+        ticker = os.path.splitext(os.path.basename(ticker_csv))[0]
+        fig = Supres.analyze(
+            df, selected_timeframe, ticker, candle_count, **analysis_options
         )
+        return fig.show(id="the_graph", config={"displaylogo": False})
+
+    @staticmethod
+    def export(fig, directory, formats=("html", "pdf", "jpeg", "png"), **options):
+        """
+        Exports a chart of `Supres.analyze()` in several formats at once, see `chart_export.export_chart()`.
+
+        Args:
+            fig (plotly.graph_objects.Figure): The chart.
+            directory (str): The output directory, which keeps one folder per distinct chart.
+            formats (Iterable[str]): The formats to write. Default value is HTML, PDF, JPEG and PNG.
+            **options: The options of `chart_export.export_chart()`, e.g. width, height or pool.
+
+        Returns:
+            dict[str, str]: The path of the file of every format.
+        """
+        return chart_export.export_chart(fig, directory, formats, **options)
+
+    @staticmethod
+    def analyze(
+        candles,
+        selected_timeframe,
+        ticker,
+        candle_count=254,
+        zone_tolerance=None,
+        zone_mode="percent",
+        tick_size=None,
+        top_levels=None,
+        show_volume_profile=False,
+        price_precision=None,
+        legend_mode="legend",
+    ):
+        """
+        Finds the support and resistance levels, indicators and patterns of candles in memory and draws their chart,
+        without reading or writing any file.
+
+        Args:
+            candles (pandas.DataFrame | dict | candles.Candles): The candles in chronological order, see
+                `candle_view()`, e.g. the columns or the candles of a `kline_stream.KlineBuffer`.
+            selected_timeframe (str): The Binance kline interval of the candles, e.g. "1h".
+            ticker (str): The ticker symbol shown in the chart title.
+            candle_count (int): The number of latest candles to analyze. Default value is 254.
+            zone_tolerance (float): Merges the levels into zones of this tolerance, see
+                `level_zones.cluster_levels()`. Default value is None, which keeps every level.
+            zone_mode (str): The unit of `zone_tolerance`. Default value is "percent".
+            tick_size (float): The price tick size, for the "ticks" zone mode.
+            top_levels (int): Keeps only this many of the strongest levels in the legend. Default value is None.
+            show_volume_profile (bool): Draws the volume profile on the price chart. Default value is False.
+            price_precision (int): The number of decimals of the prices in the legend, e.g. from
+                `exchange_info.ExchangeInfoCache.price_precision()`. Default value is the precision of the candles.
+            legend_mode (str): "legend" lists the levels, indicators, Fibonacci levels and patterns in the legend,
+                "panel" in one text panel right of the chart, which makes the figure smaller. Default value is
+                "legend".
+
+        Returns:
+            plotly.graph_objects.Figure: The chart.
+        """
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        now_supres = time.perf_counter()
+        # The levels, indicators and patterns are found on the candles, only the chart traces read the frame
+        history = candle_view(candles, candle_count)
+        df = candle_frame(history)
+        if price_precision is None:
+            price_precision = exchange_info.infer_price_precision(history.close)
+        historical_hightimeframe = ("1d", "3d", "1w")
         historical_lowtimeframe = (
-            historical_data.Client.KLINE_INTERVAL_1MINUTE,
-            historical_data.Client.KLINE_INTERVAL_3MINUTE,
-            historical_data.Client.KLINE_INTERVAL_5MINUTE,
-            historical_data.Client.KLINE_INTERVAL_15MINUTE,
-            historical_data.Client.KLINE_INTERVAL_30MINUTE,
-            historical_data.Client.KLINE_INTERVAL_1HOUR,
-            historical_data.Client.KLINE_INTERVAL_2HOUR,
-            historical_data.Client.KLINE_INTERVAL_4HOUR,
-            historical_data.Client.KLINE_INTERVAL_6HOUR,
-            historical_data.Client.KLINE_INTERVAL_8HOUR,
-            historical_data.Client.KLINE_INTERVAL_12HOUR,
+            "1m",
+            "3m",
+            "5m",
+            "15m",
+            "30m",
+            "1h",
+            "2h",
+            "4h",
+            "6h",
+            "8h",
+            "12h",
         )
         sma_values = 20, 50, 100
-        sma1, sma2, sma3, rsi = indicators_sma_rsi.indicators(df[:-1], *sma_values)
+        sma1, sma2, sma3, rsi = indicators_sma_rsi.indicators(history, *sma_values)
         (
             support_list,
             resistance_list,
@@ -99,6 +223,8 @@ class Supres(Values):
             vertical_spacing=0,
             row_width=[0.1, 0.1, 0.8],
         )
+        # The levels and legend rows are added to the figure at once, applied before the chart updates
+        batch = figure_batch.FigureBatch(legend_mode, panel_color=legend_color)
 
         def fibonacci_pricelevels(
             high_price, low_price
@@ -144,13 +270,35 @@ class Supres(Values):
                 second list contains the resistance levels.
             """
 
-            for sens_row in range(3, len(df) - 1):
-                if support_resistance.support(df, sens_row, 3, sens):
-                    support_list.append((sens_row, df.low[sens_row]))
-                if support_resistance.resistance(df, sens_row, 3, sens):
-                    resistance_list.append((sens_row, df.high[sens_row]))
+            # The repeated last candle of the frame counts as a candle after the latest one
+            low, high = df.low.to_numpy(), df.high.to_numpy()
+            support_rows, resistance_rows = support_resistance.pivots(
+                low, high, 3, sens
+            )
+            support_list.extend(
+                (int(sens_row), low[sens_row])
+                for sens_row in support_rows[support_rows < len(df) - 1]
+            )
+            resistance_list.extend(
+                (int(sens_row), high[sens_row])
+                for sens_row in resistance_rows[resistance_rows < len(df) - 1]
+            )
             return support_list, resistance_list
 
+        def merge_zones() -> None:
+            """
+            Replaces the support and resistance levels with one level per zone of nearby prices, drawn from the
+            first candle of the zone.
+            """
+            atr = level_zones.average_true_range(
+                history.high, history.low, history.close
+            )
+            for level_list in support_list, resistance_list:
+                zones = level_zones.cluster_levels(
+                    level_list, zone_tolerance, zone_mode, tick_size, atr
+                )
+                level_list[:] = [(zone.first_index, zone.price) for zone in zones]
+
         def chart_lines():
             """
             Calculates the support and resistance levels based on the given support and resistance lists and returns the
@@ -170,102 +318,63 @@ class Supres(Values):
             """
             all_support_list = tuple(map(lambda sup1: sup1[1], support_list))
             all_resistance_list = tuple(map(lambda res1: res1[1], resistance_list))
-            latest_close = df["close"].iloc[-1]
+            latest_close = history.close[-1]
             for support_line in all_support_list:  # Find closes
                 if support_line < latest_close:
                     support_below.append(support_line)
                 else:
                     resistance_below.append(support_line)
             if len(support_below) == 0:
-                support_below.append(min(df.low))
+                support_below.append(history.low.min())
             for resistance_line in all_resistance_list:
                 if resistance_line > latest_close:
                     resistance_above.append(resistance_line)
                 else:
                     support_above.append(resistance_line)
             if len(resistance_above) == 0:
-                resistance_above.append(max(df.high))
+                resistance_above.append(history.high.max())
             return fibonacci_pricelevels(max(resistance_above), min(support_below))
 
-        def candlestick_patterns() -> list:
+        def strongest_lines(lines) -> list:
             """
-            Finds candlestick patterns in the given dataframe.
+            Keeps the `top_levels` lines that price rejected most often over the loaded candles.
+            """
+            scores = level_strength.score_levels(
+                lines, history.open, history.high, history.low, history.close
+            )
+            return level_strength.strongest_levels(lines, scores, top_levels)
 
-            Returns:
-                list: A list of tuples containing the name of the pattern and the date it was found.
-            """
-            from candlestick import candlestick as cd
-
-            nonlocal df
-            all_patterns = [
-                cd.inverted_hammer,
-                cd.hammer,
-                cd.doji,
-                cd.bearish_harami,
-                cd.bearish_engulfing,
-                cd.bullish_harami,
-                cd.bullish_engulfing,
-                cd.dark_cloud_cover,
-                cd.dragonfly_doji,
-                cd.hanging_man,
-                cd.gravestone_doji,
-                cd.morning_star,
-                cd.morning_star_doji,
-                cd.piercing_pattern,
-                cd.star,
-                cd.shooting_star,
-            ]
-            # Loop through the candlestick pattern functions
-            for pattern in all_patterns:
-                # Apply the candlestick pattern function to the data frame
-                df = pattern(df)
-            # Replace True values with 'pattern_found'
-            df.replace({True: "pattern_found"}, inplace=True)
-
-            def pattern_find_func(pattern_row) -> list:
-                """
-                Find Candlestick patterns in the dataframe.
-                """
-                t = 0
-                pattern_find = [col for col in df.columns]
-                for pattern_f in pattern_row:
-                    if pattern_f == "pattern_found":
-                        pattern_list.append(
-                            (pattern_find[t], pattern_row["date"].strftime("%b-%d-%y"))
-                        )  # pattern, date
-                    t += 1
-                return pattern_list
-
-            return df.iloc[-3:-30:-1].apply(pattern_find_func, axis=1)
+        def candlestick_patterns() -> None:
+            """
+            Finds the candlestick patterns of the 27 candles before the last two, newest first.
+            """
+            pattern_list.extend(
+                candle_patterns.find_patterns(history, slice(-2, -29, -1))
+            )
 
         def legend_candle_patterns() -> None:
             """
             Adds candlestick patterns to a plot as traces with specific names and markers.
             """
-            fig.add_trace(
-                go.Scatter(
-                    y=[support_list[0]],
-                    name="----------------------------------------",
-                    mode="markers",
-                    marker=dict(color=legend_color, size=14),
-                )
+            batch.add_legend_row(
+                support_list[0],
+                "----------------------------------------",
+                legend_color,
+                mode="markers",
+                size=14,
             )
-            fig.add_trace(
-                go.Scatter(
-                    y=[support_list[0]],
-                    name="Latest Candlestick Patterns",
-                    mode="markers",
-                    marker=dict(color=legend_color, size=14),
-                )
+            batch.add_legend_row(
+                support_list[0],
+                "Latest Candlestick Patterns",
+                legend_color,
+                mode="markers",
+                size=14,
             )
             for pat1, count in enumerate(pattern_list):  # Candlestick patterns
-                fig.add_trace(
-                    go.Scatter(
-                        y=[support_list[0]],
-                        name=f"{pattern_list[pat1][1]} : {str(pattern_list[pat1][0]).capitalize()}",
-                        mode="lines",
-                        marker=dict(color=legend_color, size=10),
-                    )
+                batch.add_legend_row(
+                    support_list[0],
+                    f"{pattern_list[pat1][1]} : {str(pattern_list[pat1][0]).capitalize()}",
+                    legend_color,
                 )
 
         def create_candlestick_plot() -> None:
@@ -302,6 +411,15 @@ class Supres(Values):
                 col=1,
             )
 
+        def add_volume_profile() -> None:
+            """
+            Adds the volume at price of the loaded candles as a horizontal histogram on the price chart.
+            """
+            profile = volume_profile.volume_profile(
+                history.high, history.low, history.volume
+            )
+            volume_profile.add_volume_profile(fig, profile)
+
         def add_rsi_subplot() -> None:
             """
             Adds a subplot of RSI (Relative Strength Index) with upper and lower bands to a given plot.
@@ -342,7 +460,7 @@ class Supres(Values):
             """
             for s in range(len(support_list)):
                 # Support lines
-                fig.add_shape(
+                batch.add_shape(
                     type="line",
                     x0=support_list[s][0] - 1,
                     y0=support_list[s][1],
@@ -351,7 +469,7 @@ class Supres(Values):
                     line=dict(color=support_line_color, width=2),
                 )
                 # Support annotations
-                fig.add_annotation(
+                batch.add_annotation(
                     x=len(df) + 7,
                     y=support_list[s][1],
                     text=str(support_list[s][1]),
@@ -364,7 +482,7 @@ class Supres(Values):
             """
             for r in range(len(resistance_list)):
                 # Resistance lines
-                fig.add_shape(
+                batch.add_shape(
                     type="line",
                     x0=resistance_list[r][0] - 1,
                     y0=resistance_list[r][1],
@@ -373,7 +491,7 @@ class Supres(Values):
                     line=dict(color=resistance_line_color, width=1),
                 )
                 # Resistance annotations
-                fig.add_annotation(
+                batch.add_annotation(
                     x=len(df) + 20,
                     y=resistance_list[r][1],
                     text=str(resistance_list[r][1]),
@@ -385,23 +503,20 @@ class Supres(Values):
             Adds various indicators, support/resistance levels, and Fibonacci multipliers
             to a Plotly figure and creates a legend for them.
             """
-            fig.add_trace(
-                go.Scatter(
-                    y=[support_list[0]],
-                    name="Resistances    ||   Supports",
-                    mode="markers+lines",
-                    marker=dict(color=resistance_line_color, size=10),
-                )
+            batch.add_legend_row(
+                support_list[0],
+                "Resistances    ||   Supports",
+                resistance_line_color,
+                mode="markers+lines",
             )
-            sample_price = df["close"][0]
-            str_price_len = len(str(sample_price)) if sample_price < 1 else 3
+            sample_price = history.close[0]
 
             def legend_support_resistance_values() -> None:
                 """
                 Plots support and resistance values on a graph with legend alignment.
                 """
                 temp = 0
-                blank = " " * (len(str(sample_price)) + 1)
+                blank = " " * (len(f"{sample_price:.{price_precision}f}") + 1)
                 differ = abs(len(f_res_above) - len(f_sup_below))
                 try:
                     if len(f_res_above) < len(f_sup_below):
@@ -416,21 +531,16 @@ class Supres(Values):
                     ):
                         if f_res_above[temp] == 0:  # This is for legend alignment
                             legend_supres = (
-                                f"{float(f_res_above[temp]):.{str_price_len - 1}f}{blank}     "
-                                f"||   {float(f_sup_below[temp]):.{str_price_len - 1}f}"
+                                f"{float(f_res_above[temp]):.{price_precision}f}{blank}     "
+                                f"||   {float(f_sup_below[temp]):.{price_precision}f}"
                             )
                         else:
                             legend_supres = (
-                                f"{float(f_res_above[temp]):.{str_price_len - 1}f}       "
-                                f"||   {float(f_sup_below[temp]):.{str_price_len - 1}f}"
-                            )
-                        fig.add_trace(
-                            go.Scatter(
-                                y=[support_list[0]],
-                                name=legend_supres,
-                                mode="lines",
-                                marker=dict(color=legend_color, size=10),
+                                f"{float(f_res_above[temp]):.{price_precision}f}       "
+                                f"||   {float(f_sup_below[temp]):.{price_precision}f}"
                             )
+                        batch.add_legend_row(
+                            support_list[0], legend_supres, legend_color
                         )
                         temp += 1 if temp < 12 else 0
                 except IndexError:
@@ -440,54 +550,41 @@ class Supres(Values):
                 """
                 Adds various indicators and support/resistance levels to a plot using Plotly.
                 """
-                fig.add_trace(
-                    go.Scatter(
-                        y=[support_list[0]],
-                        name="github.com/arabacibahadir/sup-res",
-                        mode="markers",
-                        marker=dict(color=legend_color, size=0),
-                    )
+                batch.add_legend_row(
+                    support_list[0],
+                    "github.com/arabacibahadir/sup-res",
+                    legend_color,
+                    mode="markers",
+                    size=0,
                 )
-                fig.add_trace(
-                    go.Scatter(
-                        y=[support_list[0]],
-                        name=f"RSI          : {int(rsi[-1])}",
-                        mode="lines",
-                        marker=dict(color=legend_color, size=10),
-                    )
+                batch.add_legend_row(
+                    support_list[0], f"RSI          : {int(rsi[-1])}", legend_color
                 )
                 # Add SMA1, SMA2, and SMA3 to the chart and legend
-                fig.add_trace(
-                    go.Scatter(
-                        x=df["date"].dt.strftime(x_date),
-                        y=sma1,
-                        name=f"SMA{sma_values[0]}     : {float(sma1[-1]):.{str_price_len}f}",
-                        line=dict(color="#5c6cff", width=3),
-                    )
+                batch.add_trace(
+                    x=df["date"].dt.strftime(x_date),
+                    y=sma1,
+                    name=f"SMA{sma_values[0]}     : {float(sma1[-1]):.{price_precision}f}",
+                    line=dict(color="#5c6cff", width=3),
                 )
-                fig.add_trace(
-                    go.Scatter(
-                        x=df["date"].dt.strftime(x_date),
-                        y=sma2,
-                        name=f"SMA{sma_values[1]}     : {float(sma2[-1]):.{str_price_len}f}",
-                        line=dict(color="#950fba", width=3),
-                    )
+                batch.add_trace(
+                    x=df["date"].dt.strftime(x_date),
+                    y=sma2,
+                    name=f"SMA{sma_values[1]}     : {float(sma2[-1]):.{price_precision}f}",
+                    line=dict(color="#950fba", width=3),
                 )
-                fig.add_trace(
-                    go.Scatter(
-                        x=df["date"].dt.strftime(x_date),
-                        y=sma3,
-                        name=f"SMA{sma_values[2]}   : {float(sma3[-1]):.{str_price_len}f}",
-                        line=dict(color="#a69b05", width=3),
-                    )
+                batch.add_trace(
+                    x=df["date"].dt.strftime(x_date),
+                    y=sma3,
+                    name=f"SMA{sma_values[2]}   : {float(sma3[-1]):.{price_precision}f}",
+                    line=dict(color="#a69b05", width=3),
                 )
-                fig.add_trace(
-                    go.Scatter(
-                        y=[support_list[0]],
-                        name="       Fibonacci Uptrend | Downtrend ",
-                        mode="markers",
-                        marker=dict(color=legend_color, size=0),
-                    )
+                batch.add_legend_row(
+                    support_list[0],
+                    "       Fibonacci Uptrend | Downtrend ",
+                    legend_color,
+                    mode="markers",
+                    size=0,
                 )
 
             def legend_fibonacci() -> None:
@@ -497,15 +594,12 @@ class Supres(Values):
                 """
                 mtp = len(fibonacci_multipliers) - 1
                 for _ in fibonacci_uptrend:
-                    fig.add_trace(
-                        go.Scatter(
-                            y=[support_list[0]],
-                            name=f"Fib {fibonacci_multipliers[mtp]:.3f} "
-                            f": {float(fibonacci_uptrend[mtp]):.{str_price_len}f} "
-                            f"| {float(fibonacci_downtrend[mtp]):.{str_price_len}f} ",
-                            mode="lines",
-                            marker=dict(color=legend_color, size=10),
-                        )
+                    batch.add_legend_row(
+                        support_list[0],
+                        f"Fib {fibonacci_multipliers[mtp]:.3f} "
+                        f": {float(fibonacci_uptrend[mtp]):.{price_precision}f} "
+                        f"| {float(fibonacci_downtrend[mtp]):.{price_precision}f} ",
+                        legend_color,
                     )
                     mtp -= 1
 
@@ -521,16 +615,19 @@ class Supres(Values):
             Updates the layout and axes of a chart.
             """
             fig.update_layout(
-                title=str(
-                    f"{historical_data.ticker} {selected_timeframe.upper()} Chart"
-                ),
+                title=str(f"{ticker} {selected_timeframe.upper()} Chart"),
                 hovermode="x",
                 dragmode="zoom",
                 paper_bgcolor=background_color,
                 plot_bgcolor=chart_color,
                 xaxis_rangeslider_visible=False,
                 legend=dict(bgcolor=legend_color, font=dict(size=11)),
-                margin=dict(t=30, l=0, b=0, r=0),
+                margin=dict(
+                    t=30,
+                    l=0,
+                    b=0,
+                    r=batch.panel_width if legend_mode == "panel" else 0,
+                ),
             )
             fig.update_xaxes(showspikes=True, spikecolor="green", spikethickness=2)
             fig.update_yaxes(showspikes=True, spikecolor="green", spikethickness=2)
@@ -545,17 +642,19 @@ class Supres(Values):
             image = (
                 f"../main_supres/images/"
                 f"{df['date'].dt.strftime('%b-%d-%y')[candle_count]}"
-                f"{historical_data.ticker}.jpeg"
+                f"{ticker}.jpeg"
             )
-            fig.write_image(image, width=1920, height=1080)  # Save image for tweet
+            export_pool.write_image(
+                fig, image, width=1920, height=1080
+            )  # Save image for tweet
             fig.write_html(
                 f"../main_supres/images/"
-                f"{df['date'].dt.strftime('%b-%d-%y')[candle_count]}{historical_data.ticker}.html",
+                f"{df['date'].dt.strftime('%b-%d-%y')[candle_count]}{ticker}.html",
                 full_html=False,
                 include_plotlyjs="cdn",
             )
             text_image = (
-                f"#{historical_data.ticker} "
+                f"#{ticker} "
                 f"{selected_timeframe} Support and resistance levels \n "
                 f"{df['date'].dt.strftime('%b-%d-%Y')[candle_count]}"
             )
@@ -578,7 +677,7 @@ class Supres(Values):
                             filter(lambda x: x != 0, f_sup_below)
                         )
                         tweet.api.update_status(
-                            status=f"#{historical_data.ticker}  "
+                            status=f"#{ticker}  "
                             f"{df['date'].dt.strftime('%b-%d-%Y')[candle_count]} "
                             f"{selected_timeframe} Support and resistance levels"
                             f"\nRes={resistance_above_nonzero[:7]} \n"
@@ -590,6 +689,8 @@ class Supres(Values):
             # send_tweet()
 
         sensitivity()
+        if zone_tolerance is not None:
+            merge_zones()
         chart_lines()
         # Checking if the selected timeframe is in the historical_hightimeframe list.
         if selected_timeframe in historical_hightimeframe:
@@ -600,39 +701,42 @@ class Supres(Values):
         create_candlestick_plot()
         add_volume_subplot()
         add_rsi_subplot()
+        if show_volume_profile:
+            add_volume_profile()
         f_res_above = list(map(float, sorted(resistance_above + resistance_below)))
         f_sup_below = list(
             map(float, sorted(support_below + support_above, reverse=True))
         )
+        if top_levels is not None:
+            f_res_above = strongest_lines(f_res_above)
+            f_sup_below = strongest_lines(f_sup_below)
         draw_support()
         draw_resistance()
         legend_texts()
+        batch.apply(fig)
         chart_updates()
         # save()
-        # pinescript_code(historical_data.ticker, selected_timeframe, f_res_above, f_sup_below)
+        # pinescript_code(ticker, selected_timeframe, f_res_above, f_sup_below)
         print(
             f"Completed sup-res execution in {time.perf_counter() - now_supres} seconds"
         )
-        print(f"Completed execution in total {time.perf_counter() - perf} seconds")
-        return fig.show(id="the_graph", config={"displaylogo": False})
+        return fig
 
 
 if __name__ == "__main__":
-    file_name = historical_data.user_ticker.file_name
+    perf = time.perf_counter()
+    user_ticker = historical_data.main()
     try:
-        perf = time.perf_counter()
-        historical_data.user_ticker.historical_data_write()
-        if os.path.isfile(file_name):  # Check .csv file exists
-            print(f"{file_name} downloaded and created.")
-            Supres.main(file_name, historical_data.time_frame)
-            print("Data analysis is done. Browser opening.")
-            os.remove(file_name)  # remove the .csv file
-            print(f"{file_name} file deleted.")
-        else:
-            raise print(
-                "One or more issues caused the download to fail. "
-                "Make sure you typed the filename correctly."
-            )
+        chart = Supres.analyze(
+            user_ticker.historical_data_frame(),
+            user_ticker.time_frame,
+            user_ticker.ticker,
+            price_precision=user_ticker.exchange_info.price_precision(
+                user_ticker.ticker
+            ),
+        )
     except KeyError:
-        os.remove(file_name)
         raise KeyError("Key error, algorithm issue")
+    print(f"Completed execution in total {time.perf_counter() - perf} seconds")
+    print("Data analysis is done. Browser opening.")
+    chart.show(id="the_graph", config={"displaylogo": False})
@@ -1,9 +1,15 @@
-import csv
 import datetime
 import os
+import sys
 import time
 import pandas as pd
 from binance.client import Client
+from binance.helpers import date_to_milliseconds
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import binance_replay
+import kline_downloader
+import resample
 
 
 frame_select_dict = {
@@ -38,38 +44,12 @@ def frame_select(kline: str) -> tuple[str | int, str]:
     return frame_select_dict[kline][0], start_date.strftime("%d %B, %Y")
 
 
-def hist_data():
-    header_list = [
-        "unix",
-        "open",
-        "high",
-        "low",
-        "close",
-        "volume",
-        "close time",
-        "Volume USDT",
-        "tradecount",
-        "taker buy vol",
-        "taker buy quote vol",
-        "ignore",
-    ]
-
-    def historical_data_write(self):
-        """
-        The function writes the data to a csv file
-        """
-        data = self + ".csv"
-        csv_file_write = open(data, "w", newline="")
-        klines_writer = csv.writer(csv_file_write, delimiter=",")
-        for candlestick in candlesticks:
-            klines_writer.writerow(candlestick)
-        csv_file_write.close()
-        df = pd.read_csv(data)
-        df = df.iloc[::-1]
-        df.to_csv(data, header=header_list, index=False)
-
-    candlesticks = client.get_historical_klines(ticker, time_frame, start, limit=300)
-    historical_data_write(ticker)
+def hist_data(candlesticks):
+    """
+    The function writes the klines to a csv file, newest kline first
+    """
+    df = pd.DataFrame(candlesticks)
+    df.iloc[::-1].to_csv(file_name, index=False)
 
 
 def main():
@@ -224,7 +204,7 @@ def main():
 
 if __name__ == "__main__":
     perf = time.perf_counter()
-    client = Client("", "")
+    client = binance_replay.make_client()
     ticker_list = [
         "BTCUSDT",
         "ETHUSDT",
@@ -250,23 +230,34 @@ if __name__ == "__main__":
     with open("../miniscripts/all_timeframes.txt", "w") as file:
         file.writelines(["Server time: ", server_time, "\n"])
     print(f"Server time: {server_time}")
+    # Each time frame is built from the klines of one base interval, so every ticker needs one download per base
+    base_intervals = {
+        Client.KLINE_INTERVAL_1MINUTE: ("3M", "5M", "15M", "30M"),
+        Client.KLINE_INTERVAL_1HOUR: ("1H", "2H", "4H", "6H", "8H", "12H"),
+        Client.KLINE_INTERVAL_1DAY: ("1D", "3D"),
+    }
+    downloader = kline_downloader.KlineDownloader(base_url=binance_replay.api_url())
     for ticker in ticker_list:
         print("----", ticker, "----")
         file_name = "../miniscripts/" + str(ticker).upper() + ".csv"
-        for i in frame_s:
-            time_frame = frame_select(i)[0]
-            start = frame_select(i)[1]
-            print(i)
-            try:
-                hist_data()
-                main()
-                if os.path.exists(file_name):
+        for base_interval, base_frames in base_intervals.items():
+            start = min(date_to_milliseconds(frame_select(i)[1]) for i in base_frames)
+            klines = downloader.download(ticker, base_interval, start)
+            for i in (i for i in frame_s if i in base_frames):
+                time_frame = frame_select(i)[0]
+                print(i)
+                try:
+                    hist_data(resample.resample(klines, time_frame))
+                    main()
+                    if os.path.exists(file_name):
+                        os.remove(file_name)
+                    else:
+                        print("The file does not exist.")
+                    print(
+                        f"Completed execution in {time.perf_counter() - perf} seconds"
+                    )
+                except KeyError:
+                    print("ERROR")
                     os.remove(file_name)
-                else:
-                    print("The file does not exist.")
-                print(f"Completed execution in {time.perf_counter() - perf} seconds")
-            except KeyError:
-                print("ERROR")
-                os.remove(file_name)
-                pass
+                    pass
     print(f"Completed execution in {time.perf_counter() - perf} seconds")
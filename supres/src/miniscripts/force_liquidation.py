@@ -1,9 +1,13 @@
 import asyncio
 import json
 import os
+import sys
 from websockets import connect
 from datetime import datetime
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import binance_replay
+
 """
 1000ms
 {
@@ -27,7 +31,7 @@ from datetime import datetime
 }
 """
 
-websocket_url = "wss://fstream.binance.com/ws/!forceOrder@arr"
+websocket_url = binance_replay.websocket_url("/ws/!forceOrder@arr", market="futures")
 filename = "binance_force_orders.csv"
 
 if not os.path.exists(filename):
@@ -1,9 +1,18 @@
 import csv
+import os
 import subprocess
+import sys
 
-with open("coin_list.csv") as csvfile:
-    reader = csv.reader(csvfile)
-    for row in reader:
-        coin_name, timeframe = row
-        command = ["python", "../main.py", coin_name, timeframe]
-        subprocess.run(command, check=True, shell=True)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import export_pool
+
+if __name__ == "__main__":
+    # Every chart runs in its own process, so they share the warm image export workers of this one
+    with export_pool.ExportPool() as pool, export_pool.ExportServer(pool) as server:
+        os.environ.setdefault("SUPRES_EXPORT_URL", server.url)
+        with open("coin_list.csv") as csvfile:
+            reader = csv.reader(csvfile)
+            for row in reader:
+                coin_name, timeframe = row
+                command = ["python", "../main.py", coin_name, timeframe]
+                subprocess.run(command, check=True, shell=True)
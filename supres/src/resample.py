@@ -0,0 +1,163 @@
+import numpy as np
+
+from kline_downloader import interval_milliseconds
+
+# A bucket takes the first open and the last close of its base klines, the other columns are reduced with these
+reductions = {
+    "high": np.maximum,
+    "low": np.minimum,
+    "volume": np.add,
+    "Volume USDT": np.add,
+    "tradecount": np.add,
+    "taker buy vol": np.add,
+    "taker buy quote vol": np.add,
+}
+# Binance weeks start on Monday, 1970-01-01 was a Thursday
+week_offset = 4 * interval_milliseconds["1d"]
+
+
+def bucket_start(open_time, interval) -> np.ndarray:
+    """
+    Returns the open time of the `interval` kline that contains each open time.
+
+    Binance aligns every interval up to 3 days to multiples of its length since the epoch and weeks to Mondays.
+
+    Args:
+        open_time (array-like): The open times in milliseconds.
+        interval (str): The Binance kline interval, e.g. "4h".
+
+    Returns:
+        np.ndarray: The open times of the buckets, as int64.
+    """
+    open_time = np.asarray(open_time, dtype=np.int64)
+    try:
+        length = interval_milliseconds[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported kline interval: {interval}") from None
+    offset = week_offset if interval == "1w" else 0
+    return open_time - (open_time - offset) % length
+
+
+def resample(columns, interval) -> dict[str, np.ndarray]:
+    """
+    Builds the klines of a higher interval from the klines of a lower one.
+
+    The base klines are grouped into buckets with `bucket_start()`, and each column is aggregated for all buckets at
+    once with `ufunc.reduceat`: the first open, the highest high, the lowest low, the last close and the summed
+    volumes. The latest bucket is partial when the base klines do not reach its end yet, like the open kline of
+    Binance.
+
+    Args:
+        columns (dict[str, array-like] | pandas.DataFrame): The base klines in chronological order, with a "unix"
+            open time column and any of the open, high, low, close, volume, close time and taker volume columns.
+        interval (str): The Binance kline interval to build, e.g. "4h".
+
+    Returns:
+        dict[str, np.ndarray]: The klines of `interval` as columns, with the same column names.
+    """
+    buckets = bucket_start(columns["unix"], interval)
+    if len(buckets):
+        first = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        last = np.append(first[1:] - 1, len(buckets) - 1)
+    else:
+        first = last = np.empty(0, dtype=int)
+    resampled = {"unix": buckets[first]}
+    for name in ("open", *reductions):
+        if name not in columns:
+            continue
+        values = np.asarray(columns[name])
+        if name in reductions and len(first):
+            resampled[name] = reductions[name].reduceat(values, first)
+        else:
+            resampled[name] = values[first]
+    if "close" in columns:
+        resampled["close"] = np.asarray(columns["close"])[last]
+    if "close time" in columns:
+        resampled["close time"] = (
+            resampled["unix"] + interval_milliseconds[interval] - 1
+        )
+    return resampled
+
+
+def resample_all(columns, intervals) -> dict[str, dict[str, np.ndarray]]:
+    """
+    Builds the klines of several intervals from the same base klines.
+
+    Args:
+        columns (dict[str, array-like] | pandas.DataFrame): The base klines in chronological order.
+        intervals (Iterable[str]): The Binance kline intervals to build.
+
+    Returns:
+        dict[str, dict[str, np.ndarray]]: The klines of each interval as columns.
+    """
+    return {interval: resample(columns, interval) for interval in intervals}
+
+
+class Resampler:
+    """
+    Keeps the klines of a higher interval up to date while base klines arrive.
+
+    Closed buckets are collected in `klines`, and the bucket that is still filling is kept in `partial`, which is
+    completed with every update instead of being aggregated again.
+    """
+
+    def __init__(self, interval, base_interval):
+        self.interval = interval
+        self.length = interval_milliseconds[interval]
+        self.base_length = interval_milliseconds[base_interval]
+        self.klines = None
+        self.partial = None
+
+    def update(self, columns) -> dict[str, np.ndarray]:
+        """
+        Adds closed base klines that follow the klines seen so far.
+
+        Args:
+            columns (dict[str, array-like] | pandas.DataFrame): The new base klines in chronological order.
+
+        Returns:
+            dict[str, np.ndarray]: The buckets that were closed by the new klines, as columns.
+        """
+        new = resample(columns, self.interval)
+        if not len(new["unix"]):
+            return new
+        if self.partial is not None:
+            merge = self.partial["unix"][0] == new["unix"][0]
+            new = {
+                name: np.concatenate(
+                    (
+                        self._merge(name, values[:1]) if merge else self.partial[name],
+                        values[int(merge) :],
+                    )
+                )
+                for name, values in new.items()
+            }
+        # The last bucket is closed once the base klines reach its end
+        last_close = int(np.asarray(columns["unix"])[-1]) + self.base_length
+        closed_count = len(new["unix"]) - int(
+            last_close < new["unix"][-1] + self.length
+        )
+        closed = {name: values[:closed_count] for name, values in new.items()}
+        self.partial = (
+            {name: values[closed_count:] for name, values in new.items()}
+            if closed_count < len(new["unix"])
+            else None
+        )
+        self.klines = (
+            closed
+            if self.klines is None
+            else {
+                name: np.concatenate((self.klines[name], closed[name]))
+                for name in closed
+            }
+        )
+        return closed
+
+    def _merge(self, name, values) -> np.ndarray:
+        """
+        Adds the first bucket of the new klines to the partial bucket.
+        """
+        if name in reductions:
+            return reductions[name](self.partial[name], values)
+        # The close is the latest one, the open and the times stay
+        return values if name == "close" else self.partial[name]
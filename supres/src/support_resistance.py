@@ -1,3 +1,9 @@
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+
 def support(
     candle_value, candle_index, before_candle_count, after_candle_count
 ) -> bool | None:
@@ -60,3 +66,260 @@ def resistance(
         return True
     except KeyError:
         return None
+
+
+def pivots(
+    low, high, before_candle_count, after_candle_count
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    This function finds every support and resistance level of a price series in one vectorized pass.
+
+    It applies the same rules as `support()` and `resistance()` to every candle at once, including skipping the
+    candles whose before or after window does not fit inside the series.
+
+    Args:
+        low (array-like): The low prices in chronological order.
+        high (array-like): The high prices in chronological order.
+        before_candle_count (int): The number of candles to check before each candle.
+        after_candle_count (int): The number of candles to check after each candle.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: A tuple containing the indices of the support levels and the indices of
+        the resistance levels.
+    """
+    return pivot_ranks(low, high).levels(before_candle_count, after_candle_count)
+
+
+@dataclass
+class PivotRanks:
+    """
+    The longest before and after windows for which every candle still qualifies as a support or resistance level.
+
+    A candle is a support level for `before_candle_count` b and `after_candle_count` a exactly when
+    `support_before >= b` and `support_after >= a`, so the levels of any sensitivity are a cheap filter.
+    """
+
+    support_before: np.ndarray
+    support_after: np.ndarray
+    resistance_before: np.ndarray
+    resistance_after: np.ndarray
+
+    def masks(
+        self, before_candle_count, after_candle_count
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns boolean masks of the support and resistance levels for the given window sizes, shaped like the
+        price arrays.
+        """
+        return (
+            (self.support_before >= before_candle_count)
+            & (self.support_after >= after_candle_count),
+            (self.resistance_before >= before_candle_count)
+            & (self.resistance_after >= after_candle_count),
+        )
+
+    def levels(
+        self, before_candle_count, after_candle_count
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the indices of the support and resistance levels for the given window sizes.
+        """
+        support_mask, resistance_mask = self.masks(
+            before_candle_count, after_candle_count
+        )
+        return np.flatnonzero(support_mask), np.flatnonzero(resistance_mask)
+
+    def level_counts(self, before_candle_count, sensitivities) -> np.ndarray:
+        """
+        Returns the total number of support and resistance levels for each of the given sensitivities.
+        """
+        sensitivities = np.asarray(sensitivities)
+        counts = np.zeros(len(sensitivities), dtype=int)
+        for before, after in (
+            (self.support_before, self.support_after),
+            (self.resistance_before, self.resistance_after),
+        ):
+            after = np.sort(after[before >= before_candle_count])
+            counts += len(after) - np.searchsorted(after, sensitivities, side="left")
+        return counts
+
+
+def pivot_ranks(low, high, valid=None) -> PivotRanks:
+    """
+    This function computes the pivot ranks of a price series in one linear pass.
+
+    The prices may also be stacked into a (tickers x candles) array, in which case every row is ranked on its own.
+
+    Args:
+        low (array-like): The low prices in chronological order.
+        high (array-like): The high prices in chronological order.
+        valid (array-like): A boolean mask of the candles that exist, for rows padded to a common length.
+            Windows never reach across a missing candle, and missing candles get a rank of -1.
+
+    Returns:
+        PivotRanks: The longest support and resistance windows of every candle.
+    """
+    low = np.asarray(low, dtype=float)
+    high = np.asarray(high, dtype=float)
+    if not low.shape[-1]:
+        return PivotRanks(*(np.empty(low.shape, dtype=int) for _ in range(4)))
+    if valid is None:
+        gap = np.zeros(low.shape[-1] - 1, dtype=bool)
+    else:
+        valid = np.asarray(valid, dtype=bool)
+        gap = ~(valid[..., 1:] & valid[..., :-1])
+    ranks = PivotRanks(
+        support_before=_run_before(gap | (low[..., 1:] > low[..., :-1])),
+        support_after=_run_after(gap | (low[..., 1:] < low[..., :-1])),
+        resistance_before=_run_before(gap | (high[..., 1:] < high[..., :-1])),
+        resistance_after=_run_after(gap | (high[..., 1:] > high[..., :-1])),
+    )
+    if valid is not None:
+        for rank in vars(ranks).values():
+            rank[~valid] = -1
+    return ranks
+
+
+def sensitivity_levels(
+    low, high, sensitivities, before_candle_count=3
+) -> dict[int, tuple[list, list]]:
+    """
+    This function calculates the support and resistance levels for several sensitivity values at once.
+
+    Args:
+        low (array-like): The low prices in chronological order.
+        high (array-like): The high prices in chronological order.
+        sensitivities (Iterable[int]): The sensitivity values (after candle counts) to calculate.
+        before_candle_count (int): The number of candles to check before each candle. Default value is 3.
+
+    Returns:
+        dict[int, tuple[list, list]]: The support and resistance lists of `(index, price)` tuples for each
+        sensitivity value.
+    """
+    low = np.asarray(low, dtype=float)
+    high = np.asarray(high, dtype=float)
+    ranks = pivot_ranks(low, high)
+    levels = {}
+    for sens in sensitivities:
+        support_rows, resistance_rows = ranks.levels(before_candle_count, sens)
+        levels[sens] = (
+            [(int(row), low[row]) for row in support_rows],
+            [(int(row), high[row]) for row in resistance_rows],
+        )
+    return levels
+
+
+def auto_sensitivity(
+    low, high, target_count, sensitivities=range(1, 11), before_candle_count=3
+) -> int:
+    """
+    This function picks the sensitivity value whose support and resistance level count is closest to
+    `target_count`. Ties go to the higher sensitivity, which gives fewer and stronger levels.
+
+    Args:
+        low (array-like): The low prices in chronological order.
+        high (array-like): The high prices in chronological order.
+        target_count (int): The wanted total number of support and resistance levels.
+        sensitivities (Iterable[int]): The sensitivity values to choose from. Default value is 1 to 10.
+        before_candle_count (int): The number of candles to check before each candle. Default value is 3.
+
+    Returns:
+        int: The chosen sensitivity value.
+    """
+    sensitivities = np.asarray(sorted(sensitivities))
+    counts = pivot_ranks(low, high).level_counts(before_candle_count, sensitivities)
+    distance = np.abs(counts - target_count)
+    return int(sensitivities[len(distance) - 1 - np.argmin(distance[::-1])])
+
+
+def _run_before(breaks) -> np.ndarray:
+    """
+    Counts for every candle the unbroken steps that end at it. `breaks[..., k]` tells whether the step from candle
+    k to candle k + 1 breaks the run.
+    """
+    candle_index = np.arange(breaks.shape[-1] + 1)
+    first_step = np.ones(breaks.shape[:-1] + (1,), dtype=bool)
+    last_break = np.where(
+        np.concatenate((first_step, breaks), axis=-1), candle_index, 0
+    )
+    return candle_index - np.maximum.accumulate(last_break, axis=-1)
+
+
+def _run_after(breaks) -> np.ndarray:
+    """
+    Counts for every candle the unbroken steps that start at it. `breaks[..., k]` tells whether the step from
+    candle k to candle k + 1 breaks the run.
+    """
+    return _run_before(breaks[..., ::-1])[..., ::-1]
+
+
+class PivotStream:
+    """
+    Detects support and resistance levels incrementally from a stream of closed candles.
+
+    A candle can only be confirmed or rejected once `after_candle_count` newer candles have closed, so every
+    update settles exactly one candle. The stream keeps the length of the current falling and rising runs of the
+    lows and highs, which makes each update O(1) and the state it needs O(after_candle_count). The confirmed levels
+    are kept in `support_list` and `resistance_list`, which grow with every level until the caller trims them.
+    """
+
+    def __init__(self, before_candle_count=3, after_candle_count=2):
+        self.before_candle_count = before_candle_count
+        self.after_candle_count = after_candle_count
+        self.candle_count = 0
+        self.support_list = []
+        self.resistance_list = []
+        self._last_low = self._last_high = None
+        self._low_fall = self._low_rise = self._high_rise = self._high_fall = 0
+        # (index, low, high, low falling run, high rising run) of the unsettled candles
+        self._pending = deque(maxlen=after_candle_count + 1)
+
+    def update(self, low, high) -> tuple[tuple | None, tuple | None]:
+        """
+        Adds the next closed candle and settles the candle `after_candle_count` candles back.
+
+        Args:
+            low (float): The low price of the closed candle.
+            high (float): The high price of the closed candle.
+
+        Returns:
+            tuple[tuple | None, tuple | None]: The `(index, price)` of the newly confirmed support and resistance
+            levels, or None where the settled candle is not a level.
+        """
+        low, high = float(low), float(high)
+        if self.candle_count:
+            self._low_fall = 0 if low > self._last_low else self._low_fall + 1
+            self._low_rise = 0 if low < self._last_low else self._low_rise + 1
+            self._high_rise = 0 if high < self._last_high else self._high_rise + 1
+            self._high_fall = 0 if high > self._last_high else self._high_fall + 1
+        self._last_low, self._last_high = low, high
+        self._pending.append(
+            (self.candle_count, low, high, self._low_fall, self._high_rise)
+        )
+        self.candle_count += 1
+        if len(self._pending) <= self.after_candle_count:
+            return None, None
+        index, pivot_low, pivot_high, low_fall, high_rise = self._pending[0]
+        new_support = new_resistance = None
+        if (
+            low_fall >= self.before_candle_count
+            and self._low_rise >= self.after_candle_count
+        ):
+            new_support = (index, pivot_low)
+            self.support_list.append(new_support)
+        if (
+            high_rise >= self.before_candle_count
+            and self._high_fall >= self.after_candle_count
+        ):
+            new_resistance = (index, pivot_high)
+            self.resistance_list.append(new_resistance)
+        return new_support, new_resistance
+
+    def update_kline(self, kline) -> tuple[tuple | None, tuple | None]:
+        """
+        Adds a closed Binance kline, given as the list returned by the REST API or the `k` object of a websocket
+        kline event.
+        """
+        if isinstance(kline, dict):
+            return self.update(kline["l"], kline["h"])
+        return self.update(kline[3], kline[2])
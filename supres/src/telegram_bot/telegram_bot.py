@@ -1,85 +1,58 @@
-import csv
 import os
 import sys
 import time
 from datetime import datetime
-import pandas as pd
-import pandas_ta.momentum as ta
 import plotly.graph_objects as go
 from binance.client import Client
 import telegram_frameselect
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import binance_replay
+import candle_patterns
+import candles as candle_arrays
+import exchange_info
+import export_pool
+import figure_batch
+import indicators_sma_rsi
+from main import candle_frame
 
-def historical_data_write():
+
+def historical_candles() -> candle_arrays.Candles:
     """
-    This function writes the historical data to a csv file
+    Downloads the klines of the ticker into candles in memory, oldest first.
     """
-    data = ticker + ".csv"
-    candlesticks = client.get_historical_klines(ticker, time_frame, start, limit=270)
-    header_list = [
-        "unix",
-        "open",
-        "high",
-        "low",
-        "close",
-        "volume",
-        "close time",
-        "Volume USDT",
-        "tradecount",
-        "taker buy vol",
-        "taker buy quote vol",
-        "ignore",
-    ]
-    csv_file_write = open(f"/{data}", "w", newline="")
-    klines_writer = csv.writer(csv_file_write, delimiter=",")
-    # Writing the data to a CSV file.
-    for candles in candlesticks:
-        klines_writer.writerow(candles)
-    csv_file_write.close()
-    df = pd.read_csv(data)
-    df = df.iloc[::-1]
-    df.to_csv(data, header=header_list, index=False)
-    df = pd.read_csv(data)
-    date = pd.to_datetime(df["unix"], unit="ms")
-    df.insert(1, "date", date)
-    del (
-        df["Volume USDT"],
-        df["volume"],
-        df["close time"],
-        df["taker buy vol"],
-        df["taker buy quote vol"],
-        df["ignore"],
-        df["tradecount"],
+    return candle_arrays.Candles.from_klines(
+        client.get_historical_klines(ticker, time_frame, start, limit=270)
     )
-    df.dropna(inplace=True)
-    df.to_csv(data, index=False)
 
 
-def main():
+def historical_data_write(candles):
+    """
+    Writes candles to a CSV file named after the ticker, newest candle first. The chart does not need the file,
+    this is an optional export.
+    """
+    df = candles.to_frame().iloc[::-1]
+    df.to_csv(f"{ticker}.csv", index=False)
+
+
+def main(candles):
+    """
+    Draws the chart of candles in chronological order, e.g. the candles of `historical_candles()` or of a
+    `kline_stream.KlineBuffer`, see `main.candle_view()`.
+    """
     print(
         f"Start main function in {time.perf_counter() - perf} seconds\n"
-        f"{file_name} data analysis in progress."
+        f"{ticker} data analysis in progress."
     )
     candle_count = 254  # Number of candlesticks
-    df = pd.read_csv(
-        file_name,
-        delimiter=",",
-        encoding="utf-8-sig",
-        index_col=False,
-        nrows=candle_count,
-        keep_default_na=False,
+    df = candle_frame(candles, candle_count)
+    # Every close but the latest one, without the repeated last candle
+    last_candle_close = df["close"][:-2]
+    sma10, sma50, sma100 = indicators_sma_rsi.smas(df["close"][:-1], (10, 50, 100))
+    rsi = indicators_sma_rsi.rsi(last_candle_close)
+    _, macd_histogram, _ = indicators_sma_rsi.macd(
+        last_candle_close, fast=12, slow=26, signal=9
     )
-    df = df.iloc[::-1]
-    last_candle_close = df["close"][:-1]
-    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
-    df.reset_index(drop=True, inplace=True)
-    df = pd.concat([df, df.tail(1)], axis=0, ignore_index=True)
-    dfsma = df[:-1]
-    sma10 = tuple((dfsma.ta.sma(10)))
-    sma50 = tuple((dfsma.ta.sma(50)))
-    sma100 = tuple((dfsma.ta.sma(100)))
-    rsi = tuple((ta.rsi(last_candle_close)))
-    macd = ta.macd(close=last_candle_close, fast=12, slow=26, signal=9)
     (
         support_list,
         resistance_list,
@@ -209,48 +182,11 @@ def main():
 
     def candlestick_patterns():
         """
-        Takes in a dataframe and returns a list of candlestick patterns found in the dataframe
+        Finds the candlestick patterns of the 27 candles before the last two, as pattern and date pairs
         """
-        from candlestick import candlestick
-
-        nonlocal df
-        df = candlestick.inverted_hammer(df, target="inverted_hammer")
-        df = candlestick.hammer(df, target="hammer")
-        df = candlestick.doji(df, target="doji")
-        df = candlestick.bearish_harami(df, target="bearish_harami")
-        df = candlestick.bearish_engulfing(df, target="bearish_engulfing")
-        df = candlestick.bullish_harami(df, target="bullish_harami")
-        df = candlestick.bullish_engulfing(df, target="bullish_engulfing")
-        df = candlestick.dark_cloud_cover(df, target="dark_cloud_cover")
-        df = candlestick.dragonfly_doji(df, target="dragonfly_doji")
-        df = candlestick.hanging_man(df, target="hanging_man")
-        df = candlestick.gravestone_doji(df, target="gravestone_doji")
-        df = candlestick.morning_star(df, target="morning_star")
-        df = candlestick.morning_star_doji(df, target="morning_star_doji")
-        df = candlestick.piercing_pattern(df, target="piercing_pattern")
-        df = candlestick.star(df, target="star")
-        df = candlestick.shooting_star(df, target="shooting_star")
-        df.replace({True: "pattern_found"}, inplace=True)  # Dodge boolean 'True' output
-
-        def pattern_find_func(pattern_row, t=0, pattern_find=None):
-            """
-            The function takes in a dataframe and a list of column names. It then iterates through the
-            list of column names and checks if the column name is in the dataframe. If it is, it adds
-            the column name to a list and adds the date of the match to another list
-            """
-            if pattern_find is None:
-                pattern_find = []
-            for col in df.columns:
-                pattern_find.append(col)
-                for pattern in pattern_row:
-                    if pattern == "pattern_found":
-                        # even pattern, odd date
-                        pattern_list.append(pattern_find[t])
-                        pattern_list.append(pattern_row["date"].strftime("%b-%d-%y"))
-                    t += 1
-
-        for item in range(-3, -30, -1):
-            pattern_find_func(df.iloc[item])
+        for pattern, date in candle_patterns.find_patterns(df, slice(-3, -30, -1)):
+            # even pattern, odd date
+            pattern_list.extend((pattern, date))
 
     if time_frame in historical_hightimeframe:
         candlestick_patterns()
@@ -272,6 +208,8 @@ def main():
         ]
     )
     fig.update_layout(annotations=[watermark_layout])
+    # The levels and legend rows are added to the figure at once, before the chart updates
+    batch = figure_batch.FigureBatch()
 
     def sensitivity(sens):
         """
@@ -342,7 +280,7 @@ def main():
         while 1:
             if c > len(support_list) - 1:
                 break
-            fig.add_shape(
+            batch.add_shape(
                 type="line",
                 x0=support_list[c][0] - 1,
                 y0=support_list[c][1],
@@ -351,7 +289,7 @@ def main():
                 line=dict(color=support_color, width=2),
             )
             # Support annotations
-            fig.add_annotation(
+            batch.add_annotation(
                 x=len(df) + 7,
                 y=support_list[c][1],
                 text=str(support_list[c][1]),
@@ -366,7 +304,7 @@ def main():
         while 1:
             if c > len(resistance_list) - 1:
                 break
-            fig.add_shape(
+            batch.add_shape(
                 type="line",
                 x0=resistance_list[c][0] - 1,
                 y0=resistance_list[c][1],
@@ -375,7 +313,7 @@ def main():
                 line=dict(color=res_color, width=1),
             )
             # Resistance annotations
-            fig.add_annotation(
+            batch.add_annotation(
                 x=len(df) + 20,
                 y=resistance_list[c][1],
                 text=str(resistance_list[c][1]),
@@ -386,20 +324,19 @@ def main():
     draw_support()
     draw_resistance()
     # Legend texts
-    fig.add_trace(
-        go.Scatter(
-            y=[support_list[0]],
-            name=f"Resistances    ||   Supports",
-            mode="markers+lines",
-            marker=dict(color=res_color, size=10),
-        )
+    batch.add_legend_row(
+        support_list[0],
+        f"Resistances    ||   Supports",
+        res_color,
+        mode="markers+lines",
     )
 
-    str_price_len = 3
+    # The decimals of the tick size of the pair, from the cached exchange info
+    price_precision = exchange_info_cache.price_precision(ticker)
+    if price_precision is None:
+        price_precision = exchange_info.infer_price_precision(df["close"])
     sample_price = df["close"][0]
-    if sample_price < 1:
-        str_price_len = len(str(sample_price))
-    blank = " " * (len(str(sample_price)) + 1)
+    blank = " " * (len(f"{sample_price:.{price_precision}f}") + 1)
     differ = len(resistance_above) - len(support_below)
     try:
         if differ < 0:
@@ -412,147 +349,111 @@ def main():
         for _ in range(max(len(resistance_above), len(support_below))):
             if resistance_above[temp] == 0:  # This is for legend alignment
                 legend_supres = (
-                    f"{float(resistance_above[temp]):.{str_price_len - 1}f}{blank}     "
-                    f"||   {float(support_below[temp]):.{str_price_len - 1}f}"
+                    f"{float(resistance_above[temp]):.{price_precision}f}{blank}     "
+                    f"||   {float(support_below[temp]):.{price_precision}f}"
                 )
             else:
                 legend_supres = (
-                    f"{float(resistance_above[temp]):.{str_price_len - 1}f}       "
-                    f"||   {float(support_below[temp]):.{str_price_len - 1}f}"
+                    f"{float(resistance_above[temp]):.{price_precision}f}       "
+                    f"||   {float(support_below[temp]):.{price_precision}f}"
                 )
-            fig.add_trace(
-                go.Scatter(
-                    y=[support_list[0]],
-                    name=legend_supres,
-                    mode="lines",
-                    marker=dict(color=legend_color, size=10),
-                )
-            )
+            batch.add_legend_row(support_list[0], legend_supres, legend_color)
             temp += 1
             if temp == 14:
                 break
     except IndexError:
         pass
-    fig.add_trace(
-        go.Scatter(
-            y=[support_list[0]],
-            name=f"github.com/arabacibahadir/sup-res",
-            mode="markers",
-            marker=dict(color=legend_color, size=0),
-        )
+    batch.add_legend_row(
+        support_list[0],
+        f"github.com/arabacibahadir/sup-res",
+        legend_color,
+        mode="markers",
+        size=0,
     )
-    fig.add_trace(
-        go.Scatter(
-            y=[support_list[0]],
-            name=f"-------  twitter.com/sup_res  --------",
-            mode="markers",
-            marker=dict(color=legend_color, size=0),
-        )
+    batch.add_legend_row(
+        support_list[0],
+        f"-------  twitter.com/sup_res  --------",
+        legend_color,
+        mode="markers",
+        size=0,
     )
-    fig.add_trace(
-        go.Scatter(
-            y=[support_list[0]],
-            name=f"Indicators",
-            mode="markers",
-            marker=dict(color=legend_color, size=14),
-        )
+    batch.add_legend_row(
+        support_list[0], f"Indicators", legend_color, mode="markers", size=14
     )
-    fig.add_trace(
-        go.Scatter(
-            y=[support_list[0]],
-            name=f"RSI         " f": {int(rsi[-1])}",
-            mode="lines",
-            marker=dict(color=legend_color, size=10),
-        )
+    batch.add_legend_row(
+        support_list[0], f"RSI         " f": {int(rsi[-1])}", legend_color
     )
-    fig.add_trace(
-        go.Scatter(
-            y=[support_list[0]],
-            name=f"MACD      : {int(macd['MACDh_12_26_9'][1]):.{str_price_len}f}",
-            mode="lines",
-            marker=dict(color=legend_color, size=10),
-        )
+    batch.add_legend_row(
+        support_list[0],
+        f"MACD      : {int(macd_histogram[-1]):.{price_precision}f}",
+        legend_color,
     )
 
     # Adding the SMA10, SMA50, and SMA100 to the chart and legend.
-    fig.add_trace(
-        go.Scatter(
-            x=df["date"].dt.strftime(x_date),
-            y=sma10,
-            name=f"SMA10     : {float(sma10[-1]):.{str_price_len}f}",
-            line=dict(color="#5c6cff", width=3),
-        )
+    batch.add_trace(
+        x=df["date"].dt.strftime(x_date),
+        y=sma10,
+        name=f"SMA10     : {float(sma10[-1]):.{price_precision}f}",
+        line=dict(color="#5c6cff", width=3),
     )
-    fig.add_trace(
-        go.Scatter(
-            x=df["date"].dt.strftime(x_date),
-            y=sma50,
-            name=f"SMA50     : {float(sma50[-1]):.{str_price_len}f}",
-            line=dict(color="#950fba", width=3),
-        )
+    batch.add_trace(
+        x=df["date"].dt.strftime(x_date),
+        y=sma50,
+        name=f"SMA50     : {float(sma50[-1]):.{price_precision}f}",
+        line=dict(color="#950fba", width=3),
     )
-    fig.add_trace(
-        go.Scatter(
-            x=df["date"].dt.strftime(x_date),
-            y=sma100,
-            name=f"SMA100   : {float(sma100[-1]):.{str_price_len}f}",
-            line=dict(color="#a69b05", width=3),
-        )
+    batch.add_trace(
+        x=df["date"].dt.strftime(x_date),
+        y=sma100,
+        name=f"SMA100   : {float(sma100[-1]):.{price_precision}f}",
+        line=dict(color="#a69b05", width=3),
     )
 
-    fig.add_trace(
-        go.Scatter(
-            y=[support_list[0]],
-            name=f"-- Fibonacci Uptrend | Downtrend --",
-            mode="markers",
-            marker=dict(color=legend_color, size=0),
-        )
+    batch.add_legend_row(
+        support_list[0],
+        f"-- Fibonacci Uptrend | Downtrend --",
+        legend_color,
+        mode="markers",
+        size=0,
     )
     mtp = 7
     # Add a line to the legend for each Fibonacci level
     for _ in fibonacci_uptrend:
-        fig.add_trace(
-            go.Scatter(
-                y=[support_list[0]],
-                name=f"Fib {fibonacci_multipliers[mtp]:.3f} : "
-                f"{float(fibonacci_uptrend[mtp]):.{str_price_len}f} "
-                f"| {float(fibonacci_downtrend[mtp]):.{str_price_len}f} ",
-                mode="lines",
-                marker=dict(color=legend_color, size=10),
-            )
+        batch.add_legend_row(
+            support_list[0],
+            f"Fib {fibonacci_multipliers[mtp]:.3f} : "
+            f"{float(fibonacci_uptrend[mtp]):.{price_precision}f} "
+            f"| {float(fibonacci_downtrend[mtp]):.{price_precision}f} ",
+            legend_color,
         )
         mtp -= 1
 
-    def candle_patterns():
-        fig.add_trace(
-            go.Scatter(
-                y=[support_list[0]],
-                name="----------------------------------------",
-                mode="markers",
-                marker=dict(color=legend_color, size=0),
-            )
+    def legend_candle_patterns():
+        batch.add_legend_row(
+            support_list[0],
+            "----------------------------------------",
+            legend_color,
+            mode="markers",
+            size=0,
         )
-        fig.add_trace(
-            go.Scatter(
-                y=[support_list[0]],
-                name="Latest Candlestick Patterns",
-                mode="markers",
-                marker=dict(color=legend_color, size=14),
-            )
+        batch.add_legend_row(
+            support_list[0],
+            "Latest Candlestick Patterns",
+            legend_color,
+            mode="markers",
+            size=14,
         )
         for pat1 in range(1, len(pattern_list), 2):
-            fig.add_trace(
-                go.Scatter(
-                    y=[support_list[0]],
-                    name=f"{pattern_list[pat1]} -> {pattern_list[pat1 - 1]}",
-                    mode="lines",
-                    marker=dict(color=legend_color, size=10),
-                )
+            batch.add_legend_row(
+                support_list[0],
+                f"{pattern_list[pat1]} -> {pattern_list[pat1 - 1]}",
+                legend_color,
             )
 
     if time_frame in historical_hightimeframe:
-        candle_patterns()
+        legend_candle_patterns()
 
+    batch.apply(fig)
     # Chart updates
     fig.update_layout(
         title=str(f"{ticker} {time_frame.upper()} Chart"),
@@ -579,7 +480,7 @@ def main():
         if not os.path.exists(""):
             os.mkdir("")
         image = f"../telegram_bot/{ticker}.jpeg"
-        fig.write_image(image, width=1920, height=1080)
+        export_pool.write_image(fig, image, width=1920, height=1080)
         with open("output.txt", "w") as f:
             f.write(f"{image}\n{text_image}")
 
@@ -616,7 +517,7 @@ def main():
 
 if __name__ == "__main__":
     os.chdir("")  # Changing the directory to the `telegram_bot` folder
-    client = Client("", "")
+    client = binance_replay.make_client()
     current = datetime.now()
     current_time = current.strftime("%b-%d-%y %H:%M")
     ticker = sys.argv[1]  # Pair
@@ -626,16 +527,15 @@ if __name__ == "__main__":
     # Selecting the frame that the user wants to start from.
     start = telegram_frameselect.frame_select(frame_s)[1]
     perf = time.perf_counter()
-    historical_data_write()
-    file_name = ticker + ".csv"
-    # Getting the information about the asset from the Binance API.
-    symbol_info = client.get_symbol_info(ticker)
-    print("Data writing:", file_name)
-    if os.path.isfile(file_name):
-        print(f"{file_name} downloaded and created.")
+    candles = historical_candles()
+    # Getting the information about the asset from the cached exchange info.
+    exchange_info_cache = exchange_info.default_cache(client)
+    symbol_info = exchange_info_cache.symbol_info(ticker)
+    if len(candles):
+        print(f"{ticker} {len(candles)} candles downloaded.")
     else:
         print(
             "One or more issues caused the download to fail. "
-            "Make sure you typed the filename correctly in the settings."
+            "Make sure you typed the pair correctly."
         )
-    main()
+    main(candles)
@@ -1,20 +1,19 @@
-from binance import Client
 from datetime import datetime, timedelta
 
 frame_select_dict = {
-    "1M": [Client.KLINE_INTERVAL_1MINUTE, -260],
-    "3M": [Client.KLINE_INTERVAL_3MINUTE, -780],
-    "5M": [Client.KLINE_INTERVAL_5MINUTE, -1300],
-    "15M": [Client.KLINE_INTERVAL_15MINUTE, -3900],
-    "30M": [Client.KLINE_INTERVAL_30MINUTE, -7800],
-    "1H": [Client.KLINE_INTERVAL_1HOUR, -260],
-    "2H": [Client.KLINE_INTERVAL_2HOUR, -520],
-    "4H": [Client.KLINE_INTERVAL_4HOUR, -1040],
-    "6H": [Client.KLINE_INTERVAL_6HOUR, -1560],
-    "8H": [Client.KLINE_INTERVAL_8HOUR, -2080],
-    "12H": [Client.KLINE_INTERVAL_12HOUR, -15],
-    "1D": [Client.KLINE_INTERVAL_1DAY, -260],
-    "3D": [Client.KLINE_INTERVAL_3DAY, -780],
+    "1M": ["1m", -260],
+    "3M": ["3m", -780],
+    "5M": ["5m", -1300],
+    "15M": ["15m", -3900],
+    "30M": ["30m", -7800],
+    "1H": ["1h", -260],
+    "2H": ["2h", -520],
+    "4H": ["4h", -1040],
+    "6H": ["6h", -1560],
+    "8H": ["8h", -2080],
+    "12H": ["12h", -15],
+    "1D": ["1d", -260],
+    "3D": ["3d", -780],
 }
 
 
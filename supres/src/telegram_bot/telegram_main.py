@@ -1,5 +1,6 @@
 import os
 import subprocess
+import sys
 import time
 import telegram
 from binance.client import Client
@@ -7,10 +8,14 @@ from telegram.ext import *
 import cmc
 import datetime
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import binance_replay
+import exchange_info
+import export_pool
+
 telegram_api = "your-api"  # Replace this with your telegram bot api
-client = Client("", "")
-bot = telegram.Bot(token=telegram_api)
-os.chdir("")  # Changing the directory to the `telegram_bot` folder
+# Set up in main(), so the spawned export workers, which import this script again, do not connect to the APIs
+client = exchange_info_cache = bot = None
 
 
 def start_command(update, context):
@@ -96,10 +101,7 @@ def responses(input_text):
                 os.unlink("/output.txt")
 
     if user_message.startswith("supres"):
-        has_pair = any(
-            telegram_user_ticker_input.upper() == i.get("symbol")
-            for i in client.get_all_tickers()
-        )
+        has_pair = exchange_info_cache.has_symbol(telegram_user_ticker_input)
         print(
             "Pair found in Binance API."
             if has_pair
@@ -136,6 +138,15 @@ def error(update, context):
 
 
 def main():
+    global client, exchange_info_cache, bot
+    client = binance_replay.make_client()
+    exchange_info_cache = exchange_info.default_cache(client)
+    bot = telegram.Bot(token=telegram_api)
+    os.chdir("")  # Changing the directory to the `telegram_bot` folder
+    # The chart scripts export their images through the warm workers of the bot
+    if "SUPRES_EXPORT_URL" not in os.environ:
+        server = export_pool.ExportServer(export_pool.ExportPool()).start()
+        os.environ["SUPRES_EXPORT_URL"] = server.url
     updater = Updater(telegram_api, use_context=True)
     dp = updater.dispatcher
     dp.add_handler(CommandHandler("Start", start_command))
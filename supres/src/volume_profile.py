@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class VolumeProfile:
+    bin_edges: np.ndarray
+    volume: np.ndarray
+    buy_volume: np.ndarray | None
+    point_of_control: float
+    value_area_low: float
+    value_area_high: float
+    high_volume_nodes: np.ndarray
+    low_volume_nodes: np.ndarray
+
+    @property
+    def bin_centers(self) -> np.ndarray:
+        return (self.bin_edges[:-1] + self.bin_edges[1:]) / 2
+
+
+def volume_profile(
+    high, low, volume, bins=100, buy_volume=None, value_area=0.7
+) -> VolumeProfile:
+    """
+    Calculates the volume at price of a series of candles.
+
+    The volume of every candle is spread evenly over its high-low range. Instead of looping over candles and bins,
+    the cumulative volume below every bin edge is a piecewise linear sum that is evaluated for all edges at once
+    from prefix sums over the sorted lows and highs, so 100k candles take milliseconds.
+
+    Args:
+        high (array-like): The high prices of the candles.
+        low (array-like): The low prices of the candles.
+        volume (array-like): The volume of the candles, e.g. the "Volume USDT" column.
+        bins (int): The number of price bins. Default value is 100.
+        buy_volume (array-like): The taker buy volume of the candles, e.g. the "taker buy quote vol" column.
+        value_area (float): The share of the volume inside the value area. Default value is 0.7.
+
+    Returns:
+        VolumeProfile: The volume of every bin, the point of control, the value area bounds and the high and low
+        volume nodes. Without candles the profile has no bins and the prices are NaN, and candles that all trade at
+        one price make a single bin at that price.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    if not len(high):
+        no_bins = np.empty(0)
+        return VolumeProfile(
+            bin_edges=no_bins,
+            volume=no_bins,
+            buy_volume=None if buy_volume is None else no_bins,
+            point_of_control=np.nan,
+            value_area_low=np.nan,
+            value_area_high=np.nan,
+            high_volume_nodes=no_bins,
+            low_volume_nodes=no_bins,
+        )
+    if low.min() == high.max():
+        bins = 1
+    bin_edges = np.linspace(low.min(), high.max(), bins + 1)
+    profile = _spread_volume(high, low, volume, bin_edges)
+    poc_bin = int(np.argmax(profile))
+    value_low_bin, value_high_bin = _value_area(profile, poc_bin, value_area)
+    high_nodes, low_nodes = _volume_nodes(profile)
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    return VolumeProfile(
+        bin_edges=bin_edges,
+        volume=profile,
+        buy_volume=None
+        if buy_volume is None
+        else _spread_volume(high, low, buy_volume, bin_edges),
+        point_of_control=float(bin_centers[poc_bin]),
+        value_area_low=float(bin_edges[value_low_bin]),
+        value_area_high=float(bin_edges[value_high_bin + 1]),
+        high_volume_nodes=bin_centers[high_nodes],
+        low_volume_nodes=bin_centers[low_nodes],
+    )
+
+
+def _spread_volume(high, low, volume, bin_edges) -> np.ndarray:
+    """
+    Spreads the volume of every candle evenly over its high-low range and sums it per bin.
+    """
+    volume = np.asarray(volume, dtype=float)
+    flat = high <= low
+    # Candles without a range put all of their volume into one bin
+    profile = np.histogram(low[flat], bins=bin_edges, weights=volume[flat])[0]
+    # Measuring prices from the lowest edge keeps the prefix sums small
+    base = bin_edges[0]
+    edges = bin_edges - base
+    high, low, volume = high[~flat] - base, low[~flat] - base, volume[~flat]
+    slope = volume / (high - low)
+    volume_below = np.zeros(len(edges))
+    for prices, sign in ((low, 1), (high, -1)):
+        order = np.argsort(prices)
+        slope_sum = np.concatenate(([0], np.cumsum(slope[order])))
+        weighted_sum = np.concatenate(([0], np.cumsum((slope * prices)[order])))
+        count = np.searchsorted(prices[order], edges, side="left")
+        volume_below += sign * (edges * slope_sum[count] - weighted_sum[count])
+    return profile + np.diff(volume_below)
+
+
+def _value_area(profile, poc_bin, value_area) -> tuple[int, int]:
+    """
+    Grows the value area from the point of control towards the busier neighbouring bin until it holds
+    `value_area` of the volume.
+    """
+    target = profile.sum() * value_area
+    low_bin = high_bin = poc_bin
+    area_volume = profile[poc_bin]
+    while area_volume < target and (low_bin > 0 or high_bin < len(profile) - 1):
+        below = profile[low_bin - 1] if low_bin > 0 else -1
+        above = profile[high_bin + 1] if high_bin < len(profile) - 1 else -1
+        if above >= below:
+            high_bin += 1
+            area_volume += above
+        else:
+            low_bin -= 1
+            area_volume += below
+    return low_bin, high_bin
+
+
+def _volume_nodes(profile) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the peaks above and the valleys below the average volume of a lightly smoothed profile.
+    """
+    smooth = np.convolve(np.pad(profile, 1, mode="edge"), np.ones(3) / 3, "valid")
+    left = np.concatenate(([-np.inf], smooth[:-1]))
+    right = np.concatenate((smooth[1:], [-np.inf]))
+    average = profile.mean()
+    peak = (smooth > left) & (smooth >= right) & (smooth > average)
+    # The tails of the profile always thin out, so only inner bins count as valleys
+    valley = (smooth < left) & (smooth <= right) & (smooth < average)
+    valley[[0, -1]] = False
+    return np.flatnonzero(peak), np.flatnonzero(valley)
+
+
+def add_volume_profile(fig, profile, color="SteelBlue", opacity=0.25) -> None:
+    """
+    Draws a volume profile as a horizontal histogram on the right side of the price chart of a figure.
+
+    Args:
+        fig (plotly.graph_objects.Figure): The figure whose first y axis is the price axis.
+        profile (VolumeProfile): The volume profile to draw.
+        color (str): The bar color. Default value is "SteelBlue".
+        opacity (float): The bar opacity. Default value is 0.25.
+    """
+    import plotly.graph_objects as go
+
+    if not len(profile.volume):
+        return
+    axis_number = (
+        max(sum(key.startswith("xaxis") for key in fig.layout.to_plotly_json()), 1) + 1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=profile.volume,
+            y=profile.bin_centers,
+            width=np.diff(profile.bin_edges),
+            orientation="h",
+            name="Volume profile",
+            xaxis=f"x{axis_number}",
+            yaxis="y",
+            marker=dict(color=color, opacity=opacity),
+            showlegend=False,
+            hoverinfo="skip",
+        )
+    )
+    fig.update_layout(
+        {
+            f"xaxis{axis_number}": dict(
+                overlaying="x",
+                side="top",
+                range=[profile.volume.max() * 4, 0],
+                visible=False,
+            )
+        }
+    )
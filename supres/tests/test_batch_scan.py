@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+import support_resistance
+from batch_scan import scan_levels, stack_ohlc
+
+
+def read_candles(csv_name):
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), csv_name))
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def test_scan_levels_matches_single_ticker_pivots():
+    frames = {
+        "BTCUSDT_1D": read_candles("BTCUSDT_1d.csv"),
+        "BTCUSDT_15M": read_candles("BTCUSDT_15m.csv"),
+        "SHORT": read_candles("BTCUSDT_1d.csv").tail(40).reset_index(drop=True),
+    }
+    stack = stack_ohlc(frames)
+    assert stack.low.shape == (3, 277)
+    assert stack.valid.sum(axis=1).tolist() == [261, 277, 40]
+    levels = scan_levels(stack, 3, 2)
+    for ticker, frame in frames.items():
+        supports, resistances = support_resistance.pivots(frame.low, frame.high, 3, 2)
+        assert levels[ticker][0] == [(row, frame.low[row]) for row in supports]
+        assert levels[ticker][1] == [(row, frame.high[row]) for row in resistances]
+
+
+def test_stack_ohlc_candle_count():
+    frames = {"BTCUSDT": read_candles("BTCUSDT_1d.csv")}
+    stack = stack_ohlc(frames, candle_count=10)
+    assert stack.valid.all()
+    assert np.array_equal(stack.close[0], frames["BTCUSDT"].close.tail(10))
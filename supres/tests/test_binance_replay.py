@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from binance_replay import BinanceStandIn, Recording
+from kline_downloader import KlineDownloader
+
+minute = 60 * 1000
+start = 1_700_000_000_000 // minute * minute
+force_order = '{"e":"forceOrder","o":{"s":"BTCUSDT","S":"SELL","p":"9910"}}'
+
+
+@pytest.fixture
+def recording(tmp_path):
+    recording = Recording(str(tmp_path / "recording"))
+    for page in range(3):
+        klines = [
+            [open_time, "1.0", "2.0", "0.5", "1.5", "10.0", open_time + minute - 1]
+            + ["15.0", 7, "4.0", "6.0", "0"]
+            for open_time in range(
+                start + page * 100 * minute, start + (page + 1) * 100 * minute, minute
+            )
+        ]
+        recording.add_response(
+            "/api/v3/klines",
+            f"symbol=BTCUSDT&interval=1m&startTime={start + page * 100 * minute}",
+            200,
+            json.dumps(klines),
+        )
+    recording.add_response("/api/v3/ping", "", 200, "{}")
+    recording.add_message("/futures/ws/!forceOrder@arr", 0.0, force_order)
+    recording.add_message("/futures/ws/!forceOrder@arr", 0.05, force_order)
+    return recording
+
+
+def test_replay_klines(recording, tmp_path):
+    # A new recording reads what the fixture wrote
+    with BinanceStandIn(recording.directory) as stand_in:
+        downloader = KlineDownloader(base_url=stand_in.api_url, page_size=50)
+        klines = downloader.download(
+            "BTCUSDT", "1m", start + 10 * minute, start + 299 * minute
+        )
+        assert len(klines["unix"]) == 290
+        with urllib.request.urlopen(f"{stand_in.api_url}/api/v3/ping") as response:
+            assert json.load(response) == {}
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{stand_in.api_url}/api/v3/time")
+        assert error.value.code == 404
+
+    # Recording through a stand-in that replays the first one
+    with BinanceStandIn(recording.directory) as upstream:
+        with BinanceStandIn(
+            str(tmp_path / "copy"), mode="record", rest_upstream=upstream.api_url
+        ) as recorder:
+            with urllib.request.urlopen(f"{recorder.api_url}/api/v3/ping") as response:
+                assert json.load(response) == {}
+    assert Recording(str(tmp_path / "copy")).response("/api/v3/ping", "") == (200, "{}")
+
+
+def test_replay_weight_limit(recording):
+    with BinanceStandIn(recording.directory, weight_limit=3) as stand_in:
+        url = f"{stand_in.api_url}/api/v3/klines?symbol=BTCUSDT&interval=1m&limit=5"
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["X-MBX-USED-WEIGHT-1M"] == "2"
+            assert len(json.load(response)) == 5
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url)
+        assert error.value.code == 429
+        assert "Retry-After" in error.value.headers
+
+
+def test_replay_stream(recording):
+    from websockets.asyncio.client import connect
+
+    async def receive(url):
+        async with connect(url) as websocket:
+            return [await websocket.recv() for _ in range(2)]
+
+    with BinanceStandIn(recording.directory, speed=10) as stand_in:
+        messages = asyncio.run(receive(f"{stand_in.futures_ws_url}/ws/!forceOrder@arr"))
+    assert messages == [force_order, force_order]
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+import candle_patterns
+from candles import Candles
+
+# (open, high, low, close) of a flat candle, a hammer that is also a dragonfly doji, a bearish engulfing candle and
+# a bullish engulfing candle
+ohlc = np.array(
+    [
+        [100.0, 102.0, 98.0, 101.0],
+        [100.0, 100.5, 90.0, 100.4],
+        [104.0, 104.5, 96.0, 97.0],
+        [96.5, 106.0, 96.0, 105.0],
+    ]
+)
+
+
+def test_pattern_masks():
+    masks = candle_patterns.pattern_masks(*ohlc.T)
+    assert list(masks) == list(candle_patterns.pattern_names)
+    assert list(masks["hammer"]) == [False, True, False, False]
+    assert list(masks["bullish_engulfing"]) == [False, False, False, True]
+    # The first candle has no previous candle to engulf
+    assert not any(mask[0] for name, mask in masks.items() if name != "doji")
+
+
+def test_pattern_bits_and_hits():
+    bits = candle_patterns.pattern_bits(*ohlc.T)
+    assert bits.dtype == np.uint16
+    hammer = candle_patterns.pattern_names.index("hammer")
+    engulfing = candle_patterns.pattern_names.index("bullish_engulfing")
+    assert bits[1] >> hammer & 1 and bits[3] >> engulfing & 1
+    frame = pd.DataFrame(ohlc, columns=["open", "high", "low", "close"])
+    frame.insert(0, "date", pd.date_range("2023-05-01", periods=4, freq="D"))
+    frame["Volume USDT"] = 1.0
+    # Newest first, like the legend of the charts
+    assert candle_patterns.find_patterns(frame, slice(None, None, -1)) == [
+        ("bullish_engulfing", "May-04-23"),
+        ("bearish_engulfing", "May-03-23"),
+        ("hammer", "May-02-23"),
+        ("dragonfly_doji", "May-02-23"),
+    ]
+    assert candle_patterns.find_patterns(frame, slice(0, 1)) == []
+    candles = Candles.from_frame(frame)
+    assert candle_patterns.find_patterns(candles, slice(1, 2), "%Y-%m-%d") == [
+        ("hammer", "2023-05-02"),
+        ("dragonfly_doji", "2023-05-02"),
+    ]
+
+
+def test_tail_window_and_scanner():
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 1, 400))
+    open_ = np.roll(close, 1) + rng.normal(0, 0.3, 400)
+    high = np.maximum(open_, close) + rng.exponential(0.8, 400)
+    low = np.minimum(open_, close) - rng.exponential(0.8, 400)
+    columns = {
+        "unix": np.arange(400) * 86400000,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+    }
+    # Evaluating only the tail finds the same hits as evaluating every candle
+    bits = candle_patterns.pattern_bits(open_, high, low, close)
+    dates = candle_patterns.candle_dates(columns)
+    expected = candle_patterns.pattern_hits(bits, dates, slice(-3, -30, -1))
+    assert expected
+    assert candle_patterns.find_patterns(columns, slice(-3, -30, -1)) == expected
+    scanner = candle_patterns.PatternScanner(history=30)
+    scanner.seed("BTCUSDT", {name: values[:380] for name, values in columns.items()})
+    for position in range(380, 400):
+        scanner.update(
+            "BTCUSDT",
+            columns["unix"][position],
+            open_[position],
+            high[position],
+            low[position],
+            close[position],
+        )
+    assert scanner.hits("BTCUSDT", slice(-3, -30, -1)) == expected
+    assert scanner.hits("ETHUSDT") == []
+    # The tickers of a stacked batch are evaluated along the candle axis
+    stacked = candle_patterns.pattern_bits(
+        *(np.stack([prices, prices[::-1]]) for prices in (open_, high, low, close))
+    )
+    np.testing.assert_array_equal(stacked[0], bits)
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from batch_scan import stack_ohlc
+from candles import Candles
+
+
+def test_candles_round_trip():
+    path = os.path.join(os.path.dirname(__file__), "BTCUSDT_15m.csv")
+    df = pd.read_csv(path).iloc[::-1].reset_index(drop=True)
+    candles = Candles.from_frame(df)
+    assert len(candles) == len(df)
+    assert candles.open_time.dtype == np.int64
+    assert candles.close.flags.c_contiguous
+    assert candles.nbytes == len(df) * 6 * 8
+    frame = candles.to_frame()
+    assert list(frame.columns) == list(df.columns)
+    assert np.array_equal(frame["date"], pd.to_datetime(df["date"]))
+    assert np.array_equal(frame["close"], df["close"])
+    # The date column alone gives the same open times
+    assert np.array_equal(
+        Candles.from_frame(df.drop(columns="unix")).open_time, candles.open_time
+    )
+
+    small = candles.astype(np.float32)
+    assert small.nbytes == len(df) * (8 + 5 * 4)
+    assert np.allclose(small.close, candles.close)
+
+
+def test_candles_slicing_shares_memory():
+    candles = Candles.from_klines(
+        [
+            [open_time, "1.0", "2.0", "0.5", str(open_time), "10.0", open_time + 1]
+            + ["15.0", 7, "4.0", "6.0", "0"]
+            for open_time in range(10)
+        ]
+    )
+    tail = candles.tail(3)
+    assert list(tail["unix"]) == [7, 8, 9]
+    assert np.shares_memory(tail.close, candles.close)
+    assert list(tail["Volume USDT"]) == [15.0] * 3
+    assert "close" in tail and "tradecount" not in tail
+    stack = stack_ohlc({"A": tail, "B": candles[:5]}, candle_count=4)
+    assert np.array_equal(stack.valid[0], [False, True, True, True])
+    assert np.array_equal(stack.close[1], [1, 2, 3, 4])
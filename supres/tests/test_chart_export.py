@@ -0,0 +1,54 @@
+import os
+import sys
+
+import plotly.graph_objects as go
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+import chart_export
+from export_pool import ExportPool
+
+
+def fake_render(figure_json, image_format, width, height, scale) -> bytes:
+    # Stands in for kaleido in the worker processes
+    return f"{image_format} {width}x{height} {os.getpid()}".encode()
+
+
+class NoRenderPool:
+    def submit(self, *job):
+        raise AssertionError("The export was rendered again")
+
+
+def test_export_chart(tmp_path):
+    fig = go.Figure(go.Scatter(x=[0, 1, 2], y=[3, 1, 2], name="Close"))
+    with ExportPool(workers=2, renderer=fake_render) as pool:
+        paths = chart_export.export_chart(
+            fig, str(tmp_path), ("html", "png", "pdf", "svg"), width=800, pool=pool
+        )
+    assert set(paths) == {"html", "png", "pdf", "svg"}
+    folder = os.path.dirname(paths["png"])
+    assert sorted(os.listdir(folder)) == [
+        "chart.html",
+        "chart.pdf",
+        "chart.png",
+        "chart.svg",
+    ]
+    with open(paths["png"], "rb") as image:
+        assert image.read().startswith(b"png 800x1080")
+    with open(paths["html"]) as html:
+        assert "Close" in html.read()
+    # The same chart is not rendered again, a different size or figure is
+    assert chart_export.export_chart(
+        fig.to_json(), str(tmp_path), ("png", "html"), width=800, pool=NoRenderPool()
+    ) == {name: paths[name] for name in ("png", "html")}
+    with pytest.raises(AssertionError):
+        chart_export.export_chart(fig, str(tmp_path), ("png",), pool=NoRenderPool())
+    # The HTML of another plotly.js option is written next to the embedded one
+    cdn = chart_export.export_chart(
+        fig, str(tmp_path), ("html",), width=800, include_plotlyjs="cdn"
+    )["html"]
+    assert cdn != paths["html"] and os.path.dirname(cdn) == folder
+    with open(cdn) as html, open(paths["html"]) as embedded:
+        assert len(html.read()) < len(embedded.read())
+    with pytest.raises(ValueError):
+        chart_export.export_chart(fig, str(tmp_path), ("gif",))
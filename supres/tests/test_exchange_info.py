@@ -0,0 +1,59 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from exchange_info import ExchangeInfoCache, infer_price_precision
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get_exchange_info(self):
+        self.calls += 1
+        return {
+            "symbols": [
+                {
+                    "symbol": symbol,
+                    "status": "TRADING",
+                    "filters": [
+                        {"filterType": "PRICE_FILTER", "tickSize": tick_size},
+                        {"filterType": "LOT_SIZE", "stepSize": "0.00001000"},
+                    ],
+                }
+                for symbol, tick_size in (
+                    ("BTCUSDT", "0.01000000"),
+                    ("SHIBUSDT", "0.00000001"),
+                    ("BTTCTRY", "1.00000000"),
+                )
+            ]
+        }
+
+
+def test_exchange_info_is_fetched_once(tmp_path):
+    path = str(tmp_path / "exchange_info.json")
+    client = FakeClient()
+    cache = ExchangeInfoCache(path, client=client)
+    assert cache.has_symbol("btcusdt")
+    assert not cache.has_symbol("NOPEUSDT")
+    assert cache.symbol_info("BTCUSDT")["status"] == "TRADING"
+    assert cache.tick_size("SHIBUSDT") == 1e-8
+    assert cache.price_precision("BTCUSDT") == 2
+    assert cache.price_precision("SHIBUSDT") == 8
+    assert cache.price_precision("BTTCTRY") == 0
+    assert cache.price_precision("NOPEUSDT") is None
+    assert cache.format_price("BTCUSDT", 16750.254) == "16750.25"
+    assert client.calls == 1
+
+    # A new cache reads the file instead of asking Binance again
+    assert ExchangeInfoCache(path, client=client).has_symbol("BTCUSDT")
+    assert client.calls == 1
+    # Until it is older than the TTL
+    assert ExchangeInfoCache(path, ttl=-1, client=client).has_symbol("BTCUSDT")
+    assert client.calls == 2
+
+
+def test_infer_price_precision():
+    assert infer_price_precision([16750.25, 16749.1, 16800.0]) == 2
+    assert infer_price_precision([0.00001234, 0.0000125]) == 8
+    assert infer_price_precision([42.0, 43.0]) == 0
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+import export_pool
+from export_pool import ExportPool, ExportServer
+
+
+def fake_render(figure_json, image_format, width, height, scale) -> bytes:
+    # Stands in for kaleido in the worker processes
+    if "slow" in figure_json:
+        time.sleep(30)
+    if "broken" in figure_json:
+        raise ValueError("broken figure")
+    return f"{image_format} {width}x{height} {os.getpid()}".encode()
+
+
+def test_pool_exports_and_replaces_hung_workers():
+    with ExportPool(workers=2, timeout=10, renderer=fake_render) as pool:
+        images = [
+            pool.submit({"data": [], "layout": {"title": str(number)}}, "svg", 800, 600)
+            for number in range(6)
+        ]
+        assert all(image.result().startswith(b"svg 800x600") for image in images)
+        slow = pool.submit('{"layout": "slow"}', timeout=0.5)
+        with pytest.raises((TimeoutError, FutureTimeoutError)):
+            slow.result()
+        with pytest.raises(RuntimeError, match="broken figure"):
+            pool.export('{"layout": "broken"}')
+        assert pool.export("{}", "pdf").startswith(b"pdf 1920x1080")
+        with pytest.raises(ValueError):
+            pool.submit("{}", "gif")
+
+
+def test_server_and_write_image(tmp_path, monkeypatch):
+    with ExportPool(workers=1, renderer=fake_render) as pool, ExportServer(
+        pool
+    ) as server:
+        monkeypatch.setenv("SUPRES_EXPORT_URL", server.url)
+        path = tmp_path / "BTCUSDT.jpg"
+        export_pool.write_image({"data": []}, str(path), width=640, height=480)
+        assert path.read_bytes().startswith(b"jpeg 640x480")
+        with pytest.raises(RuntimeError, match="broken figure"):
+            export_pool.export_image('{"layout": "broken"}')
+
+
+def test_export_image_in_process(monkeypatch):
+    # Without an export server, the image is rendered by the calling process
+    monkeypatch.delenv("SUPRES_EXPORT_URL", raising=False)
+    monkeypatch.setattr(export_pool, "kaleido_render", fake_render)
+    image = export_pool.export_image({"data": []}, "png", 640, 480)
+    assert image == f"png 640x480 {os.getpid()}".encode()
+    with pytest.raises(ValueError):
+        export_pool.export_image({"data": []}, "gif")
+
+
+def test_default_pool_grows(monkeypatch):
+    monkeypatch.setattr(export_pool, "_default_pool", None)
+    pool = export_pool.default_pool()
+    assert export_pool.default_pool(1) is pool
+    larger = export_pool.default_pool(3)
+    assert larger is not pool and larger.workers == 3
+    assert export_pool.default_pool(2) is larger
+    larger.close()
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import plotly.graph_objects as go
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from figure_batch import FigureBatch
+
+
+def test_batch_matches_single_calls():
+    single, batched = go.Figure(), go.Figure()
+    batch = FigureBatch()
+    for fig in single, batched:
+        fig.add_trace(go.Scatter(x=[0, 1], y=[1, 2], name="Close"))
+        fig.add_hline(y=1.5)
+    for price in 1.0, 2.0:
+        single.add_shape(type="line", x0=0, y0=price, x1=3, y1=price)
+        single.add_annotation(x=2, y=price, text=str(price))
+        single.add_trace(
+            go.Scatter(
+                y=[price], name=f"{price}", mode="lines", marker=dict(color="red")
+            )
+        )
+        batch.add_shape(type="line", x0=0, y0=price, x1=3, y1=price)
+        batch.add_annotation(x=2, y=price, text=str(price))
+        batch.add_legend_row(price, f"{price}", "red", size=None)
+    single.add_trace(go.Scatter(x=[0, 1], y=[2, 1], line=dict(width=3)))
+    batch.add_trace(x=[0, 1], y=[2, 1], line=dict(width=3))
+    assert batch.apply(batched).to_dict() == single.to_dict()
+    assert not batch.traces and not batch.shapes and not batch.annotations
+
+
+def test_panel_mode():
+    batch = FigureBatch(legend_mode="panel", panel_color="#D8D8D8")
+    batch.add_legend_row(1.0, "RSI : 45", "red")
+    batch.add_legend_row(1.0, "SMA20 : 1.50", "red", mode="markers", size=14)
+    batch.add_annotation(x=2, y=1.0, text="1.0")
+    fig = batch.apply(go.Figure(go.Scatter(x=[0, 1], y=[1, 2])))
+    assert len(fig.data) == 1
+    assert [annotation.text for annotation in fig.layout.annotations] == [
+        "1.0",
+        "RSI : 45<br>SMA20 : 1.50",
+    ]
+    # The panel is right of the plot area, in the right margin
+    panel = fig.layout.annotations[-1]
+    assert panel.x > 1 and panel.xanchor == "left"
+    assert fig.layout.margin.r == 260
+    with pytest.raises(ValueError):
+        FigureBatch(legend_mode="table")
@@ -0,0 +1,116 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+import indicators_sma_rsi
+from candles import Candles
+
+rng = np.random.default_rng(7)
+close = pd.Series(20000 + np.cumsum(rng.normal(0, 50, 3000)))
+
+
+def reference_ema(series, length):
+    # pandas_ta.ema(): the SMA of the first closes seeds an unadjusted EWM
+    valid = series.dropna()
+    seeded = valid.copy()
+    seeded.iloc[: length - 1] = np.nan
+    seeded.iloc[length - 1] = valid.iloc[:length].mean()
+    return seeded.ewm(span=length, adjust=False).mean().reindex(series.index)
+
+
+def reference_rsi(series, length=14):
+    change = series.diff()
+    gain = change.clip(lower=0)
+    loss = change.clip(upper=0).abs()
+    gain = gain.ewm(alpha=1 / length, min_periods=length).mean()
+    loss = loss.ewm(alpha=1 / length, min_periods=length).mean()
+    return 100 * gain / (gain + loss)
+
+
+def test_smas():
+    for length, average in zip(
+        (20, 50, 100), indicators_sma_rsi.smas(close, (20, 50, 100))
+    ):
+        expected = close.rolling(length, min_periods=length).mean()
+        np.testing.assert_allclose(average, expected, rtol=1e-10)
+    assert np.isnan(indicators_sma_rsi.sma(close[:5], 10)).all()
+
+
+def test_ema_and_macd():
+    # Short lengths span several blocks of the linear filter
+    for length in (2, 3, 9, 12, 26, 200):
+        np.testing.assert_allclose(
+            indicators_sma_rsi.ema(close, length),
+            reference_ema(close, length),
+            rtol=1e-10,
+        )
+    line, histogram, signal = indicators_sma_rsi.macd(close)
+    expected_line = reference_ema(close, 12) - reference_ema(close, 26)
+    expected_signal = reference_ema(expected_line, 9)
+    np.testing.assert_allclose(line, expected_line, rtol=1e-10)
+    np.testing.assert_allclose(signal, expected_signal, rtol=1e-8)
+    np.testing.assert_allclose(histogram, expected_line - expected_signal, atol=1e-8)
+    assert np.isnan(signal[:33]).all() and not np.isnan(signal[33])
+
+
+def test_rsi_and_indicators():
+    np.testing.assert_allclose(
+        indicators_sma_rsi.rsi(close, 2), reference_rsi(close, 2), rtol=1e-10
+    )
+    expected = reference_rsi(close)
+    np.testing.assert_allclose(indicators_sma_rsi.rsi(close), expected, rtol=1e-10)
+    assert np.isnan(indicators_sma_rsi.rsi(close)[:14]).all()
+    frame = pd.DataFrame({"unix": np.arange(len(close)) * 60000, "open": close})
+    for column in ("high", "low", "close", "Volume USDT"):
+        frame[column] = close
+    *averages, rsi_values = indicators_sma_rsi.indicators(
+        Candles.from_frame(frame), 20, 50, 100
+    )
+    np.testing.assert_allclose(averages[1], close.rolling(50).mean(), rtol=1e-10)
+    np.testing.assert_allclose(rsi_values, reference_rsi(close[:-1]), rtol=1e-10)
+
+
+def test_states_follow_the_batch_values():
+    history, live = close[:254], close[254:600]
+    states = {
+        "sma": indicators_sma_rsi.SmaState(50),
+        "ema": indicators_sma_rsi.EmaState(26),
+        "rsi": indicators_sma_rsi.RsiState(14),
+        "macd": indicators_sma_rsi.MacdState(12, 26, 9),
+    }
+    for state in states.values():
+        state.seed(history)
+    values = {name: [] for name in states}
+    for price in live:
+        for name, state in states.items():
+            # Peeking at the candle in progress does not change the state
+            provisional = state.peek(price + 100)
+            assert state.peek(price + 100) == provisional
+            values[name].append(state.update(price))
+    closes = close[:600]
+    expected = {
+        "sma": indicators_sma_rsi.sma(closes, 50),
+        "ema": indicators_sma_rsi.ema(closes, 26),
+        "rsi": indicators_sma_rsi.rsi(closes, 14),
+        "macd": np.column_stack(indicators_sma_rsi.macd(closes, 12, 26, 9)),
+    }
+    np.testing.assert_array_equal(values["sma"], expected["sma"][254:])
+    for name in ("ema", "rsi", "macd"):
+        np.testing.assert_allclose(
+            values[name], expected[name][254:], rtol=1e-12, atol=1e-9
+        )
+
+
+def test_states_warm_up_like_the_batch_values():
+    state = indicators_sma_rsi.MacdState()
+    values = [state.update(price) for price in close[:40]]
+    expected = np.column_stack(indicators_sma_rsi.macd(close[:40]))
+    np.testing.assert_allclose(values, expected, rtol=1e-12, atol=1e-9)
+    rsi_state = indicators_sma_rsi.RsiState()
+    assert np.isnan(rsi_state.seed(close[:14]))
+    np.testing.assert_allclose(
+        rsi_state.peek(close[14]), indicators_sma_rsi.rsi(close[:15])[-1], rtol=1e-12
+    )
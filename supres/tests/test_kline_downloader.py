@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from kline_downloader import KlineDownloader, RequestWeightLimiter
+
+minute = 60 * 1000
+
+
+class FakeKlineHandler(BaseHTTPRequestHandler):
+    """
+    Serves one-minute klines for any time range, and answers the first request with a 429.
+    """
+
+    requests = []
+
+    def do_GET(self):
+        query = dict(urllib.parse.parse_qsl(urllib.parse.urlparse(self.path).query))
+        self.requests.append(query)
+        if len(self.requests) == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        start, end = int(query["startTime"]), int(query["endTime"])
+        first = -(-start // minute) * minute
+        klines = [
+            [open_time, "1.0", "2.0", "0.5", "1.5", "10.0", open_time + minute - 1]
+            + ["15.0", 7, "4.0", "6.0", "0"]
+            for open_time in range(first, end + 1, minute)
+        ][: int(query["limit"])]
+        body = json.dumps(klines).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-MBX-USED-WEIGHT-1M", str(2 * len(self.requests)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def kline_server():
+    FakeKlineHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeKlineHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_merges_pages(kline_server):
+    downloader = KlineDownloader(base_url=kline_server, max_workers=3, page_size=100)
+    start = 1_700_000_000_000 // minute * minute
+    klines = downloader.download("btcusdt", "1m", start, start + 1000 * minute - 1)
+    assert len(klines["unix"]) == 1000
+    assert np.all(np.diff(klines["unix"]) == minute)
+    # Ten pages and one retry after the 429
+    assert len(FakeKlineHandler.requests) == 11
+    assert {request["symbol"] for request in FakeKlineHandler.requests} == {"BTCUSDT"}
+
+
+def test_limiter_waits_for_next_window():
+    now = [120.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RequestWeightLimiter(limit=10, clock=lambda: now[0], sleep=sleep)
+    for _ in range(5):
+        limiter.acquire(2)
+    assert sleeps == []
+    limiter.acquire(2)
+    assert sleeps == [60.0]
+    limiter.report(9)
+    limiter.pause(5)
+    limiter.acquire(2)
+    assert sleeps == [60.0, 5, 55.0]
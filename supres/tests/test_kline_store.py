@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from kline_store import KlineStore
+
+hour = 3600 * 1000
+
+
+class FakeClient:
+    def __init__(self, now):
+        self.now = now
+        self.requests = []
+
+    def get_historical_klines(self, symbol, interval, start_str, end_str=None):
+        self.requests.append((start_str, end_str))
+        first = -(-start_str // hour) * hour
+        last = self.now if end_str is None else end_str
+        return [
+            [open_time, "1.0", "2.0", "0.5", "1.5", "10.0", open_time + hour - 1]
+            + ["15.0", 7, "4.0", "6.0", "0"]
+            for open_time in range(first, last + 1, hour)
+        ]
+
+
+def test_fetch_downloads_only_missing_klines(tmp_path):
+    now = int(time.time() * 1000)
+    start = (now // hour - 10) * hour
+    client = FakeClient(now)
+    store = KlineStore(str(tmp_path))
+    klines = store.fetch(client, "btcusdt", "1h", start)
+    assert len(klines["unix"]) == 11
+    assert np.all(np.diff(klines["unix"]) == hour)
+    assert klines["close"].dtype == np.float64
+    assert klines["tradecount"].dtype == np.int64
+    # The open kline is returned but not cached
+    assert len(store.load("BTCUSDT", "1h")["unix"]) == 10
+    assert os.listdir(tmp_path) == ["BTCUSDT_1h.npz"]
+
+    client.requests.clear()
+    klines = store.fetch(client, "BTCUSDT", "1h", start - 5 * hour)
+    assert client.requests == [
+        (start - 5 * hour, start - 1),
+        (start + 10 * hour, None),
+    ]
+    assert len(klines["unix"]) == 16
+    assert np.all(np.diff(klines["unix"]) == hour)
+    assert len(store.load("BTCUSDT", "1h")["unix"]) == 15
+
+
+def test_fetch_after_an_old_cache_starts_at_start(tmp_path):
+    now = int(time.time() * 1000)
+    start = (now // hour - 30) * hour
+    client = FakeClient(start + 10 * hour)
+    store = KlineStore(str(tmp_path))
+    store.fetch(client, "BTCUSDT", "1h", start)
+    client.now = now
+    client.requests.clear()
+    # The klines between the cache and a later start are not downloaded, and the cache has no hole
+    klines = store.fetch(client, "BTCUSDT", "1h", start + 25 * hour)
+    assert client.requests == [(start + 25 * hour, None)]
+    assert klines["unix"][0] == start + 25 * hour
+    assert np.all(np.diff(store.load("BTCUSDT", "1h")["unix"]) == hour)
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from binance_replay import BinanceStandIn, Recording
+from kline_stream import KlineBuffer, KlineStream
+
+minute = 60 * 1000
+
+
+def kline_message(symbol, open_time, closed=True):
+    kline = {
+        "t": open_time,
+        "T": open_time + minute - 1,
+        "s": symbol,
+        "i": "1m",
+        "o": "1.0",
+        "c": str(open_time / minute),
+        "h": "2.0",
+        "l": "0.5",
+        "v": "10.0",
+        "n": 7,
+        "x": closed,
+        "q": "15.0",
+        "V": "4.0",
+        "Q": "6.0",
+    }
+    stream = f"{symbol.lower()}@kline_1m"
+    return json.dumps(
+        {"stream": stream, "data": {"e": "kline", "s": symbol, "k": kline}}
+    )
+
+
+async def consume(stream, until):
+    """
+    Runs a stream until a closed kline makes `until()` true, then stops it.
+    """
+    done = asyncio.Event()
+    stream.on_close = lambda symbol, interval, buffer: until() and done.set()
+    task = asyncio.create_task(stream.run())
+    await asyncio.wait_for(done.wait(), 5)
+    task.cancel()
+    # Lets the stream close its connections
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_ring_buffer_views():
+    buffer = KlineBuffer(capacity=3)
+    for open_time in range(5):
+        buffer.append(
+            json.loads(kline_message("BTCUSDT", open_time * minute))["data"]["k"]
+        )
+    # Older klines are ignored
+    assert not buffer.append(json.loads(kline_message("BTCUSDT", 0))["data"]["k"])
+    columns = buffer.columns()
+    assert len(buffer) == 3
+    assert list(columns["unix"]) == [2 * minute, 3 * minute, 4 * minute]
+    assert list(columns["close"]) == [2.0, 3.0, 4.0]
+    assert columns["tradecount"].dtype == np.int64
+    # The columns are views into the buffer
+    assert not columns["close"].flags.owndata
+    assert not columns["close"].flags.writeable
+    candles = buffer.candles()
+    assert list(candles.open_time) == [2 * minute, 3 * minute, 4 * minute]
+    for name, column in (("open_time", "unix"), ("close", "close")):
+        assert np.shares_memory(getattr(candles, name), columns[column])
+    assert np.shares_memory(candles.volume, columns["Volume USDT"])
+
+
+def test_stream_from_stand_in(tmp_path, monkeypatch):
+    stream = KlineStream(["BTCUSDT", "ETHUSDT"], ["1m"], capacity=10)
+    recording = Recording(str(tmp_path))
+    path = "/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m"
+    for open_time in range(0, 4 * minute, minute):
+        recording.add_message(
+            path, 0.0, kline_message("BTCUSDT", open_time, closed=False)
+        )
+        recording.add_message(path, 0.0, kline_message("BTCUSDT", open_time))
+        recording.add_message(path, 0.0, kline_message("ETHUSDT", open_time))
+
+    with BinanceStandIn(str(tmp_path)) as stand_in:
+        monkeypatch.setenv("SUPRES_BINANCE_WS_URL", stand_in.ws_url)
+        assert [url.removeprefix(stand_in.ws_url) for url in stream.urls()] == [path]
+        asyncio.run(consume(stream, lambda: len(stream.buffers["ETHUSDT", "1m"]) == 4))
+    assert list(stream.buffers["BTCUSDT", "1m"].columns()["close"]) == [0, 1, 2, 3]
+
+
+def test_record_stream_from_spot(tmp_path, monkeypatch):
+    stream = KlineStream(["BTCUSDT"], ["1m"], capacity=10)
+    path = "/stream?streams=btcusdt@kline_1m"
+    # The same stream path on both markets, with the klines of different minutes
+    for market, open_time in (("spot", 0), ("futures", 5 * minute)):
+        Recording(str(tmp_path / market)).add_message(
+            path, 0.0, kline_message("BTCUSDT", open_time)
+        )
+
+    with BinanceStandIn(str(tmp_path / "spot")) as spot, BinanceStandIn(
+        str(tmp_path / "futures")
+    ) as futures, BinanceStandIn(
+        str(tmp_path / "copy"),
+        mode="record",
+        websocket_upstream=spot.ws_url,
+        futures_websocket_upstream=futures.ws_url,
+    ) as recorder:
+        monkeypatch.setenv("SUPRES_BINANCE_WS_URL", recorder.ws_url)
+        asyncio.run(consume(stream, lambda: True))
+    assert list(stream.buffers["BTCUSDT", "1m"].columns()["unix"]) == [0]
+    assert [
+        message for _, message in Recording(str(tmp_path / "copy")).messages(path)
+    ] == [kline_message("BTCUSDT", 0)]
+
+
+def test_backfill_and_gaps():
+    class Client:
+        def get_historical_klines(self, symbol, interval, start_str):
+            # The REST klines after the start, up to the one still open
+            return [
+                [open_time, "1.0", "2.0", "0.5", "1.5", "10.0", open_time + minute - 1]
+                + ["15.0", 7, "4.0", "6.0", "0"]
+                for open_time in (
+                    2 * minute,
+                    3 * minute,
+                    time.time() * 1000 // minute * minute,
+                )
+                if open_time >= start_str
+            ]
+
+    gaps, closes = [], []
+    stream = KlineStream(
+        ["BTCUSDT"],
+        ["1m"],
+        capacity=10,
+        client=Client(),
+        on_close=lambda symbol, interval, buffer: closes.append(len(buffer)),
+        on_gap=lambda *gap: gaps.append(gap),
+    )
+    for open_time in (0, minute):
+        stream.handle(kline_message("BTCUSDT", open_time))
+    stream.backfill([("BTCUSDT", "1m")])
+    buffer = stream.buffers["BTCUSDT", "1m"]
+    assert list(buffer.columns()["unix"]) == [0, minute, 2 * minute, 3 * minute]
+    assert buffer.close_time() == 4 * minute - 1
+    assert closes == [1, 2, 4] and not gaps
+    # A kline after missing ones is added and reported
+    stream.handle(kline_message("BTCUSDT", 6 * minute))
+    assert gaps == [("BTCUSDT", "1m", 4 * minute, 6 * minute - 1)]
+    assert len(buffer) == 5
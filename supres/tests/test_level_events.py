@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+import support_resistance
+from level_events import LevelEvent, LevelEventTracker, level_events
+
+
+def test_break_retest_flip():
+    # (time, high, low, close)
+    candles = [
+        (0, 9.5, 9.0, 9.2),
+        (1, 10.5, 9.1, 10.4),  # Closes above 10
+        (2, 10.8, 10.0, 10.6),  # Comes back to 10 and holds
+        (3, 10.9, 9.9, 10.5),  # Holds again
+        (4, 10.6, 9.5, 9.7),  # Closes below 10
+        (5, 10.2, 9.6, 9.8),  # Rejected from below
+    ]
+    times, high, low, close = zip(*candles)
+    expected = [
+        LevelEvent(1, 10.0, "break", "support"),
+        LevelEvent(2, 10.0, "flip", "support"),
+        LevelEvent(3, 10.0, "retest", "support"),
+        LevelEvent(4, 10.0, "break", "resistance"),
+        LevelEvent(5, 10.0, "flip", "resistance"),
+    ]
+    assert level_events([10.0, 12.0], times, high, low, close) == expected
+    tracker = LevelEventTracker([12.0, 10.0])
+    assert [
+        event for candle in candles for event in tracker.update(*candle)
+    ] == expected
+
+
+def test_tracker_matches_history():
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "BTCUSDT_15m.csv"))
+    df = df.iloc[::-1].reset_index(drop=True)
+    supports, resistances = support_resistance.pivots(df.low, df.high, 3, 2)
+    levels = list(df.low[supports]) + list(df.high[resistances])
+    history = level_events(levels, df.unix, df.high, df.low, df.close)
+    assert {event.kind for event in history} == {"break", "retest", "flip"}
+    tracker = LevelEventTracker(levels[: len(levels) // 2])
+    tracker.add_levels(levels[len(levels) // 2 :])
+    live = []
+    for row in df.itertuples():
+        live += tracker.update(row.unix, row.high, row.low, row.close)
+    assert live == history
+
+
+def test_tracker_remove_levels():
+    tracker = LevelEventTracker([10.0, 11.0])
+    tracker.remove_levels([11.0])
+    tracker.update(0, 9.5, 9.0, 9.2)
+    assert tracker.update(1, 11.5, 9.1, 11.4) == [
+        LevelEvent(1, 10.0, "break", "support")
+    ]
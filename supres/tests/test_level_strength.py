@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from level_strength import score_levels, strongest_levels
+
+
+def test_score_levels_matches_brute_force():
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "BTCUSDT_1d.csv"))
+    levels = [20000.0, 16500.0, 19000.0, df.low[10], df.high[40], 100000.0]
+    scores = score_levels(levels, df.open, df.high, df.low, df.close, tolerance=5)
+    for position, level in enumerate(levels):
+        touches = ((df.low - 5 <= level) & (level <= df.high + 5)).sum()
+        closes_through = (
+            (np.minimum(df.open, df.close) < level)
+            & (level < np.maximum(df.open, df.close))
+        ).sum()
+        assert scores.touches[position] == touches
+        assert scores.closes_through[position] == closes_through
+        assert scores.rejections[position] == touches - closes_through
+    assert scores.touches[-1] == 0
+
+
+def test_strongest_levels_keeps_order():
+    open_ = [10.0, 10.0, 10.0]
+    high = [12.0, 12.0, 11.0]
+    low = [9.0, 9.5, 9.0]
+    close = [11.5, 10.5, 10.5]
+    levels = [9.2, 11.0, 12.0]
+    scores = score_levels(levels, open_, high, low, close)
+    assert list(scores.strength) == [2, 1, 2]
+    assert strongest_levels(levels, scores, 2) == [9.2, 12.0]
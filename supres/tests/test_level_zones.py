@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from level_zones import Zone, average_true_range, cluster_levels
+
+
+def test_cluster_levels_ticks():
+    levels = [(5, 100.0), (9, 100.2), (12, 105.0), (20, 100.1), (30, 104.9)]
+    assert cluster_levels(levels, 2, "ticks", tick_size=0.1) == [
+        Zone(100.0, 100.2, 100.1, 3, 5, 20),
+        Zone(104.9, 105.0, 104.9, 2, 12, 30),
+    ]
+
+
+def test_cluster_levels_percent_and_atr():
+    levels = [(1, 100.0), (2, 101.0), (3, 103.0)]
+    assert [zone.touches for zone in cluster_levels(levels, 1)] == [2, 1]
+    assert [zone.touches for zone in cluster_levels(levels, 2)] == [3]
+    assert [zone.touches for zone in cluster_levels(levels, 0.5, "atr", atr=2)] == [
+        2,
+        1,
+    ]
+    assert cluster_levels([], 1) == []
+
+
+def test_cluster_levels_errors():
+    with pytest.raises(ValueError):
+        cluster_levels([(1, 100.0)], 1, "points")
+    with pytest.raises(ValueError):
+        cluster_levels([(1, 100.0)], 1, "ticks")
+
+
+def test_average_true_range():
+    high = [10.0, 12.0, 11.0]
+    low = [9.0, 10.0, 8.0]
+    close = [9.5, 11.0, 10.0]
+    assert average_true_range(high, low, close) == pytest.approx((1 + 2.5 + 3) / 3)
+    assert average_true_range(high, low, close, length=1) == 3
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+package_parent = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+
+def test_import_is_light():
+    # Importing the package and the analysis modules must not load the heavy dependencies, read stdin or connect
+    code = (
+        "import sys, supres\n"
+        "supres.main, supres.historical_data, supres.batch_scan\n"
+        "heavy = ('plotly', 'pandas_ta', 'tweepy', 'telegram', 'binance', 'websockets')\n"
+        "print([name for name in heavy if name in sys.modules])\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=package_parent,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert completed.stdout.strip() == "[]"
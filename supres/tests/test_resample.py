@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from resample import Resampler, bucket_start, resample
+
+hour = 3600 * 1000
+day = 24 * hour
+
+
+def test_resample_matches_pandas():
+    # The candles of the file are one hour apart
+    path = os.path.join(os.path.dirname(__file__), "BTCUSDT_15m.csv")
+    df = pd.read_csv(path).iloc[::-1]
+    klines = resample(df, "4h")
+    expected = (
+        df.set_index(pd.to_datetime(df["unix"], unit="ms"))
+        .resample("4h")
+        .agg(
+            {
+                "open": "first",
+                "high": "max",
+                "low": "min",
+                "close": "last",
+                "Volume USDT": "sum",
+            }
+        )
+    )
+    assert np.array_equal(klines["unix"], expected.index.astype("int64") // 10**6)
+    for column in expected:
+        assert np.allclose(klines[column], expected[column])
+
+
+def test_bucket_alignment():
+    # Monday 2023-01-02 00:00 UTC
+    monday = 1672617600000
+    times = monday + np.arange(-1, 8) * day
+    assert list(bucket_start(times, "1w")) == [monday - 7 * day] + [monday] * 7 + [
+        monday + 7 * day
+    ]
+    # 3 day klines count from the epoch
+    assert list(bucket_start([0, 2 * day, 3 * day, monday], "3d")) == [
+        0,
+        0,
+        3 * day,
+        monday - monday % (3 * day),
+    ]
+
+
+def test_resampler_completes_partial_bars():
+    open_time = np.arange(10) * hour
+    columns = {
+        "unix": open_time,
+        "open": np.arange(10.0),
+        "high": np.arange(10.0) + 1,
+        "low": np.arange(10.0) - 1,
+        "close": np.arange(10.0) + 0.5,
+        "volume": np.ones(10),
+    }
+    resampler = Resampler("4h", "1h")
+    closed = []
+    for index in range(10):
+        closed.append(
+            resampler.update(
+                {name: values[index : index + 1] for name, values in columns.items()}
+            )
+        )
+    assert [len(bars["unix"]) for bars in closed] == [0, 0, 0, 1, 0, 0, 0, 1, 0, 0]
+    batch = resample(columns, "4h")
+    for name, values in resampler.klines.items():
+        assert np.array_equal(values, batch[name][:2])
+    assert resampler.partial["volume"][0] == 2
+    assert resampler.partial["high"][0] == 10.0
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+import support_resistance
+
+
+def candle_frame(csv_name):
+    # Prepare the candles the same way Supres.main does
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), csv_name))
+    df = df.iloc[::-1]
+    return pd.concat([df, df.tail(1)], axis=0, ignore_index=True)
+
+
+def scalar_pivots(df, before_candle_count, after_candle_count):
+    supports, resistances = [], []
+    for row in range(len(df)):
+        if support_resistance.support(df, row, before_candle_count, after_candle_count):
+            supports.append(row)
+        if support_resistance.resistance(
+            df, row, before_candle_count, after_candle_count
+        ):
+            resistances.append(row)
+    return supports, resistances
+
+
+@pytest.mark.parametrize("csv_name", ["BTCUSDT_1d.csv", "BTCUSDT_15m.csv"])
+@pytest.mark.parametrize(
+    "before_candle_count,after_candle_count", [(3, 1), (3, 2), (3, 3), (2, 5), (1, 0)]
+)
+def test_pivots_match_scalar_rules(csv_name, before_candle_count, after_candle_count):
+    df = candle_frame(csv_name)
+    supports, resistances = support_resistance.pivots(
+        df.low, df.high, before_candle_count, after_candle_count
+    )
+    assert (list(supports), list(resistances)) == scalar_pivots(
+        df, before_candle_count, after_candle_count
+    )
+
+
+def test_pivots_short_series():
+    assert [list(p) for p in support_resistance.pivots([], [], 3, 2)] == [[], []]
+    assert [list(p) for p in support_resistance.pivots([1.0], [2.0], 0, 0)] == [
+        [0],
+        [0],
+    ]
+
+
+@pytest.mark.parametrize("csv_name", ["BTCUSDT_1d.csv", "BTCUSDT_15m.csv"])
+@pytest.mark.parametrize("after_candle_count", [0, 1, 2, 4])
+def test_pivot_stream_matches_pivots(csv_name, after_candle_count):
+    df = candle_frame(csv_name)
+    stream = support_resistance.PivotStream(3, after_candle_count)
+    for low, high in zip(df.low, df.high):
+        stream.update(low, high)
+    supports, resistances = support_resistance.pivots(
+        df.low, df.high, 3, after_candle_count
+    )
+    assert [row for row, _ in stream.support_list] == list(supports)
+    assert [row for row, _ in stream.resistance_list] == list(resistances)
+    assert [price for _, price in stream.support_list] == list(df.low[supports])
+
+
+def test_pivot_stream_kline():
+    stream = support_resistance.PivotStream(1, 1)
+    klines = [
+        [0, "10", "12", "9", "11"],
+        [1, "11", "11.5", "8", "9"],
+        [2, "9", "13", "8.5", "12"],
+    ]
+    results = [stream.update_kline(kline) for kline in klines]
+    assert results == [(None, None), (None, None), ((1, 8.0), None)]
+
+
+@pytest.mark.parametrize("csv_name", ["BTCUSDT_1d.csv", "BTCUSDT_15m.csv"])
+def test_sensitivity_levels_match_pivots(csv_name):
+    df = candle_frame(csv_name)
+    levels = support_resistance.sensitivity_levels(df.low, df.high, [1, 2, 3, 5])
+    for sens, (supports, resistances) in levels.items():
+        support_rows, resistance_rows = scalar_pivots(df, 3, sens)
+        assert supports == [(row, df.low[row]) for row in support_rows]
+        assert resistances == [(row, df.high[row]) for row in resistance_rows]
+
+
+def test_auto_sensitivity():
+    df = candle_frame("BTCUSDT_1d.csv")
+    ranks = support_resistance.pivot_ranks(df.low, df.high)
+    counts = ranks.level_counts(3, range(1, 11))
+    assert all(counts[:-1] >= counts[1:])
+    for sens in (1, 2, 4):
+        assert (
+            support_resistance.auto_sensitivity(df.low, df.high, counts[sens - 1])
+            == sens
+        )
+    assert support_resistance.auto_sensitivity(df.low, df.high, 0) == 10
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from volume_profile import volume_profile
+
+
+def brute_force_profile(high, low, volume, bin_edges):
+    profile = np.zeros(len(bin_edges) - 1)
+    for candle_high, candle_low, candle_volume in zip(high, low, volume):
+        if candle_high == candle_low:
+            index = min(
+                np.searchsorted(bin_edges, candle_low, "right") - 1, len(profile) - 1
+            )
+            profile[index] += candle_volume
+            continue
+        overlap = np.clip(
+            np.minimum(bin_edges[1:], candle_high)
+            - np.maximum(bin_edges[:-1], candle_low),
+            0,
+            None,
+        )
+        profile += candle_volume * overlap / (candle_high - candle_low)
+    return profile
+
+
+def test_volume_profile_matches_brute_force():
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "BTCUSDT_1d.csv"))
+    high, low = df["high"].to_numpy(), df["low"].to_numpy()
+    high[5] = low[5]
+    profile = volume_profile(high, low, df["Volume USDT"], bins=50)
+    expected = brute_force_profile(high, low, df["Volume USDT"], profile.bin_edges)
+    assert profile.volume == pytest.approx(expected, rel=1e-9)
+    assert profile.volume.sum() == pytest.approx(df["Volume USDT"].sum())
+    assert profile.buy_volume is None
+    assert profile.value_area_low <= profile.point_of_control <= profile.value_area_high
+    in_area = (profile.bin_centers > profile.value_area_low) & (
+        profile.bin_centers < profile.value_area_high
+    )
+    assert profile.volume[in_area].sum() >= 0.7 * profile.volume.sum()
+
+
+def test_volume_profile_nodes_and_buy_volume():
+    high = np.array([11.0, 11.0, 21.0, 21.0, 16.0])
+    low = np.array([10.0, 10.0, 20.0, 20.0, 15.0])
+    volume = np.array([100.0, 100.0, 80.0, 80.0, 1.0])
+    profile = volume_profile(high, low, volume, bins=11, buy_volume=volume / 2)
+    assert profile.point_of_control == pytest.approx(profile.bin_centers[0])
+    assert profile.buy_volume == pytest.approx(profile.volume / 2)
+    assert list(profile.high_volume_nodes) == list(profile.bin_centers[[0, -1]])
+    assert list(profile.low_volume_nodes) == list(profile.bin_centers[[2, 7]])
+
+
+def test_volume_profile_without_a_price_range():
+    profile = volume_profile([], [], [], buy_volume=[])
+    assert len(profile.volume) == len(profile.bin_edges) == len(profile.buy_volume) == 0
+    assert np.isnan(profile.point_of_control)
+    profile = volume_profile([5.0, 5.0], [5.0, 5.0], [1.0, 2.0], bins=10)
+    assert list(profile.bin_edges) == [5.0, 5.0]
+    assert list(profile.volume) == [3.0]
+    assert profile.point_of_control == profile.value_area_low == 5.0
+    assert profile.value_area_high == 5.0
+    assert list(profile.high_volume_nodes) == list(profile.low_volume_nodes) == []